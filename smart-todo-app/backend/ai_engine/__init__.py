@@ -8,3 +8,5 @@ ai_manager = TaskAnalyzer()
 # ai_manager.analyze_task_priority(task_data, context_data)
 # ai_manager.suggest_deadline(task_data, current_workload)
 # ai_manager.enhance_task_description(task_data, context_data)
+# ai_manager.suggest_tags(task_data, context_data, categories)
+# ai_manager.extract_semantics(content)
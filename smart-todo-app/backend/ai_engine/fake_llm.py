@@ -0,0 +1,161 @@
+# Deterministic OpenAI-compatible stub server for offline benchmarks and tests
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+from .prompt_budget import estimate_tokens
+
+# Canned completions per prompt type. Values are str.format templates that
+# may use {title} (first task/title line of the prompt) and {prompt_tokens}.
+DEFAULT_RESPONSES = {
+    'priority': '{{"priority_score": 6.5, "priority_level": 3, "reasoning": "Fake priority for {title}"}}',
+    'deadline': '{{"suggested_deadline": "2030-01-15 17:00:00", "reasoning": "Fake deadline for {title}"}}',
+    'tags': '["Work", "Planning"]',
+    'semantic': '{{"entities": ["Alice"], "intent": "meeting", "schedule": "Friday 2 PM"}}',
+    'enhance': 'Enhanced: {title}. Break the work into steps, confirm dependencies and schedule a review.',
+}
+
+# Markers used to recognise prompt types from the rendered prompt text
+PROMPT_TYPE_MARKERS = [
+    ('priority', 'priority_score'),
+    ('deadline', 'suggested_deadline'),
+    ('tags', 'JSON list of tag names'),
+    ('semantic', 'Extract the following'),
+]
+
+
+def detect_prompt_type(prompt: str) -> str:
+    for prompt_type, marker in PROMPT_TYPE_MARKERS:
+        if marker in prompt:
+            return prompt_type
+    return 'enhance'
+
+
+def _prompt_title(prompt: str) -> str:
+    for line in prompt.splitlines():
+        line = line.strip()
+        for label in ('Task:', 'Original Task:', 'Title:'):
+            if line.startswith(label):
+                return line[len(label):].strip()
+    return 'task'
+
+
+class FakeLLMConfig:
+    """Latency, error and response behaviour of the fake server.
+
+    latency is one of 'fixed', 'uniform', 'normal' or 'lognormal';
+    latency_ms is the mean (or fixed value) and jitter_ms the spread.
+    Randomness is seeded from ``seed`` and the prompt, so a given prompt
+    always gets the same latency, error decision and response.
+    """
+
+    def __init__(self, latency='fixed', latency_ms=0.0, jitter_ms=0.0, error_rate=0.0,
+                 error_status=503, seed=0, responses: Optional[Dict[str, str]] = None):
+        if latency not in ('fixed', 'uniform', 'normal', 'lognormal'):
+            raise ValueError(f"Unknown latency distribution: {latency}")
+        self.latency = latency
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.seed = seed
+        self.responses = {**DEFAULT_RESPONSES, **(responses or {})}
+
+    def rng_for(self, prompt: str) -> random.Random:
+        digest = hashlib.sha256(f"{self.seed}:{prompt}".encode()).digest()
+        return random.Random(int.from_bytes(digest[:8], 'big'))
+
+    def sample_latency(self, rng: random.Random) -> float:
+        """Latency in seconds drawn from the configured distribution"""
+        if self.latency == 'uniform':
+            ms = rng.uniform(self.latency_ms - self.jitter_ms, self.latency_ms + self.jitter_ms)
+        elif self.latency == 'normal':
+            ms = rng.gauss(self.latency_ms, self.jitter_ms)
+        elif self.latency == 'lognormal':
+            ms = self.latency_ms * rng.lognormvariate(0, self.jitter_ms / self.latency_ms if self.latency_ms else 0)
+        else:
+            ms = self.latency_ms
+        return max(0.0, ms) / 1000
+
+    def completion(self, payload: Dict):
+        """Return (status, body) for a chat completion request"""
+        messages = payload.get('messages', [])
+        prompt = messages[-1]['content'] if messages else ''
+        rng = self.rng_for(prompt)
+        time.sleep(self.sample_latency(rng))
+        if rng.random() < self.error_rate:
+            return self.error_status, {'error': {'message': 'Injected fake LLM error', 'type': 'server_error'}}
+
+        prompt_type = detect_prompt_type(prompt)
+        prompt_tokens = estimate_tokens(prompt)
+        content = self.responses[prompt_type].format(title=_prompt_title(prompt), prompt_tokens=prompt_tokens)
+        completion_tokens = estimate_tokens(content)
+        return 200, {
+            'id': 'fake-' + hashlib.sha256(prompt.encode()).hexdigest()[:12],
+            'object': 'chat.completion',
+            'created': 0,
+            'model': payload.get('model', 'fake-model'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': content},
+                'finish_reason': 'stop',
+            }],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens,
+            },
+        }
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    config = FakeLLMConfig()
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path.rstrip('/') == '/v1/models':
+            self._send_json(200, {'object': 'list', 'data': [{'id': 'fake-model', 'object': 'model'}]})
+        else:
+            self._send_json(404, {'error': {'message': 'Not found'}})
+
+    def do_POST(self):
+        if self.path.rstrip('/') != '/v1/chat/completions':
+            self._send_json(404, {'error': {'message': 'Not found'}})
+            return
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            self._send_json(400, {'error': {'message': 'Invalid JSON'}})
+            return
+        status, body = self.config.completion(payload)
+        self._send_json(status, body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(host='127.0.0.1', port=1234, config: Optional[FakeLLMConfig] = None) -> ThreadingHTTPServer:
+    """Create a fake LLM server; port 0 picks a free port"""
+    handler = type('ConfiguredFakeLLMHandler', (FakeLLMHandler,), {'config': config or FakeLLMConfig()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_in_thread(host='127.0.0.1', port=0, config: Optional[FakeLLMConfig] = None) -> ThreadingHTTPServer:
+    """Start a fake LLM server in a daemon thread; call .shutdown() to stop it"""
+    server = make_server(host, port, config)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,44 @@
+import json
+from django.core.management.base import BaseCommand
+from ai_engine.fake_llm import FakeLLMConfig, make_server
+
+
+class Command(BaseCommand):
+    help = 'Run a deterministic OpenAI-compatible fake LLM server for offline benchmarks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=1234)
+        parser.add_argument('--latency', default='fixed', choices=['fixed', 'uniform', 'normal', 'lognormal'],
+                            help='Latency distribution.')
+        parser.add_argument('--latency_ms', type=float, default=0.0, help='Mean (or fixed) latency in milliseconds.')
+        parser.add_argument('--jitter_ms', type=float, default=0.0, help='Latency spread in milliseconds.')
+        parser.add_argument('--error_rate', type=float, default=0.0, help='Fraction of requests that fail (0-1).')
+        parser.add_argument('--error_status', type=int, default=503, help='HTTP status for injected errors.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--responses', help='JSON file mapping prompt types to response templates.')
+
+    def handle(self, *args, **options):
+        responses = None
+        if options['responses']:
+            with open(options['responses'], encoding='utf-8') as f:
+                responses = json.load(f)
+        config = FakeLLMConfig(
+            latency=options['latency'],
+            latency_ms=options['latency_ms'],
+            jitter_ms=options['jitter_ms'],
+            error_rate=options['error_rate'],
+            error_status=options['error_status'],
+            seed=options['seed'],
+            responses=responses,
+        )
+        server = make_server(options['host'], options['port'], config)
+        self.stdout.write(self.style.SUCCESS(
+            f"Fake LLM listening on http://{options['host']}:{server.server_address[1]}/v1/chat/completions"
+        ))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,142 @@
+# Token budgeting for prompt assembly and prompt-size instrumentation
+import logging
+import math
+import re
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Rough average for English text with GPT-style BPE tokenizers
+CHARS_PER_TOKEN = 4
+
+_WORD_RE = re.compile(r"[a-z0-9]{3,}")
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate: roughly one token per four characters"""
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to fit max_tokens, preferring a word boundary"""
+    if not text or estimate_tokens(text) <= max_tokens:
+        return text or ''
+    if max_tokens <= 0:
+        return ''
+    limit = max_tokens * CHARS_PER_TOKEN - 3
+    cut = text[:limit]
+    space = cut.rfind(' ')
+    if space > limit // 2:
+        cut = cut[:space]
+    return cut.rstrip() + '...'
+
+
+def pack_context(context_data: List[Dict], budget_tokens: int, query_text: str = '',
+                 item_tokens: int = 100) -> List[str]:
+    """Select context snippets by relevance and recency under a token budget.
+
+    Each entry is scored by keyword overlap with ``query_text``, recency and
+    its ``importance_score``; the best entries are truncated to
+    ``item_tokens`` and added until the budget is spent. Snippets are
+    returned oldest first so the prompt reads chronologically.
+    """
+    if budget_tokens <= 0 or not context_data:
+        return []
+
+    query_words = set(_WORD_RE.findall(query_text.lower()))
+    count = len(context_data)
+    dated = all(isinstance(ctx.get('created_at'), datetime) for ctx in context_data)
+    if dated:
+        order = sorted(range(count), key=lambda i: context_data[i]['created_at'])
+    else:
+        # Without timestamps, later entries are treated as more recent
+        order = list(range(count))
+    recency_rank = {index: rank for rank, index in enumerate(order)}
+
+    scored = []
+    for index, ctx in enumerate(context_data):
+        content = ctx.get('content') or ''
+        if not content:
+            continue
+        words = set(_WORD_RE.findall(content.lower()))
+        relevance = len(words & query_words) / len(query_words) if query_words else 0.0
+        recency = (recency_rank[index] + 1) / count
+        importance = ctx.get('importance_score') or 0.0
+        scored.append((2.0 * relevance + recency + importance, index, content))
+    scored.sort(key=lambda item: (-item[0], -recency_rank[item[1]]))
+
+    selected = []
+    remaining = budget_tokens
+    for _, index, content in scored:
+        snippet = truncate_to_tokens(content, min(item_tokens, remaining))
+        cost = estimate_tokens(snippet) + 1
+        if not snippet or cost > remaining:
+            continue
+        selected.append((recency_rank[index], snippet))
+        remaining -= cost
+        if remaining <= 0:
+            break
+    selected.sort()
+    return [snippet for _, snippet in selected]
+
+
+def pack_terms(terms: List[str], budget_tokens: int) -> List[str]:
+    """Keep as many terms as fit in the token budget, in their given order"""
+    packed = []
+    remaining = budget_tokens
+    for term in terms:
+        cost = estimate_tokens(term) + 1
+        if cost > remaining:
+            break
+        packed.append(term)
+        remaining -= cost
+    return packed
+
+
+class PromptUsageStats:
+    """Thread-safe per-prompt-type counters of prompt and completion sizes"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, prompt_type: str, prompt_tokens: int, completion_tokens: int,
+               usage: Optional[Dict] = None):
+        """Record one LLM call; backend-reported usage wins over estimates"""
+        if usage:
+            prompt_tokens = usage.get('prompt_tokens', prompt_tokens)
+            completion_tokens = usage.get('completion_tokens', completion_tokens)
+        with self._lock:
+            entry = self._stats.setdefault(prompt_type, {
+                'calls': 0,
+                'prompt_tokens': 0,
+                'completion_tokens': 0,
+                'max_prompt_tokens': 0,
+            })
+            entry['calls'] += 1
+            entry['prompt_tokens'] += prompt_tokens
+            entry['completion_tokens'] += completion_tokens
+            entry['max_prompt_tokens'] = max(entry['max_prompt_tokens'], prompt_tokens)
+        logger.debug('LLM call %s: prompt=%d completion=%d tokens', prompt_type, prompt_tokens, completion_tokens)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                prompt_type: {
+                    **entry,
+                    'avg_prompt_tokens': round(entry['prompt_tokens'] / entry['calls'], 1),
+                    'avg_completion_tokens': round(entry['completion_tokens'] / entry['calls'], 1),
+                }
+                for prompt_type, entry in self._stats.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+usage_stats = PromptUsageStats()
@@ -0,0 +1,145 @@
+# Central registry of versioned, whitespace-normalized prompt templates
+import hashlib
+import keyword
+import textwrap
+from string import Formatter
+from typing import Dict
+
+
+def normalize_whitespace(text: str) -> str:
+    """Dedent, strip every line and collapse runs of blank lines"""
+    lines = [line.strip() for line in textwrap.dedent(text).strip().splitlines()]
+    normalized = []
+    for line in lines:
+        if line or (normalized and normalized[-1]):
+            normalized.append(line)
+    return '\n'.join(normalized)
+
+
+class PromptTemplate:
+    """A whitespace-normalized template with its fields validated up front.
+
+    Templates use str.format syntax ({field}, {{ for a literal brace}) with
+    plain identifiers only. ``version`` combines the declared version with a
+    hash of the normalized text, so editing a template changes every cache
+    key derived from it even if the declared version is not bumped.
+    """
+
+    def __init__(self, name: str, version: int, text: str):
+        self.name = name
+        self.text = normalize_whitespace(text)
+        self.version = f"{name}.v{version}.{hashlib.sha256(self.text.encode()).hexdigest()[:8]}"
+        self.fields = []
+        for _, field, spec, conversion in Formatter().parse(self.text):
+            if field is None:
+                continue
+            if spec or conversion or not field.isidentifier() or keyword.iskeyword(field):
+                raise ValueError(f"Prompt {name!r}: unsupported field {field!r}")
+            if field not in self.fields:
+                self.fields.append(field)
+
+    def render(self, **values) -> str:
+        """Fill in the fields; unused values are ignored, a missing one raises KeyError"""
+        return self.text.format_map({field: values[field] for field in self.fields})
+
+    def __repr__(self):
+        return f"<PromptTemplate {self.version}>"
+
+
+PROMPTS: Dict[str, PromptTemplate] = {}
+
+
+def register(name: str, version: int, text: str) -> PromptTemplate:
+    template = PromptTemplate(name, version, text)
+    PROMPTS[name] = template
+    return template
+
+
+def get_prompt(name: str) -> PromptTemplate:
+    return PROMPTS[name]
+
+
+def render_prompt(name: str, **values) -> str:
+    return PROMPTS[name].render(**values)
+
+
+register('system', 1, """
+    You are an AI assistant specialized in task management and productivity.
+""")
+
+register('priority', 1, """
+    Analyze the priority of this task based on the context provided.
+
+    Task: {title}
+    Description: {description}
+    Category: {category}
+
+    Recent Context:
+    {context}
+
+    Return a JSON response with:
+    - priority_score (0-10 float)
+    - priority_level (1-4 integer: 1=Low, 2=Medium, 3=High, 4=Critical)
+    - reasoning (brief explanation)
+
+    Format: {{"priority_score": 7.5, "priority_level": 3, "reasoning": "High priority due to..."}}
+""")
+
+register('deadline', 1, """
+    Suggest a realistic deadline for this task based on its complexity and current workload.
+
+    Task: {title}
+    Description: {description}
+    Category: {category}
+    Current Workload: {workload} active tasks
+
+    Consider:
+    - Task complexity and scope
+    - Current workload
+    - Task urgency and importance
+    - Realistic time estimates
+
+    Return a JSON response with:
+    - suggested_deadline (ISO format: YYYY-MM-DD HH:MM:SS)
+    - reasoning (brief explanation)
+
+    Format: {{"suggested_deadline": "2024-01-15 17:00:00", "reasoning": "Based on task complexity..."}}
+""")
+
+register('enhance', 1, """
+    Enhance this task description with context-aware details and actionable insights.
+
+    Original Task: {title}
+    Original Description: {description}
+    Category: {category}
+
+    Recent Context:
+    {context}
+
+    Provide an enhanced description that includes:
+    - More specific details and requirements
+    - Context-aware considerations
+    - Potential challenges or dependencies
+    - Suggested approach or steps
+
+    Return only the enhanced description text, no JSON formatting.
+""")
+
+register('tags', 1, """
+    Given the following task:
+    Title: {title}
+    Description: {description}
+    Context:
+    {context}
+    Choose the most appropriate categories/tags from this list: {categories}
+    If none fit, suggest new tags. Return a JSON list of tag names.
+""")
+
+register('semantic', 1, """
+    Extract the following from the context:
+    - Entities (people, places, organizations)
+    - Intent (e.g., meeting, reminder, note, event)
+    - Schedule info (date, time, recurrence)
+    Context: {content}
+    Return as JSON: {{"entities": [...], "intent": "...", "schedule": "..."}}
+""")
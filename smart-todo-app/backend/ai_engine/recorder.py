@@ -0,0 +1,46 @@
+# Record/replay store for prompt -> response pairs
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+RECORD_MODES = ('off', 'record', 'replay')
+
+
+class PromptRecorder:
+    """Stores LLM responses on disk keyed by model, sampling settings and prompt.
+
+    Files live at ``<directory>/<prompt_type>/<sha256>.json`` so recordings
+    can be committed alongside benchmarks and replayed offline.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    def key(self, route: Dict, prompt: str) -> str:
+        material = json.dumps([route['model'], route['temperature'], route['max_tokens'], prompt])
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    def path(self, route: Dict, prompt: str) -> Path:
+        return self.directory / route['prompt_type'] / f"{self.key(route, prompt)}.json"
+
+    def load(self, route: Dict, prompt: str) -> Optional[Dict]:
+        try:
+            with open(self.path(route, prompt), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save(self, route: Dict, prompt: str, response: str):
+        path = self.path(route, prompt)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'prompt_type': route['prompt_type'],
+                'model': route['model'],
+                'prompt': prompt,
+                'response': response,
+            }, f, indent=2)
+        os.replace(tmp_path, path)
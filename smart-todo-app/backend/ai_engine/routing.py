@@ -0,0 +1,67 @@
+# Model-tier routing for AI prompts
+from typing import Dict, Optional
+from decouple import config
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+# Model names per backend for each tier. Structured classification calls
+# (priority, deadline, tags, semantic extraction) use the small tier;
+# only free-text enhancement pays for the large one.
+MODEL_TIERS = {
+    'small': {
+        'local': config('LM_STUDIO_SMALL_MODEL', default='local-model'),
+        'openai': config('OPENAI_SMALL_MODEL', default='gpt-4o-mini'),
+    },
+    'large': {
+        'local': config('LM_STUDIO_LARGE_MODEL', default='local-model'),
+        'openai': config('OPENAI_LARGE_MODEL', default='gpt-3.5-turbo'),
+    },
+}
+
+# Routing table: prompt type -> backend, tier, max_tokens, temperature, plus
+# the prompt budget: input_tokens caps the task/content text and
+# context_tokens caps the packed context snippets.
+# A backend of None means "use the analyzer's default backend".
+MODEL_ROUTES = {
+    'priority': {'backend': None, 'tier': 'small', 'max_tokens': 120, 'temperature': 0.0,
+                 'input_tokens': 300, 'context_tokens': 300},
+    'deadline': {'backend': None, 'tier': 'small', 'max_tokens': 100, 'temperature': 0.0,
+                 'input_tokens': 300, 'context_tokens': 0},
+    'tags': {'backend': None, 'tier': 'small', 'max_tokens': 80, 'temperature': 0.2,
+             'input_tokens': 300, 'context_tokens': 300},
+    'semantic': {'backend': None, 'tier': 'small', 'max_tokens': 200, 'temperature': 0.0,
+                 'input_tokens': 600, 'context_tokens': 0},
+    'enhance': {'backend': None, 'tier': 'large', 'max_tokens': 500, 'temperature': 0.7,
+                'input_tokens': 600, 'context_tokens': 600},
+}
+
+DEFAULT_PROMPT_TYPE = 'enhance'
+
+
+def get_route(prompt_type: str, default_backend: str = 'local') -> Dict:
+    """Resolve the backend, model, sampling settings and prompt budget for a prompt type.
+
+    Entries in ``settings.AI_MODEL_ROUTES`` override the built-in table per
+    prompt type, e.g. ``{'enhance': {'backend': 'openai', 'model': 'gpt-4o'}}``.
+    """
+    route = dict(MODEL_ROUTES.get(prompt_type, MODEL_ROUTES[DEFAULT_PROMPT_TYPE]))
+    route.update(getattr(settings, 'AI_MODEL_ROUTES', {}).get(prompt_type, {}))
+
+    backend: Optional[str] = route.get('backend') or default_backend
+    tier = route.get('tier', 'large')
+    if backend not in MODEL_TIERS['large']:
+        raise ImproperlyConfigured(
+            f"AI_MODEL_ROUTES[{prompt_type!r}]: unknown backend {backend!r}, expected one of {sorted(MODEL_TIERS['large'])}")
+    if not route.get('model') and tier not in MODEL_TIERS:
+        raise ImproperlyConfigured(
+            f"AI_MODEL_ROUTES[{prompt_type!r}]: unknown tier {tier!r}, expected one of {sorted(MODEL_TIERS)}")
+    model = route.get('model') or MODEL_TIERS[tier][backend]
+    return {
+        'prompt_type': prompt_type,
+        'backend': backend,
+        'model': model,
+        'max_tokens': route['max_tokens'],
+        'temperature': route['temperature'],
+        'input_tokens': route['input_tokens'],
+        'context_tokens': route['context_tokens'],
+    }
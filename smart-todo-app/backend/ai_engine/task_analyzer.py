@@ -4,14 +4,25 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Any
 from decouple import config
 import hashlib
+from django.conf import settings
 from django.core.cache import cache
+from .routing import get_route
+from .prompt_budget import estimate_tokens, truncate_to_tokens, pack_context, pack_terms, usage_stats
+from .recorder import PromptRecorder, RECORD_MODES
+from .prompts import PROMPTS, render_prompt
 
 class TaskAnalyzer:
-    def __init__(self, use_local_llm=True):
+    def __init__(self, use_local_llm=True, record_mode=None, record_dir=None):
         self.use_local_llm = use_local_llm
-        self.lm_studio_url = "http://localhost:1234/v1/chat/completions"
+        self.lm_studio_url = getattr(settings, 'LM_STUDIO_URL', 'http://localhost:1234').rstrip('/') + "/v1/chat/completions"
+        self.openai_url = getattr(settings, 'OPENAI_BASE_URL', 'https://api.openai.com').rstrip('/') + "/v1/chat/completions"
         self.openai_api_key = config('OPENAI_API_KEY', default='')
         self.cache_timeout = 60 * 10  # 10 minutes
+        # 'record' saves real prompt->response pairs to disk, 'replay' serves them back
+        self.record_mode = record_mode or getattr(settings, 'AI_RECORD_MODE', 'off')
+        if self.record_mode not in RECORD_MODES:
+            raise ValueError(f"AI record mode must be one of {RECORD_MODES}, got {self.record_mode!r}")
+        self.recorder = PromptRecorder(record_dir or getattr(settings, 'AI_RECORD_DIR', 'ai_recordings'))
         
     def _cache_key(self, prefix, *args):
         key_str = prefix + ':' + hashlib.sha256(str(args).encode()).hexdigest()
@@ -19,88 +30,116 @@ class TaskAnalyzer:
 
     def analyze_task_priority(self, task_data: Dict, context_data: List[Dict]) -> Dict:
         """Analyze task priority based on content and context"""
-        cache_key = self._cache_key('priority', task_data, context_data)
+        cache_key = self._cache_key(PROMPTS['priority'].version, task_data, context_data)
         cached = cache.get(cache_key)
         if cached:
             return cached
         prompt = self._build_priority_prompt(task_data, context_data)
-        
-        if self.use_local_llm:
-            response = self._query_local_llm(prompt)
-        else:
-            response = self._query_openai(prompt)
-            
+        response = self._query(prompt, 'priority')
         result = self._parse_priority_response(response)
         cache.set(cache_key, result, self.cache_timeout)
         return result
     
     def suggest_deadline(self, task_data: Dict, current_workload: int = 0) -> datetime:
         """Suggest realistic deadline for task"""
-        cache_key = self._cache_key('deadline', task_data, current_workload)
+        cache_key = self._cache_key(PROMPTS['deadline'].version, task_data, current_workload)
         cached = cache.get(cache_key)
         if cached:
             return cached
         prompt = self._build_deadline_prompt(task_data, current_workload)
-        
-        if self.use_local_llm:
-            response = self._query_local_llm(prompt)
-        else:
-            response = self._query_openai(prompt)
-            
+        response = self._query(prompt, 'deadline')
         result = self._parse_deadline_response(response)
         cache.set(cache_key, result, self.cache_timeout)
         return result
     
     def enhance_task_description(self, task_data: Dict, context_data: List[Dict]) -> str:
         """Enhance task description with context-aware details"""
-        cache_key = self._cache_key('enhance', task_data, context_data)
+        cache_key = self._cache_key(PROMPTS['enhance'].version, task_data, context_data)
         cached = cache.get(cache_key)
         if cached:
             return cached
         prompt = self._build_enhancement_prompt(task_data, context_data)
-        
-        if self.use_local_llm:
-            response = self._query_local_llm(prompt)
-        else:
-            response = self._query_openai(prompt)
-            
+        response = self._query(prompt, 'enhance')
         cache.set(cache_key, response, self.cache_timeout)
         return response.strip()
+
+    def suggest_tags(self, task_data: Dict, context_data: List[Dict], categories: List[str]) -> List[str]:
+        """Suggest category/tag names for a task from the known categories"""
+        cache_key = self._cache_key(PROMPTS['tags'].version, task_data, context_data, categories)
+        cached = cache.get(cache_key)
+        if cached:
+            return cached
+        prompt = self._build_tags_prompt(task_data, context_data, categories)
+        response = self._query(prompt, 'tags')
+        result = self._parse_tags_response(response)
+        cache.set(cache_key, result, self.cache_timeout)
+        return result
+
+    def extract_semantics(self, content: str) -> Dict:
+        """Extract entities, intent and schedule info from a context entry"""
+        cache_key = self._cache_key(PROMPTS['semantic'].version, content)
+        cached = cache.get(cache_key)
+        if cached:
+            return cached
+        prompt = self._build_semantic_prompt(content)
+        response = self._query(prompt, 'semantic')
+        result = self._parse_semantic_response(response)
+        cache.set(cache_key, result, self.cache_timeout)
+        return result
+
+    def _query(self, prompt: str, prompt_type: str) -> str:
+        """Send a prompt to the backend and model routed for its prompt type"""
+        route = get_route(prompt_type, default_backend='local' if self.use_local_llm else 'openai')
+        if self.record_mode == 'replay':
+            recording = self.recorder.load(route, prompt)
+            if recording is None:
+                return f"Error: no recorded response for {prompt_type} prompt {self.recorder.key(route, prompt)}"
+            usage_stats.record(prompt_type, estimate_tokens(prompt), estimate_tokens(recording['response']))
+            return recording['response']
+
+        if route['backend'] == 'openai':
+            response = self._query_openai(prompt, route)
+        else:
+            response = self._query_local_llm(prompt, route)
+
+        if self.record_mode == 'record' and not response.startswith('Error') and response != "OpenAI API key not configured":
+            self.recorder.save(route, prompt, response)
+        return response
     
-    def _query_local_llm(self, prompt: str) -> str:
+    def _query_local_llm(self, prompt: str, route: Dict) -> str:
         """Query local LLM via LM Studio"""
         try:
             payload = {
-                "model": "local-model",
+                "model": route['model'],
                 "messages": [
-                    {"role": "system", "content": "You are an AI assistant specialized in task management and productivity."},
+                    {"role": "system", "content": render_prompt('system')},
                     {"role": "user", "content": prompt}
                 ],
-                "temperature": 0.7,
-                "max_tokens": 500
+                "temperature": route['temperature'],
+                "max_tokens": route['max_tokens']
             }
             
             response = requests.post(self.lm_studio_url, json=payload, timeout=30)
             response.raise_for_status()
             
-            return response.json()['choices'][0]['message']['content']
+            return self._completion_content(route, prompt, response.json())
         except Exception as e:
             return f"Error querying local LLM: {str(e)}"
     
-    def _query_openai(self, prompt: str) -> str:
+    def _query_openai(self, prompt: str, route: Dict) -> str:
         """Query OpenAI API"""
         try:
             if not self.openai_api_key:
                 return "OpenAI API key not configured"
                 
             payload = {
-                "model": "gpt-3.5-turbo",
+                "model": route['model'],
                 "messages": [
-                    {"role": "system", "content": "You are an AI assistant specialized in task management and productivity."},
+                    {"role": "system", "content": render_prompt('system')},
                     {"role": "user", "content": prompt}
                 ],
-                "temperature": 0.7,
-                "max_tokens": 500
+                "temperature": route['temperature'],
+                "max_tokens": route['max_tokens']
             }
             
             headers = {
@@ -109,84 +148,76 @@ class TaskAnalyzer:
             }
             
             response = requests.post(
-                "https://api.openai.com/v1/chat/completions",
+                self.openai_url,
                 json=payload,
                 headers=headers,
                 timeout=30
             )
             response.raise_for_status()
             
-            return response.json()['choices'][0]['message']['content']
+            return self._completion_content(route, prompt, response.json())
         except Exception as e:
             return f"Error querying OpenAI: {str(e)}"
     
+    def _completion_content(self, route: Dict, prompt: str, data: Dict) -> str:
+        """Extract the completion text and record prompt/completion sizes"""
+        content = data['choices'][0]['message']['content']
+        usage_stats.record(route['prompt_type'], estimate_tokens(prompt), estimate_tokens(content), data.get('usage'))
+        return content
+    
+    def _context_summary(self, task_data: Dict, context_data: List[Dict], prompt_type: str) -> str:
+        """Pack the most relevant recent context into the prompt type's token budget"""
+        query_text = f"{task_data.get('title', '')} {task_data.get('description', '')}"
+        snippets = pack_context(context_data, get_route(prompt_type)['context_tokens'], query_text)
+        return "\n".join([f"- {snippet}" for snippet in snippets])
+    
+    def _description(self, task_data: Dict, prompt_type: str) -> str:
+        """Task description truncated to the prompt type's input budget"""
+        return truncate_to_tokens(task_data.get('description', ''), get_route(prompt_type)['input_tokens'])
+    
     def _build_priority_prompt(self, task_data: Dict, context_data: List[Dict]) -> str:
         """Build prompt for priority analysis"""
-        context_summary = "\n".join([f"- {ctx['content'][:100]}..." for ctx in context_data[-5:]])
-        
-        return f"""
-        Analyze the priority of this task based on the context provided.
-        
-        Task: {task_data.get('title', '')}
-        Description: {task_data.get('description', '')}
-        Category: {task_data.get('category', 'General')}
-        
-        Recent Context:
-        {context_summary}
-        
-        Return a JSON response with:
-        - priority_score (0-10 float)
-        - priority_level (1-4 integer: 1=Low, 2=Medium, 3=High, 4=Critical)
-        - reasoning (brief explanation)
-        
-        Format: {{"priority_score": 7.5, "priority_level": 3, "reasoning": "High priority due to..."}}
-        """
+        return render_prompt(
+            'priority',
+            title=task_data.get('title', ''),
+            description=self._description(task_data, 'priority'),
+            category=task_data.get('category', 'General'),
+            context=self._context_summary(task_data, context_data, 'priority'),
+        )
     
     def _build_deadline_prompt(self, task_data: Dict, current_workload: int) -> str:
         """Build prompt for deadline suggestion"""
-        return f"""
-        Suggest a realistic deadline for this task based on its complexity and current workload.
-        
-        Task: {task_data.get('title', '')}
-        Description: {task_data.get('description', '')}
-        Category: {task_data.get('category', 'General')}
-        Current Workload: {current_workload} active tasks
-        
-        Consider:
-        - Task complexity and scope
-        - Current workload
-        - Task urgency and importance
-        - Realistic time estimates
-        
-        Return a JSON response with:
-        - suggested_deadline (ISO format: YYYY-MM-DD HH:MM:SS)
-        - reasoning (brief explanation)
-        
-        Format: {{"suggested_deadline": "2024-01-15 17:00:00", "reasoning": "Based on task complexity..."}}
-        """
+        return render_prompt(
+            'deadline',
+            title=task_data.get('title', ''),
+            description=self._description(task_data, 'deadline'),
+            category=task_data.get('category', 'General'),
+            workload=current_workload,
+        )
     
     def _build_enhancement_prompt(self, task_data: Dict, context_data: List[Dict]) -> str:
         """Build prompt for task description enhancement"""
-        context_summary = "\n".join([f"- {ctx['content'][:100]}..." for ctx in context_data[-5:]])
-        
-        return f"""
-        Enhance this task description with context-aware details and actionable insights.
-        
-        Original Task: {task_data.get('title', '')}
-        Original Description: {task_data.get('description', '')}
-        Category: {task_data.get('category', 'General')}
-        
-        Recent Context:
-        {context_summary}
-        
-        Provide an enhanced description that includes:
-        - More specific details and requirements
-        - Context-aware considerations
-        - Potential challenges or dependencies
-        - Suggested approach or steps
-        
-        Return only the enhanced description text, no JSON formatting.
-        """
+        return render_prompt(
+            'enhance',
+            title=task_data.get('title', ''),
+            description=self._description(task_data, 'enhance'),
+            category=task_data.get('category', 'General'),
+            context=self._context_summary(task_data, context_data, 'enhance'),
+        )
+    
+    def _build_tags_prompt(self, task_data: Dict, context_data: List[Dict], categories: List[str]) -> str:
+        """Build prompt for multi-tag suggestion"""
+        return render_prompt(
+            'tags',
+            title=task_data.get('title', ''),
+            description=self._description(task_data, 'tags'),
+            context=self._context_summary(task_data, context_data, 'tags'),
+            categories=pack_terms(list(categories), get_route('tags')['input_tokens']),
+        )
+    
+    def _build_semantic_prompt(self, content: str) -> str:
+        """Build prompt for entity, intent and schedule extraction"""
+        return render_prompt('semantic', content=truncate_to_tokens(content, get_route('semantic')['input_tokens']))
     
     def _parse_priority_response(self, response: str) -> Dict:
         """Parse LLM response for priority analysis"""
@@ -213,4 +244,20 @@ class TaskAnalyzer:
             return datetime.fromisoformat(deadline_str.replace('Z', '+00:00'))
         except:
             # Default to 7 days from now
-            return datetime.now() + timedelta(days=7) 
\ No newline at end of file
+            return datetime.now() + timedelta(days=7) 
+    
+    def _parse_tags_response(self, response: str) -> List[str]:
+        """Parse LLM response for tag suggestion"""
+        try:
+            tags = json.loads(response[response.find('['):response.rfind(']') + 1])
+            tags = [str(tag).strip() for tag in tags if str(tag).strip()]
+            return tags or ['General']
+        except:
+            return ['General']
+    
+    def _parse_semantic_response(self, response: str) -> Dict:
+        """Parse LLM response for semantic extraction"""
+        try:
+            return json.loads(response[response.find('{'):response.rfind('}') + 1])
+        except:
+            return {'entities': [], 'intent': '', 'schedule': ''}
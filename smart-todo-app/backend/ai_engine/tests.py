@@ -1,3 +1,164 @@
-from django.test import TestCase
+import tempfile
+from unittest import mock
+from django.test import TestCase, override_settings
+from .routing import get_route
+from .task_analyzer import TaskAnalyzer
+from .prompt_budget import estimate_tokens, truncate_to_tokens, pack_context, usage_stats
+from .fake_llm import FakeLLMConfig, start_in_thread
+from .prompts import PromptTemplate, get_prompt, render_prompt
 
-# Create your tests here.
+
+class ModelRoutingTestCase(TestCase):
+    def test_classification_prompts_use_small_low_token_routes(self):
+        enhance = get_route('enhance')
+        for prompt_type in ['priority', 'deadline', 'tags', 'semantic']:
+            route = get_route(prompt_type)
+            self.assertLess(route['max_tokens'], enhance['max_tokens'])
+            self.assertLess(route['temperature'], enhance['temperature'])
+
+    def test_default_backend_follows_analyzer(self):
+        self.assertEqual(get_route('priority', default_backend='openai')['backend'], 'openai')
+        self.assertEqual(get_route('priority')['backend'], 'local')
+
+    @override_settings(AI_MODEL_ROUTES={'enhance': {'backend': 'openai', 'model': 'gpt-4o', 'max_tokens': 800}})
+    def test_settings_override_route(self):
+        route = get_route('enhance')
+        self.assertEqual(route['backend'], 'openai')
+        self.assertEqual(route['model'], 'gpt-4o')
+        self.assertEqual(route['max_tokens'], 800)
+
+    def test_misconfigured_route_names_the_setting(self):
+        from django.core.exceptions import ImproperlyConfigured
+        for override in ({'backend': 'anthropic'}, {'tier': 'medium'}):
+            with override_settings(AI_MODEL_ROUTES={'tags': override}):
+                with self.assertRaisesMessage(ImproperlyConfigured, "AI_MODEL_ROUTES['tags']"):
+                    get_route('tags')
+        with override_settings(AI_MODEL_ROUTES={'tags': {'tier': 'medium', 'model': 'custom'}}):
+            self.assertEqual(get_route('tags')['model'], 'custom')
+
+    def test_analyzer_sends_routed_payload(self):
+        analyzer = TaskAnalyzer(use_local_llm=True)
+        with mock.patch('ai_engine.task_analyzer.requests.post') as post:
+            post.return_value.json.return_value = {'choices': [{'message': {'content': '["Work"]'}}]}
+            tags = analyzer.suggest_tags({'title': 'Routing test'}, [], ['Work'])
+        payload = post.call_args.kwargs['json']
+        self.assertEqual(tags, ['Work'])
+        self.assertEqual(payload['max_tokens'], get_route('tags')['max_tokens'])
+        self.assertEqual(payload['temperature'], get_route('tags')['temperature'])
+
+
+class PromptBudgetTestCase(TestCase):
+    def test_truncate_respects_budget(self):
+        text = 'word ' * 1000
+        self.assertLessEqual(estimate_tokens(truncate_to_tokens(text, 50)), 50)
+        self.assertEqual(truncate_to_tokens('short', 50), 'short')
+
+    def test_pack_context_prefers_relevant_entries_within_budget(self):
+        context_data = [
+            {'content': 'Lunch menu for the office party ' * 20},
+            {'content': 'Quarterly report deadline moved to Friday'},
+            {'content': 'Gym membership renewal reminder ' * 20},
+        ]
+        snippets = pack_context(context_data, 40, query_text='Finish quarterly report')
+        self.assertIn('Quarterly report deadline moved to Friday', snippets)
+        self.assertLessEqual(sum(estimate_tokens(s) + 1 for s in snippets), 40)
+
+    def test_prompts_stay_bounded_for_huge_context(self):
+        analyzer = TaskAnalyzer()
+        huge = [{'content': 'email body ' * 5000} for _ in range(20)]
+        task_data = {'title': 'Reply', 'description': 'details ' * 5000}
+        for prompt_type, prompt in [
+            ('priority', analyzer._build_priority_prompt(task_data, huge)),
+            ('enhance', analyzer._build_enhancement_prompt(task_data, huge)),
+            ('tags', analyzer._build_tags_prompt(task_data, huge, ['Work'])),
+        ]:
+            route = get_route(prompt_type)
+            self.assertLess(estimate_tokens(prompt), route['input_tokens'] + route['context_tokens'] + 300)
+
+    def test_usage_is_recorded(self):
+        usage_stats.reset()
+        analyzer = TaskAnalyzer()
+        with mock.patch('ai_engine.task_analyzer.requests.post') as post:
+            post.return_value.json.return_value = {
+                'choices': [{'message': {'content': '{"priority_score": 8, "priority_level": 3}'}}],
+                'usage': {'prompt_tokens': 42, 'completion_tokens': 7},
+            }
+            analyzer.analyze_task_priority({'title': 'Usage test'}, [])
+        stats = usage_stats.snapshot()['priority']
+        self.assertEqual(stats['calls'], 1)
+        self.assertEqual(stats['prompt_tokens'], 42)
+        self.assertEqual(stats['completion_tokens'], 7)
+
+
+class FakeLLMTestCase(TestCase):
+    def setUp(self):
+        self.server = start_in_thread()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v1/chat/completions"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def analyzer(self, **kwargs):
+        analyzer = TaskAnalyzer(use_local_llm=True, **kwargs)
+        analyzer.lm_studio_url = self.url
+        return analyzer
+
+    def test_fake_server_answers_each_prompt_type(self):
+        analyzer = self.analyzer()
+        task_data = {'title': 'Fake server task', 'description': 'Check canned responses'}
+        self.assertEqual(analyzer._parse_priority_response(analyzer._query(analyzer._build_priority_prompt(task_data, []), 'priority'))['priority_score'], 6.5)
+        self.assertEqual(analyzer._parse_tags_response(analyzer._query(analyzer._build_tags_prompt(task_data, [], ['Work']), 'tags')), ['Work', 'Planning'])
+        self.assertIn('Fake server task', analyzer._query(analyzer._build_enhancement_prompt(task_data, []), 'enhance'))
+
+    def test_latency_and_errors_are_deterministic_per_prompt(self):
+        config = FakeLLMConfig(latency='normal', latency_ms=50, jitter_ms=10, error_rate=0.5, seed=7)
+        first = [(config.sample_latency(config.rng_for(p)), config.rng_for(p).random()) for p in ['a', 'b', 'c']]
+        second = [(config.sample_latency(config.rng_for(p)), config.rng_for(p).random()) for p in ['a', 'b', 'c']]
+        self.assertEqual(first, second)
+
+    def test_injected_errors_fall_back_to_defaults(self):
+        self.server.RequestHandlerClass.config = FakeLLMConfig(error_rate=1.0)
+        analyzer = self.analyzer()
+        prompt = analyzer._build_priority_prompt({'title': 'Error task'}, [])
+        self.assertEqual(analyzer._parse_priority_response(analyzer._query(prompt, 'priority'))['priority_score'], 5.0)
+
+    def test_record_then_replay_without_network(self):
+        with tempfile.TemporaryDirectory() as record_dir:
+            prompt = self.analyzer()._build_enhancement_prompt({'title': 'Recorded task'}, [])
+            recorded = self.analyzer(record_mode='record', record_dir=record_dir)._query(prompt, 'enhance')
+
+            replayer = TaskAnalyzer(record_mode='replay', record_dir=record_dir)
+            with mock.patch('ai_engine.task_analyzer.requests.post') as post:
+                self.assertEqual(replayer._query(prompt, 'enhance'), recorded)
+                self.assertTrue(replayer._query('unrecorded prompt', 'enhance').startswith('Error'))
+            post.assert_not_called()
+
+
+class PromptRegistryTestCase(TestCase):
+    def test_templates_are_whitespace_normalized(self):
+        prompt = render_prompt('priority', title='T', description='D', category='C', context='- ctx')
+        self.assertFalse(any(line != line.strip() for line in prompt.splitlines()))
+        self.assertNotIn('\n\n\n', prompt)
+        self.assertIn('{"priority_score": 7.5', prompt)
+
+    def test_version_changes_with_text(self):
+        first = PromptTemplate('sample', 1, 'Hello {name}')
+        edited = PromptTemplate('sample', 1, 'Hello there {name}')
+        self.assertNotEqual(first.version, edited.version)
+        self.assertEqual(first.version, PromptTemplate('sample', 1, '  Hello {name}  ').version)
+        self.assertTrue(get_prompt('tags').version.startswith('tags.v1.'))
+
+    def test_render_fills_fields(self):
+        template = PromptTemplate('sample', 1, 'Hello {name}, {{"n": {name}}} {spare}')
+        self.assertEqual(template.render(name='Ann', spare='!', unused='x'), 'Hello Ann, {"n": Ann} !')
+        with self.assertRaises(KeyError):
+            template.render(name='Ann')
+        for text in ('{name!r}', '{name:>5}', '{user.name}', '{class}'):
+            with self.assertRaises(ValueError):
+                PromptTemplate('sample', 1, text)
+
+    def test_analyzer_builds_prompts_from_registry(self):
+        analyzer = TaskAnalyzer()
+        prompt = analyzer._build_semantic_prompt('Lunch with Bob on Friday')
+        self.assertEqual(prompt, render_prompt('semantic', content='Lunch with Bob on Friday'))
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for the AI endpoints.
+
+Starts the bundled fake LLM server (or replays recorded responses with
+--replay) so runs are deterministic and need no LM Studio or OpenAI access.
+
+    python benchmarks/bench_ai_endpoints.py --latency_ms 50 --jitter_ms 10 --repeat 50
+"""
+
+import argparse
+
+from common import setup_django, create_test_database, destroy_test_database, timed, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--latency', default='normal')
+    parser.add_argument('--latency_ms', type=float, default=20.0)
+    parser.add_argument('--jitter_ms', type=float, default=5.0)
+    parser.add_argument('--error_rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--replay', metavar='DIR', help='Replay recorded responses from DIR instead of the fake server.')
+    parser.add_argument('--warm_cache', action='store_true', help='Keep the AI response cache between calls.')
+    args = parser.parse_args()
+
+    server = None
+    if args.replay:
+        setup_django(AI_RECORD_MODE='replay', AI_RECORD_DIR=args.replay)
+    else:
+        setup_django()
+        from ai_engine import ai_manager
+        from ai_engine.fake_llm import FakeLLMConfig, start_in_thread
+        server = start_in_thread(config=FakeLLMConfig(
+            latency=args.latency, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+            error_rate=args.error_rate, seed=args.seed,
+        ))
+        ai_manager.use_local_llm = True
+        ai_manager.lm_studio_url = f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions"
+
+    old_name = create_test_database()
+    try:
+        from django.core.cache import cache
+        from rest_framework.test import APIClient
+        from tasks.models import Task, Category
+        from tasks.views import AIPostThrottle
+
+        # Benchmarks measure the endpoints, not the rate limiter
+        AIPostThrottle.allow_request = lambda self, request, view: True
+
+        category = Category.objects.create(name='Work')
+        task = Task.objects.create(title='Prepare quarterly report', description='Collect numbers and draft slides',
+                                   category=category)
+        client = APIClient()
+
+        endpoints = [
+            ('enhance_description', f'/api/tasks/{task.id}/enhance_description/'),
+            ('suggest_deadline', f'/api/tasks/{task.id}/suggest_deadline/'),
+            ('suggest_category', f'/api/tasks/{task.id}/suggest_category/'),
+            ('ai_pipeline', f'/api/tasks/{task.id}/ai_pipeline/'),
+        ]
+        for label, url in endpoints:
+            def call():
+                if not args.warm_cache:
+                    cache.clear()
+                response = client.post(url, {}, format='json')
+                assert response.status_code == 200, response.status_code
+            report(label, timed(call, args.repeat))
+    finally:
+        destroy_test_database(old_name)
+        if server:
+            server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
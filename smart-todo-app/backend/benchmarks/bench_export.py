@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Streaming export: time and peak Python memory of /api/tasks/export/ per
+output format at growing table sizes, against walking every page of the
+list API. Peak memory should stay flat as the table grows.
+
+    python benchmarks/bench_export.py --rows 10000 100000
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from common import setup_django, create_test_database, destroy_test_database
+from bench_search import load_tasks
+
+
+def measure(fn):
+    """Wall time of an untraced run, then peak allocated memory of a traced one"""
+    start = time.perf_counter()
+    size = fn()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    setup_django()
+    old_name = create_test_database()
+    try:
+        from rest_framework.test import APIClient
+        from smart_todo import export
+        from tasks.models import Task
+
+        client = APIClient()
+        outputs = ['ndjson', 'csv'] + (['parquet', 'arrow'] if export.pyarrow else [])
+
+        def stream(output):
+            response = client.get('/api/tasks/export/', {'output': output})
+            return sum(len(part) for part in response.streaming_content)
+
+        def pages():
+            size, url = 0, '/api/tasks/?page_size=100'
+            while url:
+                response = client.get(url)
+                size += len(response.content)
+                url = response.data['next']
+            return size
+
+        loaded = 0
+        for rows in sorted(args.rows):
+            print(f"Loading up to {rows} tasks...")
+            load_tasks(rows - loaded, args.seed + loaded)
+            loaded = rows
+            assert Task.objects.count() == rows
+            for label, fn in [(f'export {output}', lambda output=output: stream(output)) for output in outputs] + [
+                    ('list pages of 100', pages)]:
+                elapsed, peak, size = measure(fn)
+                print(f"{label:<20} rows={rows:<8} {elapsed:8.2f}s peak={peak / 2**20:8.1f}MiB "
+                      f"body={size / 2**20:8.1f}MiB")
+    finally:
+        destroy_test_database(old_name)
+
+
+if __name__ == '__main__':
+    main()
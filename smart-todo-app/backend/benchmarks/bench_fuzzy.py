@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Latency of the in-memory trigram index behind /api/tasks/fuzzy_search/.
+
+Loads ``--rows`` tasks whose titles draw from a Zipf-distributed vocabulary
+of everyday words plus random made-up words, then times misspelled queries
+against the index alone and end to end.
+
+    python benchmarks/bench_fuzzy.py --rows 100000 --repeat 50
+"""
+
+import argparse
+import itertools
+import random
+import string
+import time
+
+from common import setup_django, create_test_database, destroy_test_database, timed, report
+from bench_search import WORDS as SEARCH_WORDS
+
+COMMON_WORDS = [word for word in SEARCH_WORDS if not word.startswith('term')]
+
+
+def vocabulary(rng, size=20000):
+    words = list(COMMON_WORDS)
+    while len(words) < size:
+        words.append(''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10))))
+    return words
+
+
+def misspell(rng, word):
+    """Swap two adjacent letters"""
+    i = rng.randrange(len(word) - 1)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def load_tasks(rows, rng):
+    from django.db import connection, transaction
+    from django.utils import timezone
+
+    words = vocabulary(rng)
+    cumulative_weights = list(itertools.accumulate(1 / rank for rank in range(1, len(words) + 1)))
+    now = connection.ops.adapt_datetimefield_value(timezone.now())  # as the ORM stores it
+    sql = ('INSERT INTO tasks_task (title, description, priority_score, priority, status, '
+           'ai_enhanced_description, context_tags, ai_enrichment_pending, version, effective_priority_score, '
+           'recurrence_rule, created_at, updated_at) '
+           "VALUES (%s, '', 0, 2, 'pending', '', '[]', FALSE, 0, 0, '', %s, %s)")
+    with transaction.atomic(), connection.cursor() as cursor:
+        for start in range(0, rows, 10000):
+            cursor.executemany(sql, [
+                (' '.join(rng.choices(words, cum_weights=cumulative_weights, k=4)).capitalize(), now, now)
+                for _ in range(start, min(start + 10000, rows))
+            ])
+    return words
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    setup_django()
+    old_name = create_test_database()
+    try:
+        from rest_framework.test import APIClient
+        from tasks import fuzzy
+
+        rng = random.Random(args.seed)
+        print(f"Loading {args.rows} tasks...")
+        words = load_tasks(args.rows, rng)
+        queries = ['reprot', 'budgte reveiw', 'onbaording', 'dentsit apointment']
+        queries += [misspell(rng, word) for word in rng.sample(words[len(COMMON_WORDS):2000], 3)]
+        start = time.perf_counter()
+        fuzzy.task_titles.ensure_loaded()
+        print(f"Index built in {(time.perf_counter() - start) * 1000:.0f}ms, "
+              f"{len(fuzzy.task_titles.postings)} distinct trigrams")
+
+        client = APIClient()
+        for query in queries:
+            report(f"index  {query}", timed(lambda: fuzzy.task_titles.search(query, 20), args.repeat))
+            report(f"api    {query}",
+                   timed(lambda: client.get('/api/tasks/fuzzy_search/', {'q': query}), args.repeat))
+    finally:
+        destroy_test_database(old_name)
+
+
+if __name__ == '__main__':
+    main()
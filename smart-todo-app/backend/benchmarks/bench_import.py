@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Bulk task import through /api/tasks/import/ (NDJSON and CSV), against the
+one-POST-per-task baseline (with AI enhancement mocked out, so the baseline
+only measures the per-request cost).
+
+    python benchmarks/bench_import.py --rows 100000 --baseline_rows 1000
+"""
+
+import argparse
+import csv
+import io
+import json
+import random
+import time
+from unittest import mock
+
+from common import setup_django, create_test_database, destroy_test_database
+
+CATEGORIES = ['Work', 'Personal', 'Health', 'Finance', 'Errands', 'Learning']
+STATUSES = ['pending', 'in_progress', 'completed']
+
+
+def make_rows(rows, seed):
+    rng = random.Random(seed)
+    for i in range(rows):
+        yield {
+            'title': f'Imported task {i}',
+            'description': f'Description for imported task {i}',
+            'category': rng.choice(CATEGORIES),
+            'priority': rng.randint(1, 4),
+            'status': rng.choice(STATUSES),
+            'deadline': f'2030-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T09:00:00Z',
+            'context_tags': ['imported'],
+        }
+
+
+def ndjson_body(rows, seed):
+    return ''.join(json.dumps(row) + '\n' for row in make_rows(rows, seed)).encode('utf-8')
+
+
+def csv_body(rows, seed):
+    out = io.StringIO()
+    writer = csv.DictWriter(out, ['title', 'description', 'category', 'priority', 'status', 'deadline', 'context_tags'])
+    writer.writeheader()
+    for row in make_rows(rows, seed):
+        writer.writerow({**row, 'context_tags': ';'.join(row['context_tags'])})
+    return out.getvalue().encode('utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--baseline_rows', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    setup_django()
+    old_name = create_test_database()
+    try:
+        from rest_framework.test import APIClient
+        from tasks.models import Task
+
+        client = APIClient()
+        for label, content_type, body in [
+            ('NDJSON', 'application/x-ndjson', ndjson_body(args.rows, args.seed)),
+            ('CSV', 'text/csv', csv_body(args.rows, args.seed)),
+        ]:
+            Task.objects.all().delete()
+            start = time.perf_counter()
+            response = client.generic('POST', '/api/tasks/import/', body, content_type=content_type)
+            elapsed = time.perf_counter() - start
+            print(f"import {label:<7} rows={response.data['created']:<8} {elapsed:8.2f}s "
+                  f"{response.data['created'] / elapsed:10.0f} rows/s")
+
+        Task.objects.all().delete()
+        with mock.patch('tasks.serializers.TaskSerializer._enhance_task_with_ai'):
+            start = time.perf_counter()
+            for row in make_rows(args.baseline_rows, args.seed):
+                client.post('/api/tasks/', {**row, 'category': None}, format='json')
+            elapsed = time.perf_counter() - start
+        print(f"POST each      rows={args.baseline_rows:<8} {elapsed:8.2f}s "
+              f"{args.baseline_rows / elapsed:10.0f} rows/s (AI enhancement mocked out)")
+    finally:
+        destroy_test_database(old_name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Query plans and timings for the hot task/context queries with and without
+the composite and partial indexes declared on Task and ContextEntry.
+
+Loads ``--rows`` tasks and context entries into a throwaway database, runs
+every query with the indexes dropped, then again with them recreated, and
+prints EXPLAIN output plus timings for both.
+
+    python benchmarks/bench_indexes.py --rows 1000000 --repeat 20
+"""
+
+import argparse
+import random
+from datetime import timedelta
+
+from common import setup_django, create_test_database, destroy_test_database, timed, report
+
+OPEN = ['pending', 'in_progress']
+
+
+def load_rows(rows, seed):
+    from django.db import connection, transaction
+    from django.utils import timezone
+    from tasks.models import Task
+    from context.models import ContextEntry
+
+    rng = random.Random(seed)
+    now = timezone.now()
+    statuses = ['completed'] * 7 + ['pending'] * 2 + ['in_progress']
+    sources = [choice for choice, _ in ContextEntry.SOURCE_CHOICES]
+    task_columns = ['title', 'description', 'priority_score', 'priority', 'deadline', 'status',
+                    'ai_enhanced_description', 'context_tags', 'ai_enrichment_pending', 'version',
+                    'effective_priority_score', 'effective_deadline', 'recurrence_rule', 'created_at', 'updated_at']
+    # Raw inserts must store datetimes the way the ORM does (naive UTC on SQLite)
+    adapt = connection.ops.adapt_datetimefield_value
+    context_columns = ['content', 'source_type', 'processed_insights', 'keywords', 'sentiment_score',
+                       'importance_score', 'created_at', 'processed_at']
+
+    def insert(model, columns, make_row, batch=10000):
+        sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            model._meta.db_table, ', '.join(columns), ', '.join(['%s'] * len(columns)))
+        with transaction.atomic(), connection.cursor() as cursor:
+            for start in range(0, rows, batch):
+                cursor.executemany(sql, [make_row(i) for i in range(start, min(start + batch, rows))])
+
+    def task_row(i):
+        created = now - timedelta(seconds=rng.randrange(2 * 365 * 86400))
+        deadline = None if rng.random() < 0.1 else now + timedelta(hours=rng.randrange(-60 * 24, 60 * 24))
+        # One decimal place gives many ties on priority_score, like real AI scores
+        score = round(rng.uniform(0, 10), 1)
+        return (f'Task {i}', '', score, rng.randint(1, 4), adapt(deadline), rng.choice(statuses), '', '[]', False, 0,
+                score, adapt(deadline), '', adapt(created), adapt(created))
+
+    def context_row(i):
+        created = now - timedelta(seconds=rng.randrange(2 * 365 * 86400))
+        processed = None if rng.random() < 0.02 else created
+        return (f'Context entry {i}', rng.choice(sources), '{}', '[]', rng.random(),
+                round(rng.betavariate(2, 5), 3), adapt(created), adapt(processed))
+
+    insert(Task, task_columns, task_row)
+    insert(ContextEntry, context_columns, context_row)
+
+
+def hot_queries():
+    """The querysets the list views and actions issue, keyed by label"""
+    from django.utils import timezone
+    from smart_todo.pagination import TaskKeysetPagination
+    from tasks.models import Task
+    from context.models import ContextEntry, HIGH_IMPORTANCE_THRESHOLD
+
+    now = timezone.now()
+    start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    task_order = ('-priority_score', '-created_at', 'id')
+    context_order = ('-created_at', 'id')
+    # The cursor condition for a page roughly in the middle of the task list
+    paginator = TaskKeysetPagination()
+    paginator.model = Task
+    terms = paginator.get_ordering(None, Task.objects.all(), None)
+    mid = Task.objects.order_by(*task_order)[Task.objects.count() // 2]
+    after_mid = paginator._after(terms, [getattr(mid, name) for name, _, _, _ in terms])
+    return {
+        'tasks list page 1': Task.objects.order_by(*task_order),
+        'tasks list middle page': Task.objects.filter(after_mid).order_by(*task_order),
+        'tasks overdue': Task.objects.filter(deadline__lt=now, status__in=OPEN).order_by(*task_order),
+        'tasks today': Task.objects.filter(deadline__gte=start_of_day, deadline__lt=start_of_day + timedelta(days=1),
+                                           status__in=OPEN).order_by(*task_order),
+        'tasks high_priority': Task.objects.filter(priority__in=[3, 4], status__in=OPEN).order_by(*task_order),
+        'context list page 1': ContextEntry.objects.order_by(*context_order),
+        'context unprocessed': ContextEntry.objects.filter(processed_at__isnull=True).order_by(*context_order),
+        'context high_importance': ContextEntry.objects.filter(
+            importance_score__gte=HIGH_IMPORTANCE_THRESHOLD).order_by(*context_order),
+        'context by_source': ContextEntry.objects.filter(source_type='email').order_by(*context_order),
+    }
+
+
+def set_indexes(enabled):
+    from django.db import connection
+    from tasks.models import Task
+    from context.models import ContextEntry
+
+    with connection.schema_editor() as editor:
+        for model in (Task, ContextEntry):
+            for index in model._meta.indexes:
+                if enabled:
+                    editor.add_index(model, index)
+                else:
+                    editor.remove_index(model, index)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+def run(label, page_size, repeat, explain):
+    print(f"\n== {label} ==")
+    for name, queryset in hot_queries().items():
+        page = queryset[:page_size + 1]
+        if explain:
+            print(f"-- {name}\n{page.explain()}")
+        report(name, timed(lambda: list(page.all()), repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--page_size', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no_explain', action='store_true')
+    args = parser.parse_args()
+
+    setup_django()
+    old_name = create_test_database()
+    try:
+        print(f"Loading {args.rows} tasks and {args.rows} context entries...")
+        load_rows(args.rows, args.seed)
+        set_indexes(False)
+        run('without indexes', args.page_size, args.repeat, not args.no_explain)
+        set_indexes(True)
+        run('with indexes', args.page_size, args.repeat, not args.no_explain)
+    finally:
+        destroy_test_database(old_name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for prompt rendering.
+
+Compares the registry's normalized templates with the indented f-strings
+they replaced, and reports the token savings from whitespace normalization.
+
+    python benchmarks/bench_prompt_render.py --repeat 100000
+"""
+
+import argparse
+import timeit
+
+from common import setup_django
+
+
+def legacy_priority_prompt(title, description, category, context):
+    return f"""
+        Analyze the priority of this task based on the context provided.
+        
+        Task: {title}
+        Description: {description}
+        Category: {category}
+        
+        Recent Context:
+        {context}
+        
+        Return a JSON response with:
+        - priority_score (0-10 float)
+        - priority_level (1-4 integer: 1=Low, 2=Medium, 3=High, 4=Critical)
+        - reasoning (brief explanation)
+        
+        Format: {{"priority_score": 7.5, "priority_level": 3, "reasoning": "High priority due to..."}}
+        """
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=100000)
+    args = parser.parse_args()
+
+    setup_django()
+    from ai_engine.prompts import get_prompt, render_prompt
+    from ai_engine.prompt_budget import estimate_tokens
+
+    values = {
+        'title': 'Prepare quarterly report',
+        'description': 'Collect numbers from finance and draft the slides',
+        'category': 'Work',
+        'context': '- Review meeting moved to Friday\n- CEO wants the funding slide first',
+    }
+    template = get_prompt('priority')
+
+    for label, fn in [
+        ('legacy f-string', lambda: legacy_priority_prompt(**values)),
+        ('registry render_prompt()', lambda: render_prompt('priority', **values)),
+        ('registry template.render()', lambda: template.render(**values)),
+    ]:
+        seconds = timeit.timeit(fn, number=args.repeat)
+        print(f"{label:<30} {seconds / args.repeat * 1e6:8.3f}us/render  "
+              f"{estimate_tokens(fn()):4d} est. tokens")
+    print(f"template version: {template.version}")
+
+
+if __name__ == '__main__':
+    main()
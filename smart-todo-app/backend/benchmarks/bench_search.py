@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Task search: ``?search=`` (LIKE '%term%' via SearchFilter) against the
+ranked full-text ``search`` action.
+
+    python benchmarks/bench_search.py --rows 1000000 --repeat 20
+"""
+
+import argparse
+import itertools
+import random
+
+from common import setup_django, create_test_database, destroy_test_database, timed, report
+
+# Zipf-distributed vocabulary: a few named words are very common, most are rare
+WORDS = ('report review meeting budget client invoice deploy release design draft email call plan '
+         'schedule research hiring onboarding roadmap backlog sprint retro fix bug test docs migrate '
+         'database server laptop groceries dentist gym travel flight hotel birthday gift').split()
+WORDS += [f'term{i}' for i in range(20000)]
+WEIGHTS = [1 / rank for rank in range(1, len(WORDS) + 1)]
+QUERIES = ['report', 'budget review', 'term50', 'term500 deploy', 'term5000', 'term19999 term19998']
+
+
+def load_tasks(rows, seed):
+    from django.db import connection, transaction
+    from django.utils import timezone
+
+    rng = random.Random(seed)
+    now = connection.ops.adapt_datetimefield_value(timezone.now())  # as the ORM stores it
+    cumulative_weights = list(itertools.accumulate(WEIGHTS))
+
+    def text(n):
+        return ' '.join(rng.choices(WORDS, cum_weights=cumulative_weights, k=n))
+
+    sql = ('INSERT INTO tasks_task (title, description, priority_score, priority, status, '
+           'ai_enhanced_description, context_tags, ai_enrichment_pending, version, effective_priority_score, '
+           'recurrence_rule, created_at, updated_at) '
+           "VALUES (%s, %s, 0, 2, %s, %s, %s, FALSE, 0, 0, '', %s, %s)")
+    with transaction.atomic(), connection.cursor() as cursor:
+        for start in range(0, rows, 10000):
+            cursor.executemany(sql, [(text(4).capitalize(), text(20), 'pending', '', '[]', now, now)
+                                     for _ in range(start, min(start + 10000, rows))])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    setup_django()
+    old_name = create_test_database()
+    try:
+        from rest_framework.test import APIClient
+
+        print(f"Loading {args.rows} tasks...")
+        load_tasks(args.rows, args.seed)
+        client = APIClient()
+        for query in QUERIES:
+            report(f"LIKE   ?search={query}",
+                   timed(lambda: client.get('/api/tasks/', {'search': query}), args.repeat))
+            report(f"FTS    search/?q={query}",
+                   timed(lambda: client.get('/api/tasks/search/', {'q': query}), args.repeat))
+    finally:
+        destroy_test_database(old_name)
+
+
+if __name__ == '__main__':
+    main()
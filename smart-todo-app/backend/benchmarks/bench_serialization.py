@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+List serialization: DRF serializers + JSONRenderer against the .values()
+fast path (FAST_LIST_SERIALIZATION), per page and per full request.
+
+    python benchmarks/bench_serialization.py --rows 10000 --page-size 100 --repeat 50
+"""
+
+import argparse
+import random
+
+from common import setup_django, create_test_database, destroy_test_database, timed, report
+
+
+def load_rows(rows, seed):
+    from datetime import timedelta
+    from django.db import transaction
+    from django.utils import timezone
+    from tasks.models import Task, Category
+    from context.models import ContextEntry
+
+    rng = random.Random(seed)
+    now = timezone.now()
+    categories = [Category.objects.create(name=f'Category {i}') for i in range(20)] + [None]
+    with transaction.atomic():
+        Task.objects.bulk_create([
+            Task(title=f'Task {i} ünïcode', category=rng.choice(categories), priority=rng.randint(1, 4),
+                 status=rng.choice(['pending', 'in_progress', 'completed']), priority_score=rng.random() * 100,
+                 deadline=now + timedelta(minutes=rng.randint(-10000, 10000)) if rng.random() < 0.8 else None)
+            for i in range(rows)
+        ], batch_size=1000)
+        ContextEntry.objects.bulk_create([
+            ContextEntry(content=f'Context entry {i} ' + 'lorem ipsum ' * rng.randint(1, 20),
+                         source_type=rng.choice(['whatsapp', 'email', 'notes', 'manual']),
+                         sentiment_score=rng.uniform(-1, 1), importance_score=rng.random())
+            for i in range(rows)
+        ], batch_size=1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    setup_django()
+    old_name = create_test_database()
+    try:
+        from django.test import override_settings
+        from rest_framework.renderers import JSONRenderer
+        from rest_framework.test import APIClient
+        from smart_todo.fast_serialization import FastListPlan, render_json
+        from tasks.models import Task
+        from tasks.serializers import TaskListSerializer
+        from context.models import ContextEntry
+        from context.serializers import ContextEntryListSerializer
+
+        print(f"Loading {args.rows} tasks and context entries...")
+        load_rows(args.rows, args.seed)
+
+        for label, queryset, serializer_class in [
+            ('tasks', Task.objects.select_related('category').order_by('-priority_score', '-created_at', 'id'),
+             TaskListSerializer),
+            ('context', ContextEntry.objects.order_by('-created_at', 'id'), ContextEntryListSerializer),
+        ]:
+            plan = FastListPlan.for_serializer(serializer_class)
+            page = list(queryset[:args.page_size])
+            values = list(plan.values(queryset)[:args.page_size])
+            report(f"DRF   serialize {label} page",
+                   timed(lambda: JSONRenderer().render(serializer_class(page, many=True).data), args.repeat))
+            report(f"fast  serialize {label} page",
+                   timed(lambda: render_json(plan.rows(values)), args.repeat))
+
+        client = APIClient()
+        for url in ['/api/tasks/', '/api/context/']:
+            query = {'page_size': args.page_size}
+            with override_settings(FAST_LIST_SERIALIZATION=False):
+                report(f"DRF   GET {url}", timed(lambda: client.get(url, query), args.repeat))
+            report(f"fast  GET {url}", timed(lambda: client.get(url, query), args.repeat))
+    finally:
+        destroy_test_database(old_name)
+
+
+if __name__ == '__main__':
+    main()
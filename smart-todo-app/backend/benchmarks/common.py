@@ -0,0 +1,55 @@
+"""
+Shared setup for the offline benchmark scripts.
+
+Benchmarks run against a throwaway test database (never db.sqlite3) and
+print plain-text results.
+"""
+
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+project_dir = Path(__file__).resolve().parent.parent
+sys.path.append(str(project_dir))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'smart_todo.settings')
+
+
+def setup_django(**env):
+    """Apply environment overrides, then configure Django"""
+    os.environ.update({key: str(value) for key, value in env.items()})
+    import django
+    django.setup()
+
+
+def create_test_database():
+    """Create and migrate a throwaway test database; returns its old name"""
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0)
+    return old_name
+
+
+def destroy_test_database(old_name):
+    from django.db import connection
+    connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def timed(fn, repeat):
+    """Run fn ``repeat`` times and return per-call durations in milliseconds"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+
+def report(label, durations):
+    durations = sorted(durations)
+    p95 = durations[min(len(durations) - 1, int(len(durations) * 0.95))]
+    print(f"{label:<40} n={len(durations):<5} mean={statistics.mean(durations):8.3f}ms "
+          f"p50={statistics.median(durations):8.3f}ms p95={p95:8.3f}ms")
@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class ContextConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'context'
+
+    def ready(self):
+        from smart_todo.versioning import track
+        from .models import ContextEntry, ContextEntryFeedback
+        track(ContextEntry, 'context')
+        track(ContextEntryFeedback, 'feedback')
+        from smart_todo.fulltext import register_fulltext_index, restore_fulltext_triggers
+        register_fulltext_index(ContextEntry._meta.db_table, ['content'])
+        post_migrate.connect(restore_fulltext_triggers, sender=self)
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('context', '0002_externalevent_contextentryfeedback'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contextentry',
+            index=models.Index(fields=['-created_at', 'id'], name='context_list_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contextentry',
+            index=models.Index(fields=['source_type', '-created_at', 'id'], name='context_source_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contextentry',
+            index=models.Index(condition=models.Q(('processed_at__isnull', True)), fields=['-created_at', 'id'], name='context_unprocessed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contextentry',
+            index=models.Index(condition=models.Q(('importance_score__gte', 0.7)), fields=['-created_at', 'id'], name='context_important_idx'),
+        ),
+    ]
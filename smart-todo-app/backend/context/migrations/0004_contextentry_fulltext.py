@@ -0,0 +1,23 @@
+from django.db import migrations
+from smart_todo.fulltext import create_fulltext_index, drop_fulltext_index
+
+COLUMNS = ['content']
+
+
+def create_index(apps, schema_editor):
+    create_fulltext_index(schema_editor, 'context_contextentry', COLUMNS)
+
+
+def drop_index(apps, schema_editor):
+    drop_fulltext_index(schema_editor, 'context_contextentry', COLUMNS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('context', '0003_contextentry_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
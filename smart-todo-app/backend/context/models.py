@@ -2,6 +2,10 @@ from django.db import models
 
 # Create your models here.
 
+# Entries at or above this importance are "high importance"; the partial
+# index below is built on the same literal, so change both together.
+HIGH_IMPORTANCE_THRESHOLD = 0.7
+
 class ContextEntry(models.Model):
     SOURCE_CHOICES = [
         ('whatsapp', 'WhatsApp'),
@@ -21,6 +25,15 @@ class ContextEntry(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', 'id'], name='context_list_order_idx'),
+            models.Index(fields=['source_type', '-created_at', 'id'], name='context_source_order_idx'),
+            # Partial indexes only hold the rows the unprocessed / high_importance views read
+            models.Index(fields=['-created_at', 'id'], name='context_unprocessed_idx',
+                         condition=models.Q(processed_at__isnull=True)),
+            models.Index(fields=['-created_at', 'id'], name='context_important_idx',
+                         condition=models.Q(importance_score__gte=HIGH_IMPORTANCE_THRESHOLD)),
+        ]
 
     def __str__(self):
         return f"{self.source_type} - {self.content[:50]}..."
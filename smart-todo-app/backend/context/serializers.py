@@ -13,6 +13,8 @@ class ContextEntrySerializer(serializers.ModelSerializer):
             'created_at', 'processed_at'
         ]
         read_only_fields = ['processed_insights', 'keywords', 'sentiment_score', 'importance_score', 'processed_at']
+        # Columns read by the method fields, for ?fields= narrowing
+        method_field_sources = {'processing_status': ['processed_at', 'processed_insights']}
     
     def get_processing_status(self, obj):
         """Get the processing status of the context entry"""
@@ -45,21 +47,8 @@ class ContextEntrySerializer(serializers.ModelSerializer):
                 {'title': 'Context', 'description': context_entry.content, 'category': context_entry.source_type},
                 context_data
             )
-            # Simulate entity, intent, and schedule extraction
-            semantic_prompt = f"""
-            Extract the following from the context:
-            - Entities (people, places, organizations)
-            - Intent (e.g., meeting, reminder, note, event)
-            - Schedule info (date, time, recurrence)
-            Context: {context_entry.content}
-            Return as JSON: {{'entities': [...], 'intent': '...', 'schedule': '...'}}
-            """
-            semantic_json = ai_manager.enhance_task_description({'title': 'Semantic Extraction', 'description': semantic_prompt, 'category': ''}, context_data)
-            import json
-            try:
-                semantic_data = json.loads(semantic_json[semantic_json.find('{'):semantic_json.rfind('}')+1])
-            except Exception:
-                semantic_data = {'entities': [], 'intent': '', 'schedule': ''}
+            # Entity, intent, and schedule extraction
+            semantic_data = ai_manager.extract_semantics(context_entry.content)
 
             sentiment_score = min(1.0, max(0.0, len(enhanced_desc) / 200))
             importance_score = min(1.0, max(0.0, len(context_entry.content) / 500))
@@ -99,7 +88,7 @@ class ContextEntryListSerializer(serializers.ModelSerializer):
 class ContextEntryDetailSerializer(ContextEntrySerializer):
     """Detailed serializer for single context entry view"""
     class Meta(ContextEntrySerializer.Meta):
-        fields = ContextEntrySerializer.Meta.fields + ['processed_insights', 'keywords', 'processed_at']
+        fields = ContextEntrySerializer.Meta.fields
 
 class ContextEntryCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating new context entries"""
@@ -1,7 +1,9 @@
+from django.core.cache import cache
+from django.test import override_settings
 from django.urls import reverse
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
-from .models import ContextEntry
+from .models import ContextEntry, ContextEntryFeedback
 
 class ContextEntryAPITestCase(APITestCase):
     def setUp(self):
@@ -89,3 +91,125 @@ class ContextEntryAPITestCase(APITestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(any("Existing" in c['content'] for c in response.data.get('results', [])))
+
+
+class ContextQueryBudgetTestCase(APITestCase):
+    """Per-endpoint query budgets; a per-row query makes these fail"""
+    budgets = {
+        'context-list': 1,
+        'context-unprocessed': 1,
+        'context-high-importance': 1,
+        'context-by-source': 1,
+        'context-insights': 3,
+    }
+
+    def setUp(self):
+        cache.clear()  # insights is served from the response cache once computed
+        for i in range(30):
+            ContextEntry.objects.create(content=f"Budget entry {i}", source_type='notes',
+                                        importance_score=0.9 if i % 2 else 0.1, keywords=['budget'])
+
+    def test_endpoints_stay_within_query_budget(self):
+        for name, budget in self.budgets.items():
+            with self.subTest(endpoint=name):
+                with self.assertNumQueries(budget):
+                    response = self.client.get(reverse(name))
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class ContextSearchTestCase(APITestCase):
+    def test_ranked_content_search(self):
+        strong = ContextEntry.objects.create(content="Budget review budget meeting", source_type='email')
+        weak = ContextEntry.objects.create(content="Lunch, then the budget discussion and a long walk afterwards",
+                                           source_type='notes')
+        ContextEntry.objects.create(content="Call the plumber", source_type='notes')
+        response = self.client.get(reverse('context-search'), {'q': 'budget'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([entry['id'] for entry in response.data['results']], [strong.id, weak.id])
+
+
+class ContextConditionalGetTestCase(APITestCase):
+    def test_insights_not_modified_until_a_write(self):
+        ContextEntry.objects.create(content="Weekly sync", source_type='notes', importance_score=0.9)
+        etag = self.client.get(reverse('context-insights'))['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('context-insights'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        ContextEntry.objects.create(content="Another note", source_type='notes')
+        response = self.client.get(reverse('context-insights'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class ResponseCacheTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.entry = ContextEntry.objects.create(content="Plan offsite", source_type='email')
+
+    def test_analytics_cached_until_feedback_is_written(self):
+        first = self.client.get(reverse('context-analytics')).data
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(reverse('context-analytics')).data, first)
+        ContextEntryFeedback.objects.create(context_entry=self.entry, is_relevant=True)
+        self.assertEqual(self.client.get(reverse('context-analytics')).data['feedback']['relevant'], 1)
+
+    def test_statistics_invalidated_by_context_writes(self):
+        self.assertEqual(self.client.get(reverse('context-statistics')).data['total_entries'], 1)
+        ContextEntry.objects.create(content="Second", source_type='notes')
+        self.assertEqual(self.client.get(reverse('context-statistics')).data['total_entries'], 2)
+        self.entry.delete()
+        self.assertEqual(self.client.get(reverse('context-statistics')).data['total_entries'], 1)
+
+    def test_ttl_bounds_staleness_of_unsignalled_writes(self):
+        def positive():
+            return self.client.get(reverse('context-statistics')).data['sentiment_distribution']['positive']
+
+        # queryset.update() sends no signals, so only the TTL can expire the entry
+        self.assertEqual(positive(), 0)
+        ContextEntry.objects.filter(pk=self.entry.pk).update(sentiment_score=0.9)
+        self.assertEqual(positive(), 0)
+        cache.clear()
+        with override_settings(RESPONSE_CACHE_TTL=0):
+            self.assertEqual(positive(), 1)
+            ContextEntry.objects.filter(pk=self.entry.pk).update(sentiment_score=0.1)
+            self.assertEqual(positive(), 0)
+
+
+class FastListSerializationTestCase(APITestCase):
+    def test_list_is_byte_identical_to_serializer_output(self):
+        for i, score in enumerate([0.0, 0.25, 5e-05, -0.75, 1.0]):
+            ContextEntry.objects.create(content=f"Entry {i}   ☕", source_type='notes',
+                                        sentiment_score=score, importance_score=score / 2)
+        for url in [reverse('context-list'), reverse('context-list') + '?page_size=2&ordering=sentiment_score']:
+            fast = self.client.get(url)
+            with override_settings(FAST_LIST_SERIALIZATION=False):
+                slow = self.client.get(url)
+            self.assertEqual(fast.content, slow.content)
+            self.assertEqual(type(fast).__name__, 'FastJSONResponse')
+
+
+class ContextSparseFieldsetTestCase(APITestCase):
+    def test_fields_and_omit(self):
+        entry = ContextEntry.objects.create(content="Sparse entry", source_type='notes',
+                                            processed_insights={'intent': 'x'})
+        response = self.client.get(reverse('context-list') + '?fields=id,source_type_label')
+        self.assertEqual(response.data['results'], [{'id': entry.id, 'source_type_label': 'Notes'}])
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('context-detail', args=[entry.id]) + '?fields=processing_status')
+        self.assertEqual(response.data, {'processing_status': 'partially_processed'})
+        response = self.client.get(reverse('context-detail', args=[entry.id]) + '?omit=processed_insights,keywords')
+        self.assertNotIn('processed_insights', response.data)
+
+
+class ContextExportTestCase(APITestCase):
+    def test_ndjson_export(self):
+        import json
+        entry = ContextEntry.objects.create(content="Exported", source_type='email', keywords=['x'],
+                                            processed_insights={'intent': 'plan'})
+        response = self.client.get(reverse('context-export'), {'source_type': 'email'})
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(rows, [{
+            'id': entry.id, 'content': "Exported", 'source_type': 'email', 'processed_insights': {'intent': 'plan'},
+            'keywords': ['x'], 'sentiment_score': 0.0, 'importance_score': 0.0,
+            'created_at': rows[0]['created_at'], 'processed_at': None,
+        }])
@@ -3,7 +3,7 @@ from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import ContextEntry, ExternalEvent, ContextEntryFeedback
+from .models import ContextEntry, ExternalEvent, ContextEntryFeedback, HIGH_IMPORTANCE_THRESHOLD
 from .serializers import (
     ContextEntrySerializer, ContextEntryListSerializer, 
     ContextEntryDetailSerializer, ContextEntryCreateSerializer
@@ -12,8 +12,15 @@ from django.db import models
 from collections import Counter
 from datetime import timedelta
 from django.utils import timezone
+from smart_todo.idempotency import idempotent
+from smart_todo.pagination import PaginatedActionMixin, ContextKeysetPagination
+from smart_todo.fieldsets import SparseFieldsetMixin
+from smart_todo.fulltext import fulltext_search
+from smart_todo.export import export_response
+from smart_todo.fast_serialization import fast_list_response
+from smart_todo.versioning import conditional, cached_response
 
-class ContextEntryViewSet(viewsets.ModelViewSet):
+class ContextEntryViewSet(SparseFieldsetMixin, PaginatedActionMixin, viewsets.ModelViewSet):
     """ViewSet for ContextEntry model with AI processing"""
     queryset = ContextEntry.objects.all()
     serializer_class = ContextEntrySerializer
@@ -22,44 +29,73 @@ class ContextEntryViewSet(viewsets.ModelViewSet):
     search_fields = ['content']
     ordering_fields = ['created_at', 'sentiment_score', 'importance_score']
     ordering = ['-created_at']
+    pagination_class = ContextKeysetPagination
+    # Columns of /api/context/export/ and the values they are read from
+    export_fields = {
+        'id': 'id', 'content': 'content', 'source_type': 'source_type', 'processed_insights': 'processed_insights',
+        'keywords': 'keywords', 'sentiment_score': 'sentiment_score', 'importance_score': 'importance_score',
+        'created_at': 'created_at', 'processed_at': 'processed_at',
+    }
     
     def get_serializer_class(self):
         """Return appropriate serializer based on action"""
-        if self.action == 'list':
+        if self.action in ('list', 'search'):
             return ContextEntryListSerializer
         elif self.action == 'retrieve':
             return ContextEntryDetailSerializer
         elif self.action == 'create':
             return ContextEntryCreateSerializer
         return ContextEntrySerializer
+
+    @conditional('context')
+    def list(self, request, *args, **kwargs):
+        return fast_list_response(self, ContextEntryListSerializer) or super().list(request, *args, **kwargs)
+
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
     
     @action(detail=False, methods=['get'])
     def unprocessed(self, request):
         """Get unprocessed context entries"""
-        unprocessed_entries = ContextEntry.objects.filter(processed_at__isnull=True)
-        serializer = self.get_serializer(unprocessed_entries, many=True)
-        return Response(serializer.data)
+        unprocessed_entries = self.get_queryset().filter(processed_at__isnull=True)
+        return self.paginated_response(unprocessed_entries)
     
     @action(detail=False, methods=['get'])
     def high_importance(self, request):
         """Get high importance context entries"""
-        high_importance_entries = ContextEntry.objects.filter(importance_score__gte=0.7)
-        serializer = self.get_serializer(high_importance_entries, many=True)
-        return Response(serializer.data)
+        high_importance_entries = self.get_queryset().filter(importance_score__gte=HIGH_IMPORTANCE_THRESHOLD)
+        return self.paginated_response(high_importance_entries)
     
     @action(detail=False, methods=['get'])
     def by_source(self, request):
         """Get context entries grouped by source type"""
         source_type = request.query_params.get('source_type', '')
         if source_type:
-            entries = ContextEntry.objects.filter(source_type=source_type)
+            entries = self.get_queryset().filter(source_type=source_type)
         else:
-            entries = ContextEntry.objects.all()
+            entries = self.get_queryset()
         
+        return self.paginated_response(entries)
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream all (filtered) context entries as NDJSON, CSV, Parquet or Arrow (?output=)"""
+        return export_response(self, self.export_fields, 'context')
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """Full-text search over content, best matches first (?q=)"""
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({'error': 'q is required'}, status=status.HTTP_400_BAD_REQUEST)
+        entries = fulltext_search(self.filter_queryset(self.get_queryset()), query, self.search_fields,
+                                  self.paginator.get_page_size(request))
         serializer = self.get_serializer(entries, many=True)
-        return Response(serializer.data)
+        return Response({'query': query, 'results': serializer.data})
     
     @action(detail=True, methods=['post'])
+    @idempotent
     def reprocess(self, request, pk=None):
         """Manually trigger AI reprocessing for a context entry"""
         context_entry = self.get_object()
@@ -72,6 +108,7 @@ class ContextEntryViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
     
     @action(detail=False, methods=['post'])
+    @idempotent
     def bulk_process(self, request):
         """Bulk process unprocessed context entries"""
         unprocessed_entries = ContextEntry.objects.filter(processed_at__isnull=True)
@@ -91,6 +128,8 @@ class ContextEntryViewSet(viewsets.ModelViewSet):
         })
     
     @action(detail=False, methods=['get'])
+    @conditional('context')
+    @cached_response('context')
     def statistics(self, request):
         """Get context processing statistics"""
         total_entries = ContextEntry.objects.count()
@@ -134,40 +173,14 @@ class ContextEntryViewSet(viewsets.ModelViewSet):
         })
     
     @action(detail=False, methods=['get'])
+    @conditional('context')
+    @cached_response('context')
     def insights(self, request):
         """Get AI insights from context data"""
-        # Get recent high-importance entries
-        recent_important = ContextEntry.objects.filter(
-            importance_score__gte=0.7
-        ).order_by('-created_at')[:10]
-        
-        # Extract common keywords
-        all_keywords = []
-        for entry in ContextEntry.objects.all():
-            if entry.keywords:
-                all_keywords.extend(entry.keywords)
-        
-        # Count keyword frequency
-        keyword_freq = Counter(all_keywords).most_common(10)
-        
-        # Sentiment trends
-        recent_entries = ContextEntry.objects.order_by('-created_at')[:50]
-        sentiment_trend = [
-            {
-                'date': entry.created_at.date().isoformat(),
-                'sentiment': entry.sentiment_score,
-                'importance': entry.importance_score
-            }
-            for entry in recent_entries
-        ]
-        
-        return Response({
-            'recent_important_entries': ContextEntryListSerializer(recent_important, many=True).data,
-            'top_keywords': [{'keyword': kw, 'count': count} for kw, count in keyword_freq],
-            'sentiment_trend': sentiment_trend
-        })
+        return Response(context_insights())
 
     @action(detail=False, methods=['post'])
+    @idempotent
     def import_event(self, request):
         """Import an external event (e.g., from Google Calendar) as a context entry and as an ExternalEvent."""
         source = request.data.get('source', 'google_calendar')
@@ -214,6 +227,7 @@ class ContextEntryViewSet(viewsets.ModelViewSet):
         return Response({'status': 'Feedback submitted.'})
 
     @action(detail=False, methods=['get'])
+    @cached_response('context', 'feedback', vary=lambda request: timezone.localdate().isoformat())
     def analytics(self, request):
         total = ContextEntry.objects.count()
         feedbacks = ContextEntryFeedback.objects.all()
@@ -252,3 +266,38 @@ class ContextEntryViewSet(viewsets.ModelViewSet):
             'context_trend_7d': context_trend,
             'feedback_trend_7d': feedback_trend,
         })
+
+
+def context_insights():
+    """Recent important entries, top keywords and the sentiment trend (also used by /api/dashboard/)"""
+    # Get recent high-importance entries
+    recent_important = ContextEntry.objects.filter(
+        importance_score__gte=HIGH_IMPORTANCE_THRESHOLD
+    ).order_by('-created_at')[:10]
+
+    # Extract common keywords, reading only that column
+    all_keywords = []
+    for keywords in ContextEntry.objects.order_by().values_list('keywords', flat=True).iterator():
+        if keywords:
+            all_keywords.extend(keywords)
+
+    # Count keyword frequency
+    keyword_freq = Counter(all_keywords).most_common(10)
+
+    # Sentiment trends
+    recent_entries = ContextEntry.objects.order_by('-created_at').values_list(
+        'created_at', 'sentiment_score', 'importance_score')[:50]
+    sentiment_trend = [
+        {
+            'date': created_at.date().isoformat(),
+            'sentiment': sentiment,
+            'importance': importance
+        }
+        for created_at, sentiment, importance in recent_entries
+    ]
+
+    return {
+        'recent_important_entries': ContextEntryListSerializer(recent_important, many=True).data,
+        'top_keywords': [{'keyword': kw, 'count': count} for kw, count in keyword_freq],
+        'sentiment_trend': sentiment_trend
+    }
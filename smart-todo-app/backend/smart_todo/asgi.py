@@ -2,6 +2,8 @@
 ASGI config for smart_todo project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+WebSocket connections to ``/ws/changes/`` get the change push of
+``sync.realtime``; everything else goes to Django.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -13,4 +15,15 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'smart_todo.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from sync.realtime import websocket_changes  # noqa: E402 - needs the app registry loaded above
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'websocket':
+        if scope['path'] == '/ws/changes/':
+            return await websocket_changes(scope, receive, send)
+        await receive()
+        return await send({'type': 'websocket.close'})
+    return await django_application(scope, receive, send)
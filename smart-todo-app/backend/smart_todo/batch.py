@@ -0,0 +1,137 @@
+"""
+``/api/batch/``: several task, category and context API calls in one request.
+
+Each operation is dispatched in-process to the DRF view its path resolves
+to, skipping the middleware stack and the per-request HTTP and JSON
+overhead. Only routes of the task, category and context viewsets are
+accepted. With ``"atomic": true`` all operations share one transaction; the
+first one that fails rolls the batch back and the rest are not run.
+"""
+
+import io
+import json
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.urls import Resolver404, resolve
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from context.views import ContextEntryViewSet
+from tasks import fuzzy
+from tasks.views import TaskViewSet, CategoryViewSet
+from .idempotency import idempotent
+from .versioning import bump_tracked_collections
+
+BATCHABLE_VIEWSETS = (TaskViewSet, CategoryViewSet, ContextEntryViewSet)
+METHODS = {'GET', 'POST', 'PUT', 'PATCH', 'DELETE'}
+# Headers of the batch request that describe it, not its operations
+OUTER_HEADERS = ('HTTP_IDEMPOTENCY_KEY', 'HTTP_IF_NONE_MATCH', 'HTTP_IF_MATCH', 'HTTP_ACCEPT_ENCODING',
+                 'CONTENT_TYPE', 'CONTENT_LENGTH')
+SKIPPED_RESPONSE_HEADERS = {'content-type', 'content-length', 'allow', 'vary'}
+
+
+def _result(status_code, body, headers=None):
+    return {'status': status_code, 'headers': headers or {}, 'body': body}
+
+
+def _error(status_code, message):
+    return _result(status_code, {'error': message})
+
+
+def _sub_request(request, method, path, query, body, headers):
+    environ = {key: value for key, value in request.META.items() if key not in OUTER_HEADERS}
+    content = b'' if body is None else json.dumps(body).encode('utf-8')
+    environ.update({
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'SCRIPT_NAME': '',
+        'QUERY_STRING': query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(content)),
+        'wsgi.input': io.BytesIO(content),
+    })
+    for name, value in headers.items():
+        environ['HTTP_' + name.upper().replace('-', '_')] = str(value)
+    sub = WSGIRequest(environ)
+    # What the skipped middleware would have attached, taken from the batch request
+    for attribute in ('user', 'session'):
+        if hasattr(request._request, attribute):
+            setattr(sub, attribute, getattr(request._request, attribute))
+    sub._dont_enforce_csrf_checks = True  # the batch request itself passed the CSRF check
+    return sub
+
+
+def run_operation(request, operation, atomic):
+    """Dispatch one ``{"method", "path", "body"?, "headers"?}`` operation; returns its result"""
+    if not isinstance(operation, dict):
+        return _error(status.HTTP_400_BAD_REQUEST, 'Each operation must be an object.')
+    method = str(operation.get('method', 'GET')).upper()
+    path, _, query = str(operation.get('path', '')).partition('?')
+    headers = operation.get('headers') or {}
+    if method not in METHODS:
+        return _error(status.HTTP_400_BAD_REQUEST, f"method must be one of: {', '.join(sorted(METHODS))}")
+    if not isinstance(headers, dict):
+        return _error(status.HTTP_400_BAD_REQUEST, 'headers must be an object.')
+    if atomic and any(name.lower() == 'idempotency-key' for name in headers):
+        # A stored response would outlive a rollback of the batch
+        return _error(status.HTTP_400_BAD_REQUEST, 'Idempotency-Key is not supported in atomic batches.')
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return _error(status.HTTP_404_NOT_FOUND, f'No route for {path!r}.')
+    if getattr(match.func, 'cls', None) not in BATCHABLE_VIEWSETS:
+        return _error(status.HTTP_400_BAD_REQUEST, f'{path!r} cannot be used in a batch.')
+
+    sub = _sub_request(request, method, path, query, operation.get('body'), headers)
+    sub.resolver_match = match
+    response = match.func(sub, *match.args, **match.kwargs)
+    if isinstance(response, StreamingHttpResponse):
+        return _error(status.HTTP_400_BAD_REQUEST, f'{path!r} streams its response; call it directly.')
+    if isinstance(response, Response):
+        body = response.data
+    elif response.get('Content-Type', '').startswith('application/json'):
+        body = json.loads(response.content or b'null')
+    else:
+        body = response.content.decode(response.charset)
+    headers = {name: value for name, value in response.items() if name.lower() not in SKIPPED_RESPONSE_HEADERS}
+    return _result(response.status_code, body, headers)
+
+
+class BatchView(APIView):
+    """POST ``{"operations": [...], "atomic": false}``; returns one result per operation, in order"""
+
+    @idempotent
+    def post(self, request):
+        operations = request.data.get('operations') if isinstance(request.data, dict) else None
+        atomic = request.data.get('atomic', False) if isinstance(request.data, dict) else False
+        limit = getattr(settings, 'BATCH_MAX_OPERATIONS', 50)
+        if not isinstance(atomic, bool):
+            return Response({'error': 'atomic must be true or false'}, status=status.HTTP_400_BAD_REQUEST)
+        if not isinstance(operations, list) or not operations:
+            return Response({'error': 'operations must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(operations) > limit:
+            return Response({'error': f'At most {limit} operations per batch'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not atomic:
+            results = [run_operation(request, operation, atomic) for operation in operations]
+            return Response({'results': results, 'rolled_back': False})
+
+        results, rolled_back = [], False
+        with transaction.atomic():
+            for operation in operations:
+                result = run_operation(request, operation, atomic)
+                results.append(result)
+                if result['status'] >= 400:
+                    transaction.set_rollback(True)
+                    rolled_back = True
+                    break
+        if rolled_back:
+            fuzzy.reset()  # its in-memory index saw the rolled-back saves
+            # Writes bumped the versions before the rollback, so reads later in the
+            # batch cached rolled-back data under versions that are still current
+            bump_tracked_collections()
+            results += [_error(status.HTTP_424_FAILED_DEPENDENCY, 'Not run: an earlier operation failed.')
+                        for _ in operations[len(results):]]
+        return Response({'results': results, 'rolled_back': rolled_back})
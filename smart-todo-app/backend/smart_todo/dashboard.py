@@ -0,0 +1,146 @@
+"""
+``/api/dashboard/``: the dashboard widgets in one response.
+
+Replaces separate calls to tasks/statistics, tasks/ai_analytics,
+tasks/overdue, tasks/today, tasks/high_priority and context/insights. Every
+task count the sections report comes from one conditional-aggregation query,
+category counts from one GROUP BY, and all sections use the same
+``generated_at`` instant. On databases that serve concurrent connections the
+sections run in parallel threads (DASHBOARD_WORKERS); SQLite runs them in turn.
+"""
+
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time, timedelta
+from django.conf import settings
+from django.db import connection, connections
+from django.db.models import Avg, Count, Q
+from django.utils import timezone
+from django.utils.functional import cached_property
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from ai_engine.prompt_budget import usage_stats
+from context.views import context_insights
+from tasks.filters import request_now
+from tasks.models import Task, Category, OPEN_STATUSES, overdue_q, due_between_q
+from tasks.serializers import TaskSerializer
+from tasks.statistics import STATUSES, PRIORITIES
+from .versioning import cached_data
+
+SECTIONS = ['statistics', 'ai_analytics', 'overdue', 'today', 'high_priority', 'insights']
+MAX_LIMIT = 100
+
+
+class Dashboard:
+    """Computes the requested sections against one snapshot time"""
+
+    def __init__(self, now=None, limit=10):
+        self.now = now or timezone.now()
+        self.limit = limit
+        start = timezone.make_aware(datetime.combine(timezone.localdate(self.now), time.min))
+        # The list sections' filters, shared by their counts and their rows
+        self.filters = {
+            'overdue': overdue_q(self.now),
+            'today': due_between_q(start, start + timedelta(days=1)),
+            'high_priority': Q(status__in=OPEN_STATUSES, priority__in=[3, 4]),
+        }
+
+    @cached_property
+    def task_counts(self):
+        """Every task count of every section, from one query"""
+        aggregates = {
+            'total': Count('id'),
+            'enhanced': Count('id', filter=~Q(ai_enhanced_description='')),
+            'with_deadline': Count('id', filter=Q(deadline__isnull=False)),
+            'average_priority_score': Avg('priority_score'),
+        }
+        aggregates.update({f'status_{s}': Count('id', filter=Q(status=s)) for s in STATUSES})
+        aggregates.update({f'priority_{p}': Count('id', filter=Q(priority=p)) for p in PRIORITIES})
+        aggregates.update({name: Count('id', filter=q) for name, q in self.filters.items()})
+        return Task.objects.order_by().aggregate(**aggregates)
+
+    @cached_property
+    def category_counts(self):
+        """(name, task count) per category, in id order"""
+        return list(Category.objects.order_by('pk').annotate(task_count=Count('task')).values_list('name', 'task_count'))
+
+    def statistics(self):
+        counts = self.task_counts
+        return {
+            'total_tasks': counts['total'],
+            'pending_tasks': counts['status_pending'],
+            'completed_tasks': counts['status_completed'],
+            'in_progress_tasks': counts['status_in_progress'],
+            'priority_distribution': {f'priority_{p}': counts[f'priority_{p}'] for p in PRIORITIES},
+            'category_distribution': dict(self.category_counts),
+        }
+
+    def ai_analytics(self):
+        counts = self.task_counts
+        by_name = Counter()
+        for name, task_count in self.category_counts:
+            by_name[name] += task_count
+        return {
+            'total_tasks': counts['total'],
+            'ai_enhanced_tasks': counts['enhanced'],
+            'average_priority_score': round(counts['average_priority_score'] or 0, 2),
+            'tasks_with_deadline': counts['with_deadline'],
+            'top_categories': [{'category': c, 'count': n} for c, n in by_name.most_common(5) if n],
+            'prompt_usage': usage_stats.snapshot(),
+        }
+
+    def _task_list(self, name):
+        tasks = (Task.objects.select_related('category').filter(self.filters[name])
+                 .with_deadline_fields(self.now).order_by('-priority_score', '-created_at', 'id')[:self.limit])
+        data = TaskSerializer(tasks, many=True, context={'now': self.now}).data
+        return {'count': self.task_counts[name], 'results': data}
+
+    def overdue(self):
+        return self._task_list('overdue')
+
+    def today(self):
+        return self._task_list('today')
+
+    def high_priority(self):
+        return self._task_list('high_priority')
+
+    def insights(self):
+        return cached_data('dashboard.insights', context_insights, tags=('context',))
+
+    def build(self, sections):
+        if any(name != 'insights' for name in sections):
+            self.task_counts  # shared by the task sections: run it once, before any fan-out
+        if {'statistics', 'ai_analytics'} & set(sections):
+            self.category_counts
+        workers = min(len(sections), getattr(settings, 'DASHBOARD_WORKERS', 4))
+        # Threads use their own connections, which cannot see this one's uncommitted writes
+        if workers < 2 or connection.vendor == 'sqlite' or connection.in_atomic_block:
+            return {name: getattr(self, name)() for name in sections}
+        with ThreadPoolExecutor(workers) as pool:
+            return dict(zip(sections, pool.map(self._threaded_section, sections)))
+
+    def _threaded_section(self, name):
+        try:
+            return getattr(self, name)()
+        finally:
+            connections.close_all()  # this worker thread's connections only
+
+
+@api_view(['GET'])
+def dashboard(request):
+    """All dashboard sections, or those named in ?sections=; ?limit= tasks per list (default 10)"""
+    names = [name.strip() for name in request.query_params.get('sections', '').split(',') if name.strip()]
+    unknown = [name for name in names if name not in SECTIONS]
+    if unknown:
+        return Response({'error': f"Unknown section(s): {', '.join(unknown)}"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        limit = int(request.query_params.get('limit', 10))
+    except ValueError:
+        limit = 0
+    if not 1 <= limit <= MAX_LIMIT:
+        return Response({'error': f'limit must be between 1 and {MAX_LIMIT}'}, status=status.HTTP_400_BAD_REQUEST)
+
+    board = Dashboard(now=request_now(request), limit=limit)
+    sections = [name for name in SECTIONS if not names or name in names]
+    return Response({'generated_at': board.now, **board.build(sections)})
@@ -0,0 +1,191 @@
+"""
+Streaming exports of a queryset as NDJSON, CSV, Parquet or Arrow.
+
+Rows are read with ``values_list().iterator(chunk_size=EXPORT_CHUNK_SIZE)``
+and written to a StreamingHttpResponse as they arrive, so memory use does
+not grow with the table. Parquet and Arrow (IPC stream) need the optional
+``pyarrow`` package; each chunk becomes one row group / record batch.
+"""
+
+import csv
+import json
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import ForeignKey
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework.response import Response
+from .fieldsets import requested_fields
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - optional dependency
+    pyarrow = None
+
+OUTPUT_PARAM = 'output'  # ?format= is taken by DRF's content negotiation
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+    'parquet': 'application/vnd.apache.parquet',
+    'arrow': 'application/vnd.apache.arrow.stream',
+}
+
+
+def _chunk_size():
+    return getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _model_field(model, lookup):
+    parts = lookup.split('__')
+    for part in parts[:-1]:
+        model = model._meta.get_field(part).related_model
+    return model._meta.get_field(parts[-1])
+
+
+def ndjson_stream(names, rows):
+    encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    for chunk in _chunks(rows, _chunk_size()):
+        yield ''.join(encoder.encode(dict(zip(names, row))) + '\n' for row in chunk).encode('utf-8')
+
+
+class _Lines:
+    """csv.writer target that hands back what was written"""
+
+    def __init__(self):
+        self.parts = []
+
+    def write(self, value):
+        self.parts.append(value)
+
+    def drain(self):
+        value, self.parts = ''.join(self.parts), []
+        return value.encode('utf-8')
+
+
+def _csv_value(value):
+    # Lists use the same ';' separator as the CSV import; other structures are JSON
+    if isinstance(value, list) and all(isinstance(item, str) for item in value):
+        return ';'.join(value)
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, cls=DjangoJSONEncoder, ensure_ascii=False)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def csv_stream(names, rows):
+    lines = _Lines()
+    writer = csv.writer(lines)
+    writer.writerow(names)
+    yield lines.drain()
+    for chunk in _chunks(rows, _chunk_size()):
+        writer.writerows([_csv_value(value) for value in row] for row in chunk)
+        yield lines.drain()
+
+
+class _Sink:
+    """Write-only file for pyarrow that keeps only the bytes not yet sent"""
+    closed = False
+
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+
+    def write(self, data):
+        data = bytes(data)
+        self.parts.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data, self.parts = b''.join(self.parts), []
+        return data
+
+
+def arrow_schema(model, names, lookups):
+    types = {
+        'AutoField': pyarrow.int64(), 'BigAutoField': pyarrow.int64(), 'IntegerField': pyarrow.int64(),
+        'BigIntegerField': pyarrow.int64(), 'PositiveIntegerField': pyarrow.int64(), 'FloatField': pyarrow.float64(), 'BooleanField': pyarrow.bool_(),
+        'DateTimeField': pyarrow.timestamp('us', tz='UTC'),
+    }
+    fields = []
+    for name, lookup in zip(names, lookups):
+        field = _model_field(model, lookup)
+        if isinstance(field, ForeignKey):
+            field = field.target_field
+        fields.append(pyarrow.field(name, types.get(field.get_internal_type(), pyarrow.string())))
+    return pyarrow.schema(fields)
+
+
+def _arrow_column(values, type_):
+    if pyarrow.types.is_string(type_):
+        values = [value if value is None or isinstance(value, str)
+                  else json.dumps(value, cls=DjangoJSONEncoder, ensure_ascii=False) for value in values]
+    return pyarrow.array(values, type=type_)
+
+
+def arrow_stream(schema, rows, parquet):
+    sink = _Sink()
+    writer = (pyarrow.parquet.ParquetWriter(pyarrow.PythonFile(sink, mode='w'), schema) if parquet
+              else pyarrow.ipc.new_stream(pyarrow.PythonFile(sink, mode='w'), schema))
+    for chunk in _chunks(rows, _chunk_size()):
+        columns = [_arrow_column(values, field.type) for values, field in zip(zip(*chunk), schema)]
+        writer.write_batch(pyarrow.record_batch(columns, schema=schema))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+def export_response(view, export_fields, basename):
+    """Stream the view's filtered queryset in the ?output= format (ndjson, csv, parquet or arrow).
+
+    ``export_fields`` maps column names to value lookups; ?fields= and
+    ?omit= select among them. Without ?ordering= rows come in primary key order.
+    """
+    request = view.request
+    output = request.query_params.get(OUTPUT_PARAM, 'ndjson').lower()
+    if output not in CONTENT_TYPES:
+        return Response({'error': f"{OUTPUT_PARAM} must be one of: {', '.join(CONTENT_TYPES)}"},
+                        status=status.HTTP_400_BAD_REQUEST)
+    if output in ('parquet', 'arrow') and pyarrow is None:
+        return Response({'error': f'{output} export needs pyarrow, which is not installed'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    names = requested_fields(request, list(export_fields)) or tuple(export_fields)
+    lookups = [export_fields[name] for name in names]
+
+    queryset = view.filter_queryset(view.get_queryset())
+    if not request.query_params.get('ordering'):
+        queryset = queryset.order_by('pk')
+    rows = queryset.values_list(*lookups).iterator(chunk_size=_chunk_size())
+
+    if output == 'ndjson':
+        content = ndjson_stream(names, rows)
+    elif output == 'csv':
+        content = csv_stream(names, rows)
+    else:
+        content = arrow_stream(arrow_schema(queryset.model, names, lookups), rows, parquet=output == 'parquet')
+    response = StreamingHttpResponse(content, content_type=CONTENT_TYPES[output])
+    response['Content-Disposition'] = f'attachment; filename="{basename}.{output}"'
+    return response
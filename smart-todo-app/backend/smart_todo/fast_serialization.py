@@ -0,0 +1,218 @@
+"""
+Fast path for list endpoints: rows from ``.values()`` instead of model
+instances and DRF fields, rendered with orjson when it is installed.
+
+``FastListPlan`` is derived from a ModelSerializer class and reproduces its
+output exactly, so the response bytes match what DRF's JSONRenderer would
+produce for the same page. Serializers with fields it does not understand
+(SerializerMethodField, nested serializers, ...) are not eligible.
+"""
+
+import json
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+_plans = {}
+
+
+class NotEligible(Exception):
+    pass
+
+
+def _display_source(source):
+    if source.startswith('get_') and source.endswith('_display'):
+        return source[len('get_'):-len('_display')]
+    return None
+
+
+class FastListPlan:
+    """Column plan for one serializer: which values() columns feed which output keys"""
+
+    def __init__(self, serializer_class, names=None):
+        model = serializer_class.Meta.model
+        self.model = model
+        self.columns = []  # values() lookups, in order
+        self.fields = []  # (output key, column, kind, labels, parent)
+        for name, field in serializer_class().fields.items():
+            if names is not None and name not in names:
+                continue
+            display = _display_source(field.source)
+            if display:
+                choices = model._meta.get_field(display).flatchoices
+                self.fields.append((name, display, 'label', {value: str(label) for value, label in choices}, None))
+                self._column(display)
+                continue
+            parent = None
+            if '.' in field.source:
+                relation, _, attribute = field.source.partition('.')
+                if '.' in attribute or field.default is not serializers.empty:
+                    raise NotEligible(name)
+                column = f'{relation}__{attribute}'
+                # DRF drops the key when the relation is null, unless allow_null
+                parent = None if field.allow_null else relation
+                model._meta.get_field(relation)
+                self._column(relation)
+            else:
+                column = field.source
+                model._meta.get_field(column)  # plain model fields only
+            if isinstance(field, serializers.DateTimeField):
+                output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+                if output_format is None or output_format.lower() != ISO_8601 or hasattr(field, 'timezone'):
+                    raise NotEligible(name)
+                kind = 'datetime'
+            elif isinstance(field, serializers.ChoiceField):
+                kind = 'raw'  # DRF maps a stored choice back to itself
+            elif isinstance(field, serializers.IntegerField):
+                kind = 'int'
+            elif isinstance(field, serializers.FloatField):
+                kind = 'float'
+            elif isinstance(field, serializers.CharField):
+                kind = 'str'
+            elif type(field) in (serializers.ReadOnlyField, serializers.PrimaryKeyRelatedField):
+                kind = 'raw'
+            else:
+                raise NotEligible(name)
+            if isinstance(field, serializers.PrimaryKeyRelatedField):
+                column = f'{column}_id'
+            self.fields.append((name, column, kind, None, parent))
+            self._column(column)
+
+    def _column(self, column):
+        if column not in self.columns:
+            self.columns.append(column)
+
+    @classmethod
+    def for_serializer(cls, serializer_class, names=None):
+        """Plan for ``serializer_class`` (restricted to ``names``), or None if it is not eligible"""
+        key = (serializer_class, names)
+        if key not in _plans:
+            try:
+                _plans[key] = cls(serializer_class, names)
+            except (NotEligible, FieldDoesNotExist, AttributeError):
+                _plans[key] = None
+        return _plans[key]
+
+    def values(self, queryset, extra=()):
+        """values() queryset with the plan's columns plus ``extra`` (e.g. ordering keys)"""
+        columns = list(self.columns)
+        for column in extra:
+            if column not in columns:
+                columns.append(column)
+        return queryset.values(*columns)
+
+    def rows(self, values):
+        """Output dicts for values() rows, equal to serializer(..., many=True).data"""
+        fields = self.fields
+        utc = timezone.get_current_timezone_name() == 'UTC'
+        result = []
+        for row in values:
+            out = {}
+            for name, column, kind, labels, parent in fields:
+                value = row[column]
+                if parent is not None and row[parent] is None:
+                    continue
+                if value is None:
+                    out[name] = None
+                elif kind == 'label':
+                    out[name] = labels.get(value, str(value))
+                elif kind == 'datetime':
+                    # orjson formats UTC datetimes exactly like DRF; elsewhere use DRF's rules
+                    out[name] = value if utc and orjson is not None else _isoformat(value)
+                elif kind == 'str':
+                    out[name] = value if type(value) is str else str(value)
+                elif kind == 'int':
+                    out[name] = int(value)
+                elif kind == 'float':
+                    out[name] = float(value)
+                else:
+                    out[name] = value
+            result.append(out)
+        return result
+
+
+def _isoformat(value):
+    """DRF DateTimeField's default (ISO 8601) representation"""
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    value = value.isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def _orjson_safe(value):
+    # Python writes floats below 1e-4 or from 1e16 up in exponent notation, orjson does not
+    if type(value) is float:
+        return value == 0 or (1e-4 <= abs(value) < 1e16)
+    if isinstance(value, dict):
+        return all(_orjson_safe(v) for v in value.values())
+    if isinstance(value, list):
+        return all(_orjson_safe(v) for v in value)
+    return True
+
+
+def render_json(data):
+    """Bytes identical to DRF's JSONRenderer with the default (compact, unicode, strict) settings"""
+    if orjson is not None and _orjson_safe(data):
+        content = orjson.dumps(data, option=orjson.OPT_UTC_Z)
+    else:
+        content = json.dumps(
+            data, default=_default, ensure_ascii=False, allow_nan=False, separators=(',', ':')
+        ).encode('utf-8')
+    # Like DRF: U+2028/U+2029 are valid JSON but not valid JavaScript
+    return content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+def _default(value):
+    if hasattr(value, 'isoformat'):
+        return _isoformat(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def _renders_default_json(request):
+    renderer = getattr(request, 'accepted_renderer', None)
+    return (
+        type(renderer) is JSONRenderer
+        and not renderer.ensure_ascii and renderer.compact and renderer.strict
+        and renderer.get_indent(request.accepted_media_type, {}) is None
+    )
+
+
+class FastJSONResponse(Response):
+    """Response rendered with render_json; only used when JSONRenderer with default settings was negotiated"""
+
+    @property
+    def rendered_content(self):
+        renderer = self.accepted_renderer
+        if self.content_type is None and renderer.charset:
+            self['Content-Type'] = f'{renderer.media_type}; charset={renderer.charset}'
+        else:
+            self['Content-Type'] = self.content_type or renderer.media_type
+        return render_json(self.data)
+
+
+def fast_list_response(view, serializer_class):
+    """Paginated list response built through a FastListPlan, or None when the fast path does not apply"""
+    if not getattr(settings, 'FAST_LIST_SERIALIZATION', True):
+        return None
+    request = view.request
+    names = view.sparse_fields(serializer_class) if hasattr(view, 'sparse_fields') else None
+    plan = FastListPlan.for_serializer(serializer_class, names)
+    paginator = view.paginator
+    if plan is None or paginator is None or not _renders_default_json(request):
+        return None
+    queryset = view.filter_queryset(view.get_queryset())
+    extra = [name.lstrip('-') for name in getattr(paginator, 'ordering', ())]
+    extra += [name for name in getattr(view, 'ordering_fields', ()) if name != '__all__']
+    page = paginator.paginate_queryset(plan.values(queryset, extra), request, view=view)
+    return FastJSONResponse(paginator.get_paginated_data(plan.rows(page)))
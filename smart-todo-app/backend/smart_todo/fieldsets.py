@@ -0,0 +1,95 @@
+"""
+Sparse fieldsets: ``?fields=a,b`` and ``?omit=c`` on read endpoints.
+
+The selected serializer fields are mapped back to model columns so the
+queryset can be narrowed with ``.only()``; large text columns that were not
+asked for are never read. SerializerMethodFields declare the columns they
+read in ``Meta.method_field_sources``; a field that cannot be mapped simply
+disables the narrowing.
+"""
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+
+
+def _names(value):
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def requested_fields(request, available):
+    """Field names selected by ?fields= / ?omit=, in serializer order, or None if neither is given"""
+    fields = _names(request.query_params.get(FIELDS_PARAM, ''))
+    omit = _names(request.query_params.get(OMIT_PARAM, ''))
+    if not fields and not omit:
+        return None
+    unknown = [name for name in fields + omit if name not in available]
+    if unknown:
+        raise ValidationError({'fields': [f"Unknown field(s): {', '.join(unknown)}"]})
+    return tuple(name for name in available if (not fields or name in fields) and name not in omit)
+
+
+def model_columns(serializer, names):
+    """Model lookups that ``names`` of ``serializer`` read, for .only(); None if unknown"""
+    model = serializer.Meta.model
+    method_sources = getattr(serializer.Meta, 'method_field_sources', {})
+    columns = []
+    for name in names:
+        field = serializer.fields[name]
+        if isinstance(field, serializers.SerializerMethodField):
+            if name not in method_sources:
+                return None
+            columns.extend(method_sources[name])
+            continue
+        source = field.source
+        if source.startswith('get_') and source.endswith('_display'):
+            source = source[len('get_'):-len('_display')]
+        column = source.replace('.', '__')
+        try:
+            model._meta.get_field(column.split('__')[0])
+        except FieldDoesNotExist:
+            return None
+        columns.append(column)
+    return columns
+
+
+class SparseFieldsetMixin:
+    """Apply ?fields= / ?omit= to the serializer and narrow GET querysets with .only()"""
+
+    def sparse_fields(self, serializer_class=None):
+        if self.request is None or self.request.method not in SAFE_METHODS:
+            return None
+        serializer_class = serializer_class or self.get_serializer_class()
+        return requested_fields(self.request, list(serializer_class().fields))
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        names = self.sparse_fields()
+        if names is None:
+            return queryset
+        columns = model_columns(self.get_serializer_class()(), names)
+        if columns is None:
+            return queryset
+        # Keyset cursors read the ordering columns from each row
+        ordering = [name.lstrip('-') for name in getattr(self.paginator, 'ordering', ()) or ()]
+        ordering += [name for name in getattr(self, 'ordering_fields', ()) if name != '__all__']
+        # only() cannot defer a select_related() relation, so join just the ones still read
+        relations = {column.split('__')[0] for column in columns if '__' in column}
+        queryset = queryset.select_related(None)
+        if relations:
+            queryset = queryset.select_related(*relations)
+        return queryset.only('pk', *columns, *ordering)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        names = self.sparse_fields()
+        if names is not None:
+            fields = getattr(serializer, 'child', serializer).fields
+            for name in list(fields):
+                if name not in names:
+                    fields.pop(name)
+        return serializer
@@ -0,0 +1,197 @@
+"""
+Full-text search over model text columns.
+
+On SQLite an external-content FTS5 table ``<table>_fts`` mirrors the
+columns and is kept in sync by triggers, so queryset.update() and raw SQL
+writes are indexed too; a post_migrate receiver reinstalls those triggers
+when a migration rebuilds the table. On PostgreSQL a generated ``search_vector``
+tsvector column with a GIN index is used instead. Other backends fall back
+to unranked ``icontains`` filtering.
+"""
+
+import re
+from django.conf import settings
+from django.db import connections, migrations
+from django.db.models import Q
+
+MAX_TERMS = 16
+_TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def _fts_table(table):
+    return f'{table}_fts'
+
+
+def _create_statements(vendor, table, columns, weights=None):
+    fts = _fts_table(table)
+    if vendor == 'sqlite':
+        cols = ', '.join(columns)
+        new = ', '.join(f'new.{c}' for c in columns)
+        old = ', '.join(f'old.{c}' for c in columns)
+        statements = [
+            f"CREATE VIRTUAL TABLE {fts} USING fts5({cols}, content='{table}', content_rowid='id', "
+            f"tokenize='unicode61 remove_diacritics 2')",
+            f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+            f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); END",
+            f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); "
+            f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+            f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+        ]
+    elif vendor == 'postgresql':
+        weights = weights or ['A'] + ['B'] * (len(columns) - 1)
+        vector = ' || '.join(
+            f"setweight(to_tsvector('english', coalesce({c}, '')), '{w}')" for c, w in zip(columns, weights)
+        )
+        statements = [
+            f"ALTER TABLE {table} ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ({vector}) STORED",
+            f"CREATE INDEX {table}_search_idx ON {table} USING GIN (search_vector)",
+        ]
+    else:
+        statements = []
+    return statements
+
+
+def _drop_statements(vendor, table):
+    fts = _fts_table(table)
+    if vendor == 'sqlite':
+        statements = [f"DROP TRIGGER IF EXISTS {fts}_{suffix}" for suffix in ('ai', 'ad', 'au')]
+        statements.append(f"DROP TABLE IF EXISTS {fts}")
+    elif vendor == 'postgresql':
+        statements = [
+            f"DROP INDEX IF EXISTS {table}_search_idx",
+            f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector",
+        ]
+    else:
+        statements = []
+    return statements
+
+
+def create_fulltext_index(schema_editor, table, columns, weights=None):
+    """Create the search index for ``columns`` of ``table`` and fill it (for migrations)"""
+    for statement in _create_statements(schema_editor.connection.vendor, table, columns, weights):
+        schema_editor.execute(statement)
+
+
+def drop_fulltext_index(schema_editor, table, columns):
+    for statement in _drop_statements(schema_editor.connection.vendor, table):
+        schema_editor.execute(statement)
+
+
+def rebuild_fulltext_operations(table, columns):
+    """RunPython operations to put before and after schema changes that make SQLite rebuild ``table``.
+
+    SQLite applies AddField, AlterField and most constraints by copying the
+    table, which drops the FTS triggers. restore_fulltext_triggers() repairs
+    that after every migrate; these keep the index working between the
+    migrations of one run and when migrating backwards.
+    """
+    def rebuild(apps, schema_editor):
+        if schema_editor.connection.vendor == 'sqlite':
+            drop_fulltext_index(schema_editor, table, columns)
+            create_fulltext_index(schema_editor, table, columns)
+
+    return (migrations.RunPython(migrations.RunPython.noop, rebuild),
+            migrations.RunPython(rebuild, migrations.RunPython.noop))
+
+
+# Indexed tables and their columns, registered by the apps that own them
+FULLTEXT_INDEXES = {}
+
+
+def register_fulltext_index(table, columns):
+    FULLTEXT_INDEXES[table] = list(columns)
+
+
+def restore_fulltext_triggers(using='default', **kwargs):
+    """post_migrate receiver: reinstall and refill SQLite FTS indexes whose triggers a table rebuild dropped"""
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+        existing = {row[0] for row in cursor.fetchall()}
+        for table, columns in FULLTEXT_INDEXES.items():
+            fts = _fts_table(table)
+            # No FTS table means the migration creating it has not run (yet)
+            if fts not in existing or {f'{fts}_ai', f'{fts}_ad', f'{fts}_au'} <= existing:
+                continue
+            for statement in _drop_statements('sqlite', table) + _create_statements('sqlite', table, columns):
+                cursor.execute(statement)
+
+
+def search_terms(text):
+    return _TERM_RE.findall(text or '')[:MAX_TERMS]
+
+
+def fts5_query(terms):
+    """Quote each term so user input cannot use FTS5 syntax; all terms must match"""
+    return ' '.join('"{}"'.format(term.replace('"', '""')) for term in terms)
+
+
+def _filter_sql(column, queryset, using):
+    """``AND <column> IN (<queryset's primary keys>)`` and its params; nothing for an unfiltered queryset"""
+    if queryset is None or not queryset.query.has_filters():
+        return '', []
+    sql, params = queryset.order_by().values('pk').query.get_compiler(using).as_sql()
+    return f' AND {column} IN ({sql})', list(params)
+
+
+def ranked_ids(model, text, limit, columns=1, using='default', within=None):
+    """Primary keys of the best ``limit`` matches for ``text``, best first.
+
+    As with the PostgreSQL setweight() above, the first of ``columns``
+    indexed columns counts more than the rest. Only rows of the ``within``
+    queryset are matched, its filters applied in the same query.
+    """
+    terms = search_terms(text)
+    if not terms:
+        return []
+    connection = connections[using]
+    table = model._meta.db_table
+    if connection.vendor == 'sqlite':
+        fts = _fts_table(table)
+        match = fts5_query(terms)
+        weights = ', '.join(['10.0'] + ['1.0'] * (columns - 1))
+        within_sql, within_params = _filter_sql('rowid', within, using)
+        # Scoring every match of a very common term costs seconds at 1M rows,
+        # so only the newest FULLTEXT_MAX_RANKED matches are scored. Walking
+        # doc ids in rowid order is cheap; scoring them is not.
+        max_ranked = getattr(settings, 'FULLTEXT_MAX_RANKED', 2000)
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT rowid FROM {fts} WHERE {fts} MATCH %s{within_sql} "
+                           f"ORDER BY rowid DESC LIMIT 1 OFFSET %s", [match, *within_params, max_ranked])
+            boundary = cursor.fetchone()
+        # bm25() is lower for better matches
+        sql = (f"SELECT rowid FROM {fts} WHERE {fts} MATCH %s AND rowid > %s{within_sql} "
+               f"ORDER BY bm25({fts}, {weights}) LIMIT %s")
+        params = [match, boundary[0] if boundary else 0, *within_params, limit]
+    elif connection.vendor == 'postgresql':
+        within_sql, within_params = _filter_sql(f'{table}.id', within, using)
+        sql = (f"SELECT id FROM {table}, websearch_to_tsquery('english', %s) query "
+               f"WHERE search_vector @@ query{within_sql} ORDER BY ts_rank(search_vector, query) DESC, id LIMIT %s")
+        params = [' '.join(terms), *within_params, limit]
+    else:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def fulltext_search(queryset, text, fields, limit):
+    """Ranked matches for ``text`` within ``queryset`` as a list, best first.
+
+    ``fields`` are the indexed columns, in the order they were indexed.
+    The queryset's filters are applied before ranking, so a filtered search
+    still returns up to ``limit`` rows.
+    """
+    ids = ranked_ids(queryset.model, text, limit, columns=len(fields), using=queryset.db, within=queryset)
+    if ids is None:
+        condition = Q()
+        for term in search_terms(text):
+            condition &= Q(*[Q(**{f'{field}__icontains': term}) for field in fields], _connector=Q.OR)
+        return list(queryset.filter(condition)[:limit]) if condition else []
+    rows = queryset.in_bulk(ids)
+    return [rows[pk] for pk in ids if pk in rows]
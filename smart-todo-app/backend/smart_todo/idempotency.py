@@ -0,0 +1,134 @@
+import functools
+import hashlib
+import json
+import threading
+import time
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+# In-process waiters for requests that are still running, keyed by cache key.
+# Retries landing on another worker fall back to polling the cache.
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+POLL_INTERVAL = 0.05
+
+
+def _cache_key(request, idempotency_key):
+    user = request.user.pk if getattr(request, 'user', None) and request.user.is_authenticated else 'anon'
+    material = f"{request.method}:{request.path}:{user}:{idempotency_key}"
+    return 'idempotency:' + hashlib.sha256(material.encode()).hexdigest()
+
+
+def _fingerprint(request):
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def _replay(record, fingerprint):
+    if record['fingerprint'] != fingerprint:
+        return Response(
+            {'error': 'Idempotency-Key was already used with a different request body'},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+    response = Response(record['data'], status=record['status'])
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def _wait_for(key, timeout):
+    """Wait until the in-flight request for key finishes; return its record or None"""
+    with _inflight_lock:
+        event = _inflight.get(key)
+    deadline = time.monotonic() + timeout
+    if event is not None:
+        event.wait(timeout)
+    while True:
+        record = cache.get(key)
+        if record is None or record['state'] == 'completed':
+            return record
+        if time.monotonic() >= deadline:
+            return record
+        time.sleep(POLL_INTERVAL)
+
+
+def _keep_marker(key, timeout, stop):
+    """Extend the in-progress marker until ``stop`` is set, so a slow handler never loses it"""
+    while not stop.wait(timeout / 3):
+        cache.touch(key, timeout)
+
+
+def idempotent(view_method):
+    """Make a DRF view method safe to retry with an ``Idempotency-Key`` header.
+
+    The first request with a key runs normally and its response is stored for
+    IDEMPOTENCY_TTL seconds; later requests with the same key (and body) get
+    the stored response. A retry arriving while the first request is still
+    running waits for it instead of starting new work. Requests without the
+    header are not affected; 5xx responses and exceptions are not stored.
+    """
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        idempotency_key = request.headers.get('Idempotency-Key')
+        if not idempotency_key:
+            return view_method(self, request, *args, **kwargs)
+
+        key = _cache_key(request, idempotency_key)
+        fingerprint = _fingerprint(request)
+        ttl = getattr(settings, 'IDEMPOTENCY_TTL', 60 * 60 * 24)
+        wait_timeout = getattr(settings, 'IDEMPOTENCY_WAIT_TIMEOUT', 30)
+        marker_timeout = getattr(settings, 'IDEMPOTENCY_IN_PROGRESS_TIMEOUT', 5 * 60)
+
+        while True:
+            if cache.add(key, {'state': 'in_progress', 'fingerprint': fingerprint}, marker_timeout):
+                break
+            record = cache.get(key)
+            if record is None:
+                continue
+            if record['state'] == 'in_progress':
+                if record['fingerprint'] != fingerprint:
+                    return _replay(record, fingerprint)
+                record = _wait_for(key, wait_timeout)
+                if record is None:
+                    # The original failed; run this request ourselves
+                    continue
+                if record['state'] != 'completed':
+                    return Response(
+                        {'error': 'A request with this Idempotency-Key is still in progress'},
+                        status=status.HTTP_409_CONFLICT
+                    )
+            return _replay(record, fingerprint)
+
+        event = threading.Event()
+        with _inflight_lock:
+            _inflight[key] = event
+        stop = threading.Event()
+        keeper = threading.Thread(target=_keep_marker, args=(key, marker_timeout, stop), daemon=True)
+        keeper.start()
+        completed = False
+        try:
+            try:
+                response = view_method(self, request, *args, **kwargs)
+            finally:
+                # Stopped before the response is stored, which must keep its own TTL
+                stop.set()
+                keeper.join()
+            if response.status_code < 500:
+                cache.set(key, {
+                    'state': 'completed',
+                    'fingerprint': fingerprint,
+                    'status': response.status_code,
+                    'data': response.data,
+                }, ttl)
+                completed = True
+            return response
+        finally:
+            if not completed:
+                cache.delete(key)
+            with _inflight_lock:
+                _inflight.pop(key, None)
+            event.set()
+
+    return wrapper
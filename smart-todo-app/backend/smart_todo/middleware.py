@@ -0,0 +1,15 @@
+from django.middleware.gzip import GZipMiddleware
+
+
+class StreamingAwareGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that leaves server-sent event streams alone.
+
+    Compressing an event stream writes each event as a separate gzip member:
+    extra bytes per event, and some clients and proxies only decode the first
+    member or hold the events back.
+    """
+
+    def process_response(self, request, response):
+        if response.get('Content-Type', '').startswith('text/event-stream'):
+            return response
+        return super().process_response(request, response)
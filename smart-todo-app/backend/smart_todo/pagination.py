@@ -0,0 +1,205 @@
+import base64
+import json
+from collections import OrderedDict
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination on a composite key.
+
+    Unlike DRF's CursorPagination, which stores only the first ordering field
+    plus an offset, the cursor holds the full ordering tuple of the boundary
+    row. The next page is fetched with a lexicographic WHERE clause on that
+    tuple, so page N costs the same as page 1. The ordering must end with a
+    unique field (``id``); nullable fields are ordered NULLS LAST.
+    """
+    ordering = ('-created_at', 'id')
+    page_size = getattr(settings, 'REST_FRAMEWORK', {}).get('PAGE_SIZE', 20)
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.model = queryset.model
+        self.ordering_terms = self.get_ordering(request, queryset, view)
+
+        cursor = self.decode_cursor(request)
+        reverse = bool(cursor and cursor['r'])
+        terms = [self._flip(term) for term in self.ordering_terms] if reverse else self.ordering_terms
+
+        queryset = queryset.order_by(*[self._order_expression(term) for term in terms])
+        if cursor:
+            queryset = queryset.filter(self._after(terms, cursor['v']))
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        self.page = rows
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+            if size > 0:
+                return min(size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+    def get_ordering(self, request, queryset, view):
+        """Ordering terms (field, descending, nulls_first, nullable), honouring ?ordering= and ending in a unique key"""
+        ordering = list(self.ordering)
+        for backend in getattr(view, 'filter_backends', []):
+            if issubclass(backend, OrderingFilter):
+                requested = backend().get_ordering(request, queryset, view)
+                if requested and request.query_params.get(backend.ordering_param):
+                    ordering = list(requested)
+                break
+        if not any(name.lstrip('-') in ('id', 'pk') for name in ordering):
+            ordering.append('id')
+
+        terms = []
+        for name in ordering:
+            field_name = name.lstrip('-')
+            if field_name == 'pk':
+                field_name = 'id'
+            try:
+                field = self.model._meta.get_field(field_name)
+            except FieldDoesNotExist:
+                continue
+            terms.append((field_name, name.startswith('-'), False, field.null))
+        return terms
+
+    @staticmethod
+    def _flip(term):
+        name, descending, nulls_first, nullable = term
+        return (name, not descending, not nulls_first, nullable)
+
+    @staticmethod
+    def _order_expression(term):
+        name, descending, nulls_first, nullable = term
+        if not nullable:
+            return f'-{name}' if descending else name
+        expression = F(name).desc if descending else F(name).asc
+        return expression(nulls_first=True) if nulls_first else expression(nulls_last=True)
+
+    def _after(self, terms, values):
+        """Rows strictly after the cursor position in the given ordering"""
+        condition = Q(pk__in=[])
+        equal_prefix = Q()
+        for (name, descending, nulls_first, nullable), value in zip(terms, values):
+            if value is None:
+                beyond = Q(**{f'{name}__isnull': False}) if nulls_first else Q(pk__in=[])
+                same = Q(**{f'{name}__isnull': True})
+            else:
+                beyond = Q(**{f'{name}__{"lt" if descending else "gt"}': value})
+                if nullable and not nulls_first:
+                    beyond |= Q(**{f'{name}__isnull': True})
+                same = Q(**{name: value})
+            condition |= equal_prefix & beyond
+            equal_prefix &= same
+        name, descending, _, nullable = terms[0]
+        if values[0] is not None and not nullable:
+            # Redundant range on the leading column lets the index seek to the cursor
+            condition &= Q(**{f'{name}__{"lte" if descending else "gte"}': values[0]})
+        return condition
+
+    def _position(self, row):
+        values = []
+        for name, _, _, _ in self.ordering_terms:
+            value = row[name] if isinstance(row, dict) else getattr(row, 'pk' if name == 'id' else name)
+            values.append(_json_value(value))
+        return values
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            if len(cursor['v']) != len(self.ordering_terms):
+                raise ValueError
+            values = []
+            for (name, _, _, _), raw in zip(self.ordering_terms, cursor['v']):
+                values.append(None if raw is None else self.model._meta.get_field(name).to_python(raw))
+            return {'v': values, 'r': bool(cursor.get('r'))}
+        except (TypeError, ValueError, KeyError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, row, reverse):
+        data = json.dumps({'v': self._position(row), 'r': int(reverse)}, separators=(',', ':'))
+        encoded = base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_data(self, data):
+        return OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ])
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+def _json_value(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+class TaskKeysetPagination(KeysetPagination):
+    ordering = ('-priority_score', '-created_at', 'id')
+
+
+class ContextKeysetPagination(KeysetPagination):
+    ordering = ('-created_at', 'id')
+
+
+class PaginatedActionMixin:
+    """Paginate list-style @action responses the same way as ``list``"""
+
+    def paginated_response(self, queryset):
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(self.get_serializer(queryset, many=True).data)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
@@ -45,9 +45,11 @@ INSTALLED_APPS = [
     'tasks',
     'context',
     'ai_engine',
+    'sync',
 ]
 
 MIDDLEWARE = [
+    'smart_todo.middleware.StreamingAwareGZipMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -158,3 +160,76 @@ CORS_ALLOW_ALL_ORIGINS = True
 # AI Configuration
 OPENAI_API_KEY = config('OPENAI_API_KEY', default='')
 LM_STUDIO_URL = config('LM_STUDIO_URL', default='http://localhost:1234')
+OPENAI_BASE_URL = config('OPENAI_BASE_URL', default='https://api.openai.com')
+
+# AI record/replay: 'off', 'record' (save real prompt->response pairs to
+# AI_RECORD_DIR) or 'replay' (serve recorded responses, no network calls).
+AI_RECORD_MODE = config('AI_RECORD_MODE', default='off')
+AI_RECORD_DIR = config('AI_RECORD_DIR', default=str(BASE_DIR / 'ai_recordings'))
+
+# Per-prompt-type model routing overrides, merged over ai_engine.routing.MODEL_ROUTES.
+# Example: {'enhance': {'backend': 'openai', 'model': 'gpt-4o', 'max_tokens': 800}}
+AI_MODEL_ROUTES = {}
+
+# Idempotency-Key support for AI POST endpoints: how long completed responses
+# are kept, and how long a retry waits for an in-flight original. The marker
+# of an in-flight request expires after IDEMPOTENCY_IN_PROGRESS_TIMEOUT seconds
+# unless refreshed (a running request refreshes it), e.g. after a worker crash.
+IDEMPOTENCY_TTL = 60 * 60 * 24
+IDEMPOTENCY_WAIT_TIMEOUT = 30
+IDEMPOTENCY_IN_PROGRESS_TIMEOUT = 5 * 60
+
+# Serve /api/tasks/statistics/ from counters maintained on task writes instead
+# of aggregating the tasks table. Run `manage.py rebuild_task_counters` after
+# enabling it on an existing database.
+TASK_STATISTICS_COUNTERS = config('TASK_STATISTICS_COUNTERS', default=False, cast=bool)
+
+# Full-text search ranks only the newest N matches of a query, which keeps
+# very common terms fast on large tables (SQLite FTS5).
+FULLTEXT_MAX_RANKED = 2000
+
+# Each process keeps an in-memory trigram index for fuzzy_search, updated on
+# its own writes and reloaded after this many seconds to pick up the rest.
+FUZZY_INDEX_MAX_AGE = 300
+
+# Lifetime of cached analytics responses. Entries are also invalidated by
+# writes to the collections they are tagged with.
+RESPONSE_CACHE_TTL = 60 * 60
+
+# Task and context list pages are built from .values() rows and rendered with
+# orjson (when installed) instead of DRF serializers; the bytes are identical.
+FAST_LIST_SERIALIZATION = True
+
+# Rows per validation chunk and bulk_create transaction in /api/tasks/import/
+TASK_IMPORT_BATCH_SIZE = 1000
+
+# Rows per select_for_update/bulk_update transaction in PATCH /api/tasks/bulk_update/
+BULK_UPDATE_BATCH_SIZE = 500
+
+# Rows fetched per database round trip (and per Parquet row group) by the
+# streaming export actions
+EXPORT_CHUNK_SIZE = 2000
+
+# Change log entries per page of /api/sync/ (?limit= may ask for up to 2000)
+SYNC_PAGE_SIZE = 500
+# Sync cursors wait this many seconds for a change log entry whose seq was
+# taken by a transaction that has not committed yet (not needed on SQLite).
+# Transactions that stay open longer after logging a change may be skipped.
+SYNC_GAP_TIMEOUT = 60
+
+# Push of changes over /api/sync/events/ (SSE) and /ws/changes/ (ASGI only).
+# ChangeLogBroker tails the change log, so it also sees other workers and
+# manage.py enrich_tasks; LocalBroker only fans out this process's writes.
+REALTIME_BROKER = 'sync.realtime.ChangeLogBroker'
+REALTIME_POLL_INTERVAL = 1.0  # seconds between change log reads while clients are connected
+REALTIME_HEARTBEAT = 15  # seconds of quiet before a keep-alive is sent
+
+# Threads that compute /api/dashboard/ sections in parallel (not on SQLite)
+DASHBOARD_WORKERS = 4
+
+# Operations accepted in one POST /api/batch/ request
+BATCH_MAX_OPERATIONS = 50
+
+# Days ahead for which manage.py materialize_occurrences creates the
+# occurrences of recurring tasks. Run it regularly, e.g. daily from cron.
+RECURRENCE_WINDOW_DAYS = 28
@@ -17,6 +17,8 @@ Including another URLconf
 from django.contrib import admin
 from django.http import JsonResponse
 from django.urls import path, include
+from .batch import BatchView
+from .dashboard import dashboard
 
 def api_root(request):
     return JsonResponse({
@@ -58,6 +60,15 @@ def api_root(request):
                 "/api/context/feedback/",
                 "/api/context/external_events/",
             ],
+            "dashboard": [
+                "/api/dashboard/",
+            ],
+            "batch": [
+                "/api/batch/",
+            ],
+            "sync": [
+                "/api/sync/?since={cursor}",
+            ],
             "authentication": [
                 "/api-auth/",
             ],
@@ -83,5 +94,8 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('tasks.urls')),
     path('', include('context.urls')),
+    path('', include('sync.urls')),
+    path('api/dashboard/', dashboard, name='dashboard'),
+    path('api/batch/', BatchView.as_view(), name='batch'),
     path('api-auth/', include('rest_framework.urls')),
 ]
@@ -0,0 +1,173 @@
+"""
+Collection version counters, conditional GET and response caching.
+
+Each collection ("tasks", "context", ...) has a counter in the Django cache
+that is bumped whenever one of its models is written. Views decorated with
+``conditional`` derive a strong ETag from the counters and the request, and
+answer a matching ``If-None-Match`` with 304 before running any queries.
+``cached_response`` stores response data under a key that includes the
+counters, so a write invalidates exactly the entries tagged with its
+collection; entries can also (or only) expire after a TTL.
+
+The counters must live in a cache shared by all workers (Redis, Memcached);
+the default per-process LocMemCache is only correct for a single process.
+"""
+
+import functools
+import hashlib
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from rest_framework import status
+from rest_framework.response import Response
+
+_tracked = set()  # collections registered with track()
+
+def _key(collection):
+    return f'collection-version:{collection}'
+
+
+def _seed():
+    # Microseconds since the epoch: after a cache flush the counter restarts
+    # above any value it reached before, so old ETags never match again.
+    return time.time_ns() // 1000
+
+
+def collection_version(collection):
+    key = _key(collection)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _seed(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_collection(collection):
+    key = _key(collection)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, _seed(), None)
+        return cache.incr(key)
+
+
+def collection_changed(collection):
+    """Bump now, so in-flight readers miss, and again on commit, so ETags taken before commit go stale"""
+    bump_collection(collection)
+    transaction.on_commit(lambda: bump_collection(collection))
+
+
+def track(model, collection):
+    """Bump ``collection`` whenever an instance of ``model`` is saved or deleted"""
+    _tracked.add(collection)
+
+    def receiver(sender, **kwargs):
+        collection_changed(collection)
+
+    uid = f'versioning:{model._meta.label}:{collection}'
+    post_save.connect(receiver, sender=model, weak=False, dispatch_uid=uid)
+    post_delete.connect(receiver, sender=model, weak=False, dispatch_uid=uid)
+
+
+def bump_tracked_collections():
+    """Bump every tracked collection, e.g. after a rollback undid writes readers may have cached"""
+    for collection in sorted(_tracked):
+        bump_collection(collection)
+
+
+def etag_for(request, collections):
+    material = '|'.join(
+        [request.get_full_path(), request.headers.get('Accept', '')]
+        + [f'{c}={collection_version(c)}' for c in collections]
+    )
+    return '"{}"'.format(hashlib.sha256(material.encode()).hexdigest()[:32])
+
+
+def etag_matches(etag, if_none_match):
+    """Weak comparison, as RFC 9110 requires for If-None-Match"""
+    if if_none_match.strip() == '*':
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    return any(tag.removeprefix('W/') == etag for tag in candidates)
+
+
+def conditional(*collections, time_params=()):
+    """Add an ETag to successful GET responses and answer If-None-Match with 304.
+
+    The ETag depends only on the request and the collection versions, so the
+    view must not depend on anything else (e.g. the current time). Requests
+    with any of the query parameters in ``time_params``, which make the
+    response depend on the current time, are served without an ETag.
+    """
+    def decorator(view_method):
+        @functools.wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            if any(name in request.query_params for name in time_params):
+                return view_method(self, request, *args, **kwargs)
+            # Taken before the view runs: a write during the view leaves this
+            # ETag stale, which costs one extra 200, never a wrong 304.
+            etag = etag_for(request, collections)
+            if_none_match = request.headers.get('If-None-Match')
+            if if_none_match and etag_matches(etag, if_none_match):
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            else:
+                response = view_method(self, request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+            response['ETag'] = etag
+            response['Cache-Control'] = 'no-cache'
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def cached_data(name, compute, tags=(), ttl=None, vary=''):
+    """Return compute() cached under ``name`` and ``vary``.
+
+    With ``tags`` the entry is invalidated by any write to those
+    collections; ``ttl`` (seconds) bounds its age either way. Without tags
+    only the TTL applies. Entries default to RESPONSE_CACHE_TTL.
+    """
+    # Versions are read before computing, so a concurrent write can only
+    # make the stored entry unreachable, never hide the write.
+    material = '|'.join([name, vary] + [f'{t}={collection_version(t)}' for t in tags])
+    key = 'response-cache:' + hashlib.sha256(material.encode()).hexdigest()
+    data = cache.get(key)
+    if data is None:
+        data = compute()
+        if data is not None:
+            cache.set(key, data, ttl if ttl is not None else getattr(settings, 'RESPONSE_CACHE_TTL', 60 * 60))
+    return data
+
+
+def cached_response(*tags, ttl=None, vary=None):
+    """Cache the data of successful GET responses per path and query string.
+
+    ``vary(request)`` may return extra key material, e.g. the current date
+    for views that depend on it.
+    """
+    def decorator(view_method):
+        @functools.wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            uncached = []
+
+            def compute():
+                response = view_method(self, request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    uncached.append(response)
+                    return None
+                return response.data
+
+            key = '|'.join([request.get_full_path(), request.headers.get('Accept', ''),
+                            vary(request) if vary else ''])
+            name = f'{type(self).__name__}.{view_method.__name__}'
+            data = cached_data(name, compute, tags, ttl, key)
+            return uncached[0] if uncached else Response(data)
+
+        return wrapper
+
+    return decorator
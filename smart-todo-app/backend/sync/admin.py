@@ -0,0 +1,8 @@
+from django.contrib import admin
+from .models import ChangeLogEntry
+
+@admin.register(ChangeLogEntry)
+class ChangeLogEntryAdmin(admin.ModelAdmin):
+    list_display = ['seq', 'object_type', 'object_id', 'action', 'created_at']
+    list_filter = ['object_type', 'action']
+    ordering = ['-seq']
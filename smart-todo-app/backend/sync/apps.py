@@ -0,0 +1,17 @@
+from django.apps import AppConfig
+
+
+class SyncConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'sync'
+
+    def ready(self):
+        from .changelog import track_changes, record_category_tasks
+        from django.db.models.signals import pre_delete
+        from tasks.models import Task, Category
+        from context.models import ContextEntry
+        track_changes(Task, 'task')
+        track_changes(Category, 'category')
+        track_changes(ContextEntry, 'context')
+        # Deleting a category nulls its tasks' category with a queryset update
+        pre_delete.connect(record_category_tasks, sender=Category, dispatch_uid='sync:category-tasks')
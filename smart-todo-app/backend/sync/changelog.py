@@ -0,0 +1,80 @@
+# Recording writes to synced models in the change log, and reading it back in order
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models.signals import post_save, post_delete
+from django.utils import timezone
+from .models import ChangeLogEntry
+
+
+def _concurrent_writers():
+    # SQLite lets one transaction write at a time, so there seq order is commit order
+    return connection.vendor != 'sqlite'
+
+
+def settled_entries(since, limit=None):
+    """Up to ``limit`` entries after ``since`` as (seq, object_type, object_id, action), oldest first.
+
+    seq is taken when an entry is inserted, not when it commits: with
+    concurrent writers a missing seq may belong to a transaction still in
+    progress. Reading stops before such a hole until SYNC_GAP_TIMEOUT seconds
+    after the entry following it was written; older holes are rollbacks or
+    compacted entries. So a cursor is never moved past an entry whose
+    transaction commits within SYNC_GAP_TIMEOUT of writing it.
+    """
+    rows = list(ChangeLogEntry.objects.filter(seq__gt=since).order_by('seq')
+                .values_list('seq', 'object_type', 'object_id', 'action', 'created_at')[:limit])
+    if _concurrent_writers():
+        settled_before = timezone.now() - timedelta(seconds=getattr(settings, 'SYNC_GAP_TIMEOUT', 60))
+        previous = since
+        for index, (seq, *_, created_at) in enumerate(rows):
+            if seq != previous + 1 and created_at > settled_before:
+                rows = rows[:index]
+                break
+            previous = seq
+    return [row[:4] for row in rows]
+
+
+def latest_settled_seq():
+    """Newest cursor that no entry still being written can fall behind"""
+    entries = ChangeLogEntry.objects.order_by('-seq').values_list('seq', flat=True)
+    if not _concurrent_writers():
+        return entries.first() or 0
+    # Only the entries of the last SYNC_GAP_TIMEOUT seconds can have unsettled holes
+    settled_before = timezone.now() - timedelta(seconds=getattr(settings, 'SYNC_GAP_TIMEOUT', 60))
+    since = entries.filter(created_at__lte=settled_before).first() or 0
+    rows = settled_entries(since)
+    return rows[-1][0] if rows else since
+
+
+def _publish(entries):
+    # Push subscribers hear about the entries once they are visible to readers
+    from .realtime import event_for, get_broker
+    events = [event_for(e.seq, e.object_type, e.object_id, e.action) for e in entries]
+    transaction.on_commit(lambda: get_broker().publish(events))
+
+
+def record_changes(object_type, ids, action='upsert'):
+    """Log writes that send no signals (bulk_create, bulk_update, queryset.update)"""
+    entries = ChangeLogEntry.objects.bulk_create(
+        [ChangeLogEntry(object_type=object_type, object_id=pk, action=action) for pk in ids]
+    )
+    if entries:
+        _publish(entries)
+
+
+def track_changes(model, object_type):
+    """Log every save and delete of ``model`` instances"""
+    def saved(sender, instance, **kwargs):
+        _publish([ChangeLogEntry.objects.create(object_type=object_type, object_id=instance.pk)])
+
+    def deleted(sender, instance, **kwargs):
+        _publish([ChangeLogEntry.objects.create(object_type=object_type, object_id=instance.pk, action='delete')])
+
+    uid = f'sync:{model._meta.label}'
+    post_save.connect(saved, sender=model, weak=False, dispatch_uid=uid)
+    post_delete.connect(deleted, sender=model, weak=False, dispatch_uid=uid)
+
+
+def record_category_tasks(sender, instance, **kwargs):
+    record_changes('task', instance.task_set.values_list('pk', flat=True))
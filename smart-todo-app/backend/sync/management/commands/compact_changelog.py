@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Exists, OuterRef
+from sync.models import ChangeLogEntry
+
+
+class Command(BaseCommand):
+    help = 'Delete change log entries superseded by a later entry for the same row.'
+
+    def handle(self, *args, **options):
+        # Safe for every cursor: a client that has not seen an entry has not seen the later one either
+        later = ChangeLogEntry.objects.filter(object_type=OuterRef('object_type'),
+                                              object_id=OuterRef('object_id'), seq__gt=OuterRef('seq'))
+        deleted, _ = ChangeLogEntry.objects.filter(Exists(later)).delete()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} superseded change log entries"))
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:52
+
+from django.db import migrations, models
+
+
+def log_existing_rows(apps, schema_editor):
+    # Rows written before the log existed, so since=0 replays the full dataset
+    ChangeLogEntry = apps.get_model('sync', 'ChangeLogEntry')
+    for object_type, label in [('category', 'tasks.Category'), ('task', 'tasks.Task'),
+                               ('context', 'context.ContextEntry')]:
+        ids = apps.get_model(label).objects.order_by('pk').values_list('pk', flat=True)
+        ChangeLogEntry.objects.bulk_create(
+            (ChangeLogEntry(object_type=object_type, object_id=pk) for pk in ids.iterator()), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('tasks', '0007_task_version'),
+        ('context', '0004_contextentry_fulltext'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLogEntry',
+            fields=[
+                ('seq', models.BigAutoField(primary_key=True, serialize=False)),
+                ('object_type', models.CharField(choices=[('task', 'Task'), ('category', 'Category'), ('context', 'Context Entry')], max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('action', models.CharField(choices=[('upsert', 'Created or Updated'), ('delete', 'Deleted')], default='upsert', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['seq'],
+                'indexes': [models.Index(fields=['object_type', 'object_id', 'seq'], name='changelog_object_idx')],
+            },
+        ),
+        migrations.RunPython(log_existing_rows, migrations.RunPython.noop),
+    ]
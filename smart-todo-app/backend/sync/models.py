@@ -0,0 +1,31 @@
+from django.db import models
+
+
+class ChangeLogEntry(models.Model):
+    """One write to a synced row; deletes leave a tombstone. Append-only, read in seq order."""
+    OBJECT_TYPE_CHOICES = [
+        ('task', 'Task'),
+        ('category', 'Category'),
+        ('context', 'Context Entry'),
+    ]
+    ACTION_CHOICES = [
+        ('upsert', 'Created or Updated'),
+        ('delete', 'Deleted'),
+    ]
+
+    # The sync cursor: clients ask for entries with seq greater than the last one they saw
+    seq = models.BigAutoField(primary_key=True)
+    object_type = models.CharField(max_length=20, choices=OBJECT_TYPE_CHOICES)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES, default='upsert')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['seq']
+        indexes = [
+            # compact_changelog: later entries for the same row
+            models.Index(fields=['object_type', 'object_id', 'seq'], name='changelog_object_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.seq} {self.action} {self.object_type}:{self.object_id}"
@@ -0,0 +1,229 @@
+"""
+Push of change log events to subscribed clients, over SSE or a WebSocket.
+
+Events are the change log entries of ``sync.models`` as
+``{"seq", "type", "id", "action"}``; clients fetch the rows themselves with
+``/api/sync/?since=``. Fan-out happens in the process's event loop: each
+connection holds a Subscription queue that the broker fills.
+
+The broker is chosen by ``REALTIME_BROKER``:
+
+* ``LocalBroker`` delivers the writes committed by this process only. It
+  suits a single-process server.
+* ``ChangeLogBroker`` tails the change log table while anyone is subscribed.
+  It therefore also sees other workers and ``manage.py enrich_tasks``. A local
+  write wakes it at once; other writes arrive within ``REALTIME_POLL_INTERVAL``.
+
+Both need an ASGI server (uvicorn, daphne); see ``smart_todo/asgi.py``.
+"""
+
+import asyncio
+import json
+from urllib.parse import parse_qs
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.module_loading import import_string
+from .changelog import latest_settled_seq, settled_entries
+from .models import ChangeLogEntry
+
+OBJECT_TYPES = [choice for choice, _ in ChangeLogEntry.OBJECT_TYPE_CHOICES]
+REPLAY_LIMIT = 1000
+
+
+def event_for(seq, object_type, object_id, action):
+    return {'seq': seq, 'type': object_type, 'id': object_id, 'action': action}
+
+
+def events_since(since, limit=REPLAY_LIMIT):
+    """Up to ``limit`` logged events after ``since``, of every type, oldest first"""
+    return [event_for(*row) for row in settled_entries(since, limit)]
+
+
+def parse_types(value):
+    """Object types named in ``?types=task,context``; all of them if empty. None if unknown."""
+    types = [name.strip() for name in (value or '').split(',') if name.strip()]
+    if any(name not in OBJECT_TYPES for name in types):
+        return None
+    return types or list(OBJECT_TYPES)
+
+
+class Subscription:
+    """Bounded queue of events for one connection; on overflow the client is told to resync"""
+
+    def __init__(self, types):
+        self.types = set(types)
+        self.queue = asyncio.Queue(maxsize=getattr(settings, 'REALTIME_QUEUE_SIZE', 1000))
+        self.overflowed = False
+
+    def put(self, events):
+        for event in events:
+            if event['type'] not in self.types:
+                continue
+            try:
+                self.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self.overflowed = True
+                return
+
+    async def get(self, timeout):
+        """Next event, a ``resync`` marker after an overflow, or None after ``timeout`` seconds"""
+        if self.overflowed:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.overflowed = False
+            return {'type': 'resync'}
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class LocalBroker:
+    """Fans events committed in this process out to this process's subscribers"""
+
+    def __init__(self):
+        self.subscribers = set()
+        self.loop = None
+
+    def subscribe(self, types):
+        self.loop = asyncio.get_running_loop()
+        subscription = Subscription(types)
+        self.subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self.subscribers.discard(subscription)
+
+    def publish(self, events):
+        """Thread-safe; called after commit by the change log writers"""
+        loop = self.loop
+        if loop is None or loop.is_closed() or not self.subscribers:
+            return
+        loop.call_soon_threadsafe(self.deliver, events)
+
+    def deliver(self, events):
+        for subscription in list(self.subscribers):
+            subscription.put(events)
+
+
+class ChangeLogBroker(LocalBroker):
+    """Delivers every logged change, from any process, by tailing the change log"""
+
+    def __init__(self):
+        super().__init__()
+        self.tail = None
+        self.wake = None
+
+    def subscribe(self, types):
+        subscription = super().subscribe(types)
+        if self.tail is None or self.tail.done() or self.tail.get_loop() is not self.loop:
+            self.wake = asyncio.Event()
+            self.tail = self.loop.create_task(self._tail())
+        return subscription
+
+    def unsubscribe(self, subscription):
+        super().unsubscribe(subscription)
+        if not self.subscribers and self.wake is not None:
+            self.wake.set()  # let the tail stop now rather than after its poll interval
+
+    def publish(self, events):
+        # The events are in the log already: just skip the rest of the poll interval
+        loop, wake = self.loop, self.wake
+        if loop is not None and wake is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(wake.set)
+
+    async def _tail(self):
+        interval = getattr(settings, 'REALTIME_POLL_INTERVAL', 1.0)
+        cursor = await sync_to_async(latest_settled_seq)()
+        while self.subscribers:
+            events = await sync_to_async(events_since)(cursor)
+            if events:
+                cursor = events[-1]['seq']
+                self.deliver(events)
+                if len(events) == REPLAY_LIMIT:
+                    continue
+            self.wake.clear()
+            try:
+                await asyncio.wait_for(self.wake.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        _broker = import_string(getattr(settings, 'REALTIME_BROKER', 'sync.realtime.ChangeLogBroker'))()
+    return _broker
+
+
+async def change_stream(types, since=None):
+    """Events for one client: the logged ones after ``since``, then live ones.
+
+    Yields None when nothing happened for ``REALTIME_HEARTBEAT`` seconds, so
+    the transport can send a keep-alive. More than REPLAY_LIMIT missed events
+    yield a single ``resync`` marker instead.
+    """
+    broker = get_broker()
+    subscription = broker.subscribe(types)
+    heartbeat = getattr(settings, 'REALTIME_HEARTBEAT', 15)
+    try:
+        replayed = 0
+        if since is not None:
+            events = await sync_to_async(events_since)(since)
+            if len(events) == REPLAY_LIMIT:
+                yield {'type': 'resync'}
+            else:
+                for event in events:
+                    if event['type'] in types:
+                        yield event
+                replayed = events[-1]['seq'] if events else since
+        while True:
+            event = await subscription.get(heartbeat)
+            if event is not None and (event.get('seq') or replayed + 1) <= replayed:
+                continue  # committed during the replay, already sent
+            yield event
+    finally:
+        broker.unsubscribe(subscription)
+
+
+def _query_param(scope, name):
+    values = parse_qs(scope.get('query_string', b'').decode('latin-1')).get(name)
+    return values[0] if values else None
+
+
+async def websocket_changes(scope, receive, send):
+    """Raw ASGI WebSocket: ``ws://host/ws/changes/?types=task,context&since=<cursor>``.
+
+    Sends each event as a JSON text frame; messages from the client are ignored.
+    """
+    message = await receive()
+    if message['type'] != 'websocket.connect':
+        return
+    types = parse_types(_query_param(scope, 'types'))
+    since = _query_param(scope, 'since')
+    if types is None or (since is not None and not since.isdigit()):
+        await send({'type': 'websocket.close', 'code': 4400})
+        return
+    await send({'type': 'websocket.accept'})
+
+    async def forward():
+        async for event in change_stream(types, int(since) if since is not None else None):
+            await send({'type': 'websocket.send', 'text': json.dumps(event or {'type': 'ping'})})
+
+    forwarder = asyncio.ensure_future(forward())
+    try:
+        while True:
+            receiving = asyncio.ensure_future(receive())
+            done, _ = await asyncio.wait({receiving, forwarder}, return_when=asyncio.FIRST_COMPLETED)
+            if forwarder in done:
+                receiving.cancel()
+                forwarder.result()  # re-raise what stopped the stream
+                return
+            if receiving.result()['type'] == 'websocket.disconnect':
+                return
+    finally:
+        forwarder.cancel()
+        await asyncio.gather(forwarder, return_exceptions=True)  # runs the stream's unsubscribe
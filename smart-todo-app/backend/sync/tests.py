@@ -0,0 +1,179 @@
+import asyncio
+import json
+from asgiref.sync import sync_to_async
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from tasks.models import Task, Category
+from context.models import ContextEntry
+from .models import ChangeLogEntry
+from . import realtime
+
+
+class SyncAPITestCase(APITestCase):
+    def setUp(self):
+        self.work = Category.objects.create(name="Work")
+        self.task = Task.objects.create(title="Write report", description="d", category=self.work)
+        self.entry = ContextEntry.objects.create(content="Meeting moved to Friday", source_type="email")
+
+    def _sync(self, **params):
+        response = self.client.get(reverse('sync'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_initial_sync_returns_everything(self):
+        data = self._sync()
+        self.assertEqual([row['id'] for row in data['tasks']['changed']], [self.task.id])
+        self.assertEqual(data['categories']['changed'][0]['task_count'], 1)
+        self.assertEqual([row['id'] for row in data['context']['changed']], [self.entry.id])
+        self.assertFalse(data['has_more'])
+        self.assertEqual(self._sync(since=data['cursor'])['tasks'], {'changed': [], 'deleted': []})
+
+    def test_changes_since_cursor(self):
+        cursor = self._sync()['cursor']
+        self.task.status = 'completed'
+        self.task.save()
+        other = Task.objects.create(title="Other", description="d")
+        other_id, entry_id = other.id, self.entry.id
+        other.delete()
+        self.entry.delete()
+        with self.assertNumQueries(2):  # the log page and the changed tasks; nothing for deletes
+            data = self._sync(since=cursor)
+        self.assertEqual([(row['id'], row['status']) for row in data['tasks']['changed']],
+                         [(self.task.id, 'completed')])
+        self.assertEqual(data['tasks']['deleted'], [other_id])
+        self.assertEqual(data['context']['deleted'], [entry_id])
+        self.assertEqual(data['categories'], {'changed': [], 'deleted': []})
+
+    def test_pages_follow_the_cursor(self):
+        for i in range(4):
+            Task.objects.create(title=f"Task {i}", description="d")
+        seen, cursor, pages = [], 0, 0
+        while True:
+            data = self._sync(since=cursor, limit=2)
+            seen += [row['id'] for row in data['tasks']['changed']]
+            cursor, pages = data['cursor'], pages + 1
+            if not data['has_more']:
+                break
+        self.assertEqual(sorted(seen), sorted(Task.objects.values_list('id', flat=True)))
+        self.assertEqual(pages, 4)
+
+    def test_bulk_writes_are_logged(self):
+        cursor = self._sync()['cursor']
+        self.client.patch(reverse('task-bulk-update'), {'ids': [self.task.id], 'changes': {'priority': 4}},
+                          format='json')
+        self.client.generic('POST', reverse('task-import') + '?enrich=false', b'{"title": "Imported"}',
+                            content_type='application/x-ndjson')
+        data = self._sync(since=cursor)
+        self.assertEqual([row['title'] for row in data['tasks']['changed']], ["Write report", "Imported"])
+        self.assertEqual(data['tasks']['changed'][0]['priority'], 4)
+
+    def test_category_delete_resyncs_its_tasks(self):
+        cursor = self._sync()['cursor']
+        category_id = self.work.id
+        self.work.delete()
+        data = self._sync(since=cursor)
+        self.assertEqual(data['categories']['deleted'], [category_id])
+        self.assertIsNone(data['tasks']['changed'][0]['category'])
+
+    def test_compaction_keeps_latest_entries(self):
+        for _ in range(3):
+            self.task.save()
+        call_command('compact_changelog', stdout=open('/dev/null', 'w'))
+        self.assertEqual(ChangeLogEntry.objects.filter(object_type='task').count(), 1)
+        self.assertEqual([row['id'] for row in self._sync()['tasks']['changed']], [self.task.id])
+
+    def test_cursor_waits_for_uncommitted_entries(self):
+        from datetime import timedelta
+        from unittest import mock
+        from django.utils import timezone
+        from .changelog import latest_settled_seq
+        cursor = self._sync()['cursor']
+        first = ChangeLogEntry.objects.create(object_type='task', object_id=self.task.id)
+        # cursor + 2 was taken by a transaction that has not committed yet
+        ChangeLogEntry.objects.create(seq=first.seq + 2, object_type='context', object_id=self.entry.id)
+        with mock.patch('sync.changelog._concurrent_writers', return_value=True):
+            data = self._sync(since=cursor)
+            self.assertEqual((data['cursor'], data['has_more']), (first.seq, False))
+            self.assertEqual(data['context']['changed'], [])
+            self.assertEqual(latest_settled_seq(), first.seq)
+            # A hole older than SYNC_GAP_TIMEOUT was rolled back
+            ChangeLogEntry.objects.filter(seq=first.seq + 2).update(
+                created_at=timezone.now() - timedelta(minutes=5))
+            data = self._sync(since=cursor)
+            self.assertEqual(data['cursor'], first.seq + 2)
+            self.assertEqual(latest_settled_seq(), first.seq + 2)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('sync'), {'since': 'abc'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class RealtimeTestCase(TestCase):
+    def setUp(self):
+        self.broker = realtime._broker = realtime.LocalBroker()
+        self.addCleanup(setattr, realtime, '_broker', None)
+
+    async def test_local_broker_filters_by_type(self):
+        tasks_only = self.broker.subscribe(['task'])
+        everything = self.broker.subscribe(realtime.OBJECT_TYPES)
+        # Writers publish from the request thread, not the event loop
+        await asyncio.to_thread(self.broker.publish, [realtime.event_for(1, 'task', 5, 'upsert'),
+                                                      realtime.event_for(2, 'context', 3, 'delete')])
+        self.assertEqual((await tasks_only.get(1))['seq'], 1)
+        self.assertIsNone(await tasks_only.get(0.01))
+        self.assertEqual([(await everything.get(1))['seq'] for _ in range(2)], [1, 2])
+
+    @override_settings(REALTIME_QUEUE_SIZE=1)
+    async def test_overflow_asks_for_resync(self):
+        subscription = self.broker.subscribe(['task'])
+        self.broker.deliver([realtime.event_for(seq, 'task', 1, 'upsert') for seq in (1, 2)])
+        self.assertEqual(await subscription.get(1), {'type': 'resync'})
+        self.assertIsNone(await subscription.get(0.01))
+
+    @override_settings(REALTIME_POLL_INTERVAL=0.01)
+    async def test_change_log_broker_sees_other_processes(self):
+        self.broker = realtime._broker = realtime.ChangeLogBroker()
+        stream = realtime.change_stream(['task'])
+        first = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0.05)  # let the tail read its starting cursor
+        # Written without publishing, as by enrich_tasks in another process
+        entry = await sync_to_async(ChangeLogEntry.objects.create)(object_type='task', object_id=9)
+        self.assertEqual(await asyncio.wait_for(first, 2), realtime.event_for(entry.seq, 'task', 9, 'upsert'))
+        await stream.aclose()
+        self.assertFalse(self.broker.subscribers)
+
+    async def test_server_sent_events_replay_missed_changes(self):
+        task = await sync_to_async(Task.objects.create)(title="Pushed", description="d")
+        cursor = await sync_to_async(lambda: ChangeLogEntry.objects.order_by('seq').first().seq - 1)()
+        await sync_to_async(ContextEntry.objects.create)(content="Ignored", source_type="email")
+        response = await self.async_client.get(reverse('sync-events'), {'types': 'task'},
+                                               headers={'Last-Event-ID': str(cursor), 'Accept-Encoding': 'gzip'})
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        chunks = aiter(response.streaming_content)
+        self.assertEqual(await anext(chunks), b': connected\n\n')
+        message = (await anext(chunks)).decode()
+        self.assertTrue(message.startswith(f'id: {cursor + 1}\nevent: change\n'))
+        self.assertEqual(json.loads(message.split('data: ')[1])['id'], task.id)
+        await chunks.aclose()
+
+    def test_server_sent_events_need_asgi(self):
+        self.assertEqual(self.client.get(reverse('sync-events')).status_code, 501)
+
+    async def test_websocket(self):
+        incoming, sent = asyncio.Queue(), asyncio.Queue()
+        await incoming.put({'type': 'websocket.connect'})
+        scope = {'type': 'websocket', 'path': '/ws/changes/', 'query_string': b'types=context'}
+        connection = asyncio.ensure_future(realtime.websocket_changes(scope, incoming.get, sent.put))
+        self.assertEqual(await sent.get(), {'type': 'websocket.accept'})
+        while not self.broker.subscribers:
+            await asyncio.sleep(0)
+        self.broker.publish([realtime.event_for(7, 'task', 1, 'upsert'), realtime.event_for(8, 'context', 2, 'upsert')])
+        message = await asyncio.wait_for(sent.get(), 2)
+        self.assertEqual(json.loads(message['text'])['seq'], 8)
+        await incoming.put({'type': 'websocket.disconnect'})
+        await asyncio.wait_for(connection, 2)
+        self.assertFalse(self.broker.subscribers)
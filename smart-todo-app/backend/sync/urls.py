@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import sync_changes, change_events
+
+urlpatterns = [
+    path('api/sync/', sync_changes, name='sync'),
+    path('api/sync/events/', change_events, name='sync-events'),
+]
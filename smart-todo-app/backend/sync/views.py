@@ -0,0 +1,102 @@
+import json
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Count
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from tasks.models import Task, Category
+from tasks.serializers import TaskSerializer, CategorySerializer
+from context.models import ContextEntry
+from context.serializers import ContextEntrySerializer
+from .changelog import settled_entries
+from .realtime import change_stream, parse_types
+
+MAX_PAGE_SIZE = 2000
+
+# object_type: (response key, current rows, serializer)
+SYNCED = {
+    'task': ('tasks', lambda: Task.objects.select_related('category'), TaskSerializer),
+    'category': ('categories', lambda: Category.objects.annotate(task_count=Count('task')), CategorySerializer),
+    'context': ('context', lambda: ContextEntry.objects.all(), ContextEntrySerializer),
+}
+
+
+def _int_param(request, name, default, minimum):
+    try:
+        value = int(request.query_params.get(name, default))
+    except (TypeError, ValueError):
+        value = None
+    if value is None or value < minimum:
+        return None
+    return value
+
+
+@api_view(['GET'])
+def sync_changes(request):
+    """Rows created, updated or deleted since ?since=<cursor>, at most ?limit= log entries per page.
+
+    Each row appears once per page with its current state; deleted rows are
+    listed by id. Pass the returned ``cursor`` as ``since`` until
+    ``has_more`` is false. ``since=0`` (the default) replays the whole log.
+    Entries of transactions still in progress are waited for (see
+    settled_entries), so a cursor never skips a change committed later.
+    """
+    since = _int_param(request, 'since', 0, 0)
+    limit = _int_param(request, 'limit', getattr(settings, 'SYNC_PAGE_SIZE', 500), 1)
+    if since is None or limit is None:
+        return Response({'error': 'since must be a cursor (>= 0) and limit a positive integer'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    limit = min(limit, MAX_PAGE_SIZE)
+
+    entries = settled_entries(since, limit + 1)
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    latest = {}
+    for _, object_type, object_id, action in entries:
+        latest[object_type, object_id] = action  # the last entry for a row wins
+
+    data = {'cursor': entries[-1][0] if entries else since, 'has_more': has_more}
+    for object_type, (key, rows, serializer_class) in SYNCED.items():
+        changed = sorted(pk for (kind, pk), action in latest.items() if kind == object_type and action == 'upsert')
+        deleted = {pk for (kind, pk), action in latest.items() if kind == object_type and action == 'delete'}
+        instances = list(rows().filter(pk__in=changed).order_by('pk')) if changed else []
+        # A row deleted after this page's entries is reported deleted now; its tombstone comes later
+        deleted.update(set(changed) - {instance.pk for instance in instances})
+        data[key] = {
+            'changed': serializer_class(instances, many=True).data,
+            'deleted': sorted(deleted),
+        }
+    return Response(data)
+
+
+async def change_events(request):
+    """Server-sent events for changes: ``GET /api/sync/events/?types=task,context``.
+
+    Each change is an ``event: change`` whose id is its cursor, so a client
+    reconnecting with ``Last-Event-ID`` (or ``?since=``) first receives what
+    it missed. ``event: resync`` asks the client to catch up with /api/sync/.
+    """
+    if not isinstance(request, ASGIRequest):
+        # A WSGI worker would buffer the endless stream
+        return JsonResponse({'error': 'Server-sent events need the ASGI application'}, status=501)
+    types = parse_types(request.GET.get('types'))
+    since = request.headers.get('Last-Event-ID') or request.GET.get('since')
+    if types is None or (since is not None and not since.isdigit()):
+        return JsonResponse({'error': 'Unknown type, or since/Last-Event-ID is not a cursor'}, status=400)
+
+    async def stream():
+        yield ': connected\n\n'
+        async for event in change_stream(types, int(since) if since is not None else None):
+            if event is None:
+                yield ': keep-alive\n\n'
+            elif event['type'] == 'resync':
+                yield 'event: resync\ndata: {}\n\n'
+            else:
+                yield f"id: {event['seq']}\nevent: change\ndata: {json.dumps(event)}\n\n"
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx: pass events through as they come
+    return response
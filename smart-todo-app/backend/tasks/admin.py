@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Task, Category
+from .models import Task, Category, TaskDependency
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
@@ -15,3 +15,8 @@ class TaskAdmin(admin.ModelAdmin):
     search_fields = ['title', 'description']
     ordering = ['-priority_score', '-created_at']
     date_hierarchy = 'created_at'
+
+@admin.register(TaskDependency)
+class TaskDependencyAdmin(admin.ModelAdmin):
+    list_display = ['blocker', 'blocked', 'created_at']
+    raw_id_fields = ['blocker', 'blocked']
@@ -1,6 +1,23 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class TasksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tasks'
+
+    def ready(self):
+        from . import statistics  # noqa: F401 - connects counter signal receivers
+        from . import fuzzy  # noqa: F401 - keeps the in-memory trigram indexes current
+        from . import dependencies  # noqa: F401 - propagates effective priority along dependencies
+        from smart_todo.versioning import track
+        from .models import Task, Category, CategoryCorrection, TaskDependency
+        # Category names appear in task lists and statistics
+        track(Task, 'tasks')
+        track(Category, 'tasks')
+        track(CategoryCorrection, 'corrections')
+        # DependencyGraph reloads its edges when this version moves
+        track(TaskDependency, 'dependencies')
+        from smart_todo.fulltext import register_fulltext_index, restore_fulltext_triggers
+        register_fulltext_index(Task._meta.db_table, ['title', 'description'])
+        post_migrate.connect(restore_fulltext_triggers, sender=self)
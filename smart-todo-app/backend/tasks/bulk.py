@@ -0,0 +1,163 @@
+# Bulk PATCH: validated partial updates written with bulk_update, chunk by chunk
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from smart_todo.versioning import collection_changed
+from sync.changelog import record_changes
+from . import dependencies, fuzzy
+from .importer import chunks
+from .models import Task, Category
+from .serializers import TaskBulkUpdateSerializer
+from .statistics import counters_enabled, adjust_counters, state_deltas
+
+
+class BulkUpdateConflict(Exception):
+    """Raised in atomic mode to roll back every chunk written so far"""
+
+
+def parse_updates(data):
+    """[{'id': ..., 'version'?: ..., <changes>}] from either accepted request body.
+
+    ``{"updates": [{"id": 1, "status": "completed", "version": 3}, ...]}`` gives
+    per-task changes; ``{"ids": [1, 2], "changes": {"status": "completed"}}``
+    applies the same changes to every id.
+    """
+    if not isinstance(data, dict):
+        raise ValidationError({'non_field_errors': ['Expected a JSON object.']})
+    if 'updates' in data:
+        updates = data['updates']
+        if not isinstance(updates, list) or not all(isinstance(row, dict) for row in updates):
+            raise ValidationError({'updates': ['Must be a list of objects.']})
+        return updates
+    ids, changes = data.get('ids'), data.get('changes')
+    if not isinstance(ids, list) or not isinstance(changes, dict):
+        raise ValidationError({'non_field_errors': ['Send "updates", or "ids" with "changes".']})
+    if 'id' in changes or 'version' in changes:
+        raise ValidationError({'changes': ['Cannot set id or version.']})
+    return [{**changes, 'id': pk} for pk in ids]
+
+
+class TaskBulkUpdater:
+    """Applies validated partial updates to many tasks without per-row saves.
+
+    Every row is checked by ``validate()`` before anything is written. Rows
+    are then loaded and written BULK_UPDATE_BATCH_SIZE at a time, each chunk in its own
+    transaction with ``select_for_update`` and one ``bulk_update``, together
+    with the statistics counters, collection versions and sync change log
+    that save() would maintain. A row carrying ``version`` is skipped as a conflict when the
+    task has changed since. No AI enhancement runs: the changes are written
+    as given. With ``atomic`` every chunk shares one transaction, and any
+    conflict or missing id rolls the whole request back.
+    """
+
+    def __init__(self, atomic=False, batch_size=None):
+        self.atomic = atomic
+        self.batch_size = batch_size or getattr(settings, 'BULK_UPDATE_BATCH_SIZE', 500)
+        self.serializer = TaskBulkUpdateSerializer(partial=True)
+        self.versions = {}
+        self.not_found = []
+        self.conflicts = []
+        self.titles = {}
+
+    def run(self, rows):
+        """Write rows from validate(); returns the summary"""
+        if self.atomic:
+            try:
+                with transaction.atomic():
+                    self._write(rows)
+                    if self.not_found or self.conflicts:
+                        raise BulkUpdateConflict()
+            except BulkUpdateConflict:
+                self.versions = {}
+                self.titles = {}
+        else:
+            self._write(rows)
+        for pk, title in self.titles.items():
+            fuzzy.task_titles.update(pk, title)
+        return self.summary()
+
+    def summary(self):
+        return {
+            'updated': len(self.versions),
+            'versions': self.versions,
+            'not_found': self.not_found,
+            'conflicts': self.conflicts,
+        }
+
+    def validate(self, updates):
+        """(rows, errors): (id, expected version or None, changes) per valid row, and each bad row's errors"""
+        rows, errors, seen = [], [], set()
+        for index, row in enumerate(updates):
+            row = dict(row)
+            pk, version = row.pop('id', None), row.pop('version', None)
+            if not isinstance(pk, int) or isinstance(pk, bool):
+                errors.append({'index': index, 'errors': {'id': ['A task id is required.']}})
+                continue
+            if pk in seen:
+                errors.append({'index': index, 'errors': {'id': ['Duplicate id.']}})
+                continue
+            seen.add(pk)
+            if version is not None and (not isinstance(version, int) or isinstance(version, bool)):
+                errors.append({'index': index, 'errors': {'version': ['Must be an integer.']}})
+                continue
+            try:
+                changes = self.serializer.run_validation(row)
+            except ValidationError as e:
+                errors.append({'index': index, 'errors': e.detail})
+                continue
+            if not changes:
+                errors.append({'index': index, 'errors': {'non_field_errors': ['No changes given.']}})
+                continue
+            if 'category' in changes:
+                changes['category_id'] = changes.pop('category')
+            rows.append((index, pk, version, changes))
+
+        category_ids = {changes.get('category_id') for *_, changes in rows} - {None}
+        if category_ids:
+            missing = category_ids - set(Category.objects.filter(pk__in=category_ids).values_list('pk', flat=True))
+            for index, _, _, changes in rows:
+                if changes.get('category_id') in missing:
+                    errors.append({'index': index, 'errors': {'category': ['Category does not exist.']}})
+        errors.sort(key=lambda error: error['index'])
+        return [(pk, version, changes) for _, pk, version, changes in rows], errors
+
+    def _write(self, rows):
+        for chunk in chunks(rows, self.batch_size):
+            with transaction.atomic():
+                self._write_chunk(chunk)
+
+    def _write_chunk(self, chunk):
+        tasks = Task.objects.select_for_update().in_bulk([pk for pk, _, _ in chunk])
+        now = timezone.now()
+        changed, fields, old_states = [], {'version', 'updated_at'}, []
+        for pk, version, changes in chunk:
+            task = tasks.get(pk)
+            if task is None:
+                self.not_found.append(pk)
+                continue
+            if version is not None and version != task.version:
+                self.conflicts.append({'id': pk, 'version': task.version})
+                continue
+            old_states.append(task.counter_state())
+            for name, value in changes.items():
+                setattr(task, name, value)
+            fields.update(changes)
+            task.version += 1
+            task.updated_at = now  # bulk_update skips auto_now
+            changed.append(task)
+        if not changed:
+            return
+        Task.objects.bulk_update(changed, sorted(fields))
+        if counters_enabled():
+            # bulk_update sends no save signals
+            adjust_counters(state_deltas(old_states, [task.counter_state() for task in changed]))
+        collection_changed('tasks')
+        record_changes('task', [task.pk for task in changed])
+        if fields & {'deadline', 'status'}:
+            ids = [task.pk for task in changed]
+            dependencies.graph.propagate(ids, logged=ids)
+        for task in changed:
+            self.versions[task.pk] = task.version
+            if 'title' in fields:
+                self.titles[task.pk] = task.title
@@ -0,0 +1,262 @@
+"""
+Blocking relationships between tasks and the effective priority they imply.
+
+A task inherits urgency from the open tasks it blocks: its effective priority
+score is the highest of its own score and theirs, its effective deadline the
+earliest. Both are stored on Task so lists can sort and filter on them.
+
+DependencyGraph keeps the edges in memory as adjacency sets. When a task's
+score, deadline or open status changes, or an edge is added or removed, only
+the tasks upstream of it (those that transitively block it) are recomputed,
+children before parents, and the walk stops wherever a value comes out
+unchanged; a task without any edges just takes its own values. Before each
+use the graph is checked against the "dependencies" collection version
+(smart_todo/versioning.py), bumped on every edge write and after a rolled
+back batch, so edges written by other processes are picked up. Code that writes edges without signals
+(bulk_create, raw SQL) must call collection_changed('dependencies').
+"""
+
+import threading
+from collections import deque
+from django.db import connection, transaction
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from smart_todo.versioning import collection_changed, collection_version
+from sync.changelog import record_changes
+from .models import Task, TaskDependency, OPEN_STATUSES
+
+ROW_FIELDS = ('priority_score', 'deadline', 'status', 'effective_priority_score', 'effective_deadline')
+COLLECTION = 'dependencies'
+
+
+class DependencyCycle(Exception):
+    """The new edge would make a task (transitively) block itself"""
+
+    def __init__(self, path):
+        super().__init__(' -> '.join(str(pk) for pk in path))
+        self.path = path
+
+
+def _earliest(first, second):
+    if first is None:
+        return second
+    if second is None:
+        return first
+    return min(first, second)
+
+
+class DependencyGraph:
+    """Adjacency sets of the "blocks" relation, loaded lazily from TaskDependency"""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.blocks = {}  # blocker id -> ids of the tasks it blocks
+            self.blocked_by = {}  # blocked id -> ids of its blockers
+            self.version = None
+
+    def ensure_current(self):
+        version = collection_version(COLLECTION)
+        with self.lock:
+            if version == self.version:
+                return
+            self.reset()
+            for blocker, blocked in TaskDependency.objects.values_list('blocker_id', 'blocked_id').iterator():
+                self._link(blocker, blocked)
+            self.version = version
+
+    def _link(self, blocker, blocked):
+        self.blocks.setdefault(blocker, set()).add(blocked)
+        self.blocked_by.setdefault(blocked, set()).add(blocker)
+
+    def _unlink(self, blocker, blocked):
+        for index, key, value in ((self.blocks, blocker, blocked), (self.blocked_by, blocked, blocker)):
+            ids = index.get(key)
+            if ids is not None:
+                ids.discard(value)
+                if not ids:
+                    del index[key]
+
+    def add(self, edge):
+        # Seen by this transaction's propagation; the version bump that
+        # follows every edge write makes the next check reload the table
+        with self.lock:
+            if self.version is not None:
+                self._link(edge.blocker_id, edge.blocked_id)
+
+    def remove(self, edge):
+        with self.lock:
+            if self.version is not None:
+                self._unlink(edge.blocker_id, edge.blocked_id)
+
+    def has_edges(self, pk):
+        with self.lock:
+            return pk in self.blocks or pk in self.blocked_by
+
+    def path(self, start, goal):
+        """Task ids from ``start`` to ``goal`` following "blocks" edges, or None"""
+        previous = {start: None}
+        queue = deque([start])
+        with self.lock:
+            while queue:
+                node = queue.popleft()
+                if node == goal:
+                    path = []
+                    while node is not None:
+                        path.append(node)
+                        node = previous[node]
+                    return path[::-1]
+                for child in self.blocks.get(node, ()):
+                    if child not in previous:
+                        previous[child] = node
+                        queue.append(child)
+        return None
+
+    def check_new_edge(self, blocker, blocked):
+        """Raise DependencyCycle if ``blocker`` blocking ``blocked`` would close a cycle"""
+        self.ensure_current()
+        path = self.path(blocked, blocker)
+        if path is not None:
+            raise DependencyCycle([blocker] + path)
+
+    def upstream(self, task_ids):
+        """``task_ids`` and every task that transitively blocks one of them"""
+        seen = set(task_ids)
+        queue = deque(seen)
+        with self.lock:
+            while queue:
+                for parent in self.blocked_by.get(queue.popleft(), ()):
+                    if parent not in seen:
+                        seen.add(parent)
+                        queue.append(parent)
+        return seen
+
+    def propagate(self, task_ids, instances=(), logged=()):
+        """Recompute the effective priority of ``task_ids`` and of the tasks upstream of them.
+
+        ``instances`` are tasks in memory whose effective values are brought
+        up to date too. Values are always read from the database, as an
+        instance may predate another propagation. Rows whose values change
+        are written with bulk_update and logged for sync, except the ids in
+        ``logged`` and those of ``instances`` (their own save logs them).
+        Returns {id: (effective score, effective deadline)} for the changed rows.
+        """
+        task_ids = set(task_ids)
+        if not task_ids:
+            return {}
+        self.ensure_current()
+        with self.lock:
+            upstream = self.upstream(task_ids)
+            children = {pk: set(self.blocks.get(pk, ())) for pk in upstream}
+            parents = {pk: set(self.blocked_by.get(pk, ())) for pk in upstream}
+
+        instances = {task.pk: task for task in instances}
+        rows = {pk: values for pk, *values in
+                Task.objects.filter(pk__in=upstream.union(*children.values())).values_list('pk', *ROW_FIELDS)}
+
+        # Children before parents; only nodes below which something changed are recomputed
+        waiting = {pk: len(children[pk] & upstream) for pk in upstream}
+        ready = deque(pk for pk, count in waiting.items() if count == 0)
+        dirty = set(task_ids)
+        changed = {}
+        while ready:
+            pk = ready.popleft()
+            if pk in dirty and pk in rows:
+                value = self._effective(rows[pk], children[pk], rows)
+                if value != tuple(rows[pk][3:]):
+                    rows[pk][3:] = value
+                    changed[pk] = value
+                if pk in changed or pk in task_ids:
+                    dirty.update(parents[pk])
+            for parent in parents[pk]:
+                waiting[parent] -= 1
+                if waiting[parent] == 0:
+                    ready.append(parent)
+
+        if changed:
+            Task.objects.bulk_update(
+                [Task(pk=pk, effective_priority_score=score, effective_deadline=deadline)
+                 for pk, (score, deadline) in changed.items()],
+                ['effective_priority_score', 'effective_deadline'])
+            unlogged = [pk for pk in changed if pk not in instances and pk not in logged]
+            if unlogged:
+                collection_changed('tasks')
+                record_changes('task', unlogged)
+        for pk, task in instances.items():
+            if pk in rows:
+                task.effective_priority_score, task.effective_deadline = rows[pk][3:]
+        return changed
+
+    @staticmethod
+    def _effective(row, children, rows):
+        score, deadline = row[0], row[1]
+        for child in children:
+            child_row = rows.get(child)
+            if child_row is None or child_row[2] not in OPEN_STATUSES:
+                continue  # a finished task no longer waits on its blockers
+            score = max(score, child_row[3])
+            deadline = _earliest(deadline, child_row[4])
+        return (score, deadline)
+
+
+graph = DependencyGraph()
+
+
+# pg_advisory_xact_lock key held while an edge is checked and inserted
+ADVISORY_LOCK_ID = 0x7461736b64657073
+
+
+def _lock_edges(blocker_id, blocked_id):
+    """Keep concurrent add_dependency calls from each passing the cycle check, until commit"""
+    if connection.vendor == 'postgresql':
+        # One lock for all edges: a cycle can be closed by edges between different tasks
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [ADVISORY_LOCK_ID])
+    else:
+        # SQLite serializes writers; elsewhere at least two opposite edges cannot both pass
+        list(Task.objects.select_for_update().filter(pk__in=[blocker_id, blocked_id]).order_by('pk')
+             .values_list('pk', flat=True))
+
+
+def add_dependency(blocker_id, blocked_id):
+    """Create the edge, refusing one that would close a cycle (DependencyCycle)"""
+    with transaction.atomic():
+        _lock_edges(blocker_id, blocked_id)
+        graph.check_new_edge(blocker_id, blocked_id)
+        return TaskDependency.objects.create(blocker_id=blocker_id, blocked_id=blocked_id)
+
+
+@receiver(post_save, sender=Task)
+def propagate_task_change(sender, instance, created, raw=False, **kwargs):
+    # A new task blocks nothing yet; Task.save set its effective values to its own
+    if created or raw:
+        return
+    state = instance.dependency_state()
+    if state == getattr(instance, '_dependency_state', None):
+        return
+    instance._dependency_state = state
+    graph.ensure_current()
+    if not graph.has_edges(instance.pk):
+        # Blocks nothing and waits on nothing: its effective values are its own
+        Task.objects.filter(pk=instance.pk).update(effective_priority_score=F('priority_score'),
+                                                   effective_deadline=F('deadline'))
+        instance.reset_effective_priority()
+        return
+    graph.propagate([instance.pk], instances=[instance])
+
+
+@receiver(post_save, sender=TaskDependency)
+def link_tasks(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        graph.add(instance)
+        graph.propagate([instance.blocker_id])
+
+
+@receiver(post_delete, sender=TaskDependency)
+def unlink_tasks(sender, instance, **kwargs):
+    graph.remove(instance)
+    graph.propagate([instance.blocker_id])
@@ -0,0 +1,22 @@
+# Deferred AI enrichment for tasks flagged by bulk imports
+from .models import Task
+from .serializers import TaskSerializer
+
+
+def enrich_pending_tasks(limit=None, batch_size=50):
+    """Run the AI enhancement for queued tasks, oldest first; returns how many were processed"""
+    serializer = TaskSerializer()
+    processed = 0
+    while limit is None or processed < limit:
+        size = batch_size if limit is None else min(batch_size, limit - processed)
+        batch = list(Task.objects.select_related('category').filter(ai_enrichment_pending=True).order_by('id')[:size])
+        if not batch:
+            break
+        for task in batch:
+            task.ai_enrichment_pending = False
+            serializer._enhance_task_with_ai(task)
+        # The enhancement swallows LLM errors without saving; dequeue those tasks too
+        Task.objects.filter(pk__in=[task.pk for task in batch], ai_enrichment_pending=True).update(
+            ai_enrichment_pending=False)
+        processed += len(batch)
+    return processed
@@ -0,0 +1,34 @@
+from django.utils import timezone
+from django_filters import rest_framework as filters
+from .models import Task
+
+
+def request_now(request):
+    """One timestamp per request, so every row, filter and count agrees on "now" """
+    request = getattr(request, '_request', request)  # shared by the DRF and Django request objects
+    if not hasattr(request, 'task_now'):
+        request.task_now = timezone.now()
+    return request.task_now
+
+
+class TaskFilter(filters.FilterSet):
+    """``?status=``, ``?priority=``, ``?category=`` plus deadline filters evaluated in SQL"""
+    overdue = filters.BooleanFilter(method='filter_overdue')
+    due_within = filters.NumberFilter(method='filter_due_within', min_value=0, max_value=366)
+    # Filters whose results change with the current time, not only with writes
+    time_params = ('overdue', 'due_within')
+
+    class Meta:
+        model = Task
+        fields = ['status', 'priority', 'category']
+
+    def filter_overdue(self, queryset, name, value):
+        # Matches the is_overdue field: deadline passed, whatever the status
+        now = request_now(self.request)
+        if value:
+            return queryset.filter(deadline__lt=now)
+        return queryset.exclude(deadline__lt=now)
+
+    def filter_due_within(self, queryset, name, value):
+        """Open tasks due in the next ``value`` days"""
+        return queryset.due_soon(request_now(self.request), float(value))
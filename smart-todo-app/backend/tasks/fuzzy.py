@@ -0,0 +1,143 @@
+# Typo-tolerant trigram search over task titles and category names, held in memory
+import heapq
+import math
+import re
+import threading
+import time
+from collections import Counter
+from django.conf import settings
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Task, Category
+
+_WORD_RE = re.compile(r'\w+')
+_EMPTY = frozenset()
+
+
+def trigrams(text):
+    """pg_trgm-style trigrams: each lowercased word padded with two leading blanks and one trailing"""
+    grams = set()
+    for word in _WORD_RE.findall(text.lower()):
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """Inverted index from trigram to document ids, loaded lazily from ``loader``.
+
+    Each process holds its own copy. Saves and deletes in this process are
+    applied incrementally by signal receivers; writes made by other processes
+    (or by queryset.update(), which sends no signals) are picked up when the
+    index is reloaded after FUZZY_INDEX_MAX_AGE seconds.
+    """
+
+    def __init__(self, loader):
+        self.loader = loader
+        self.lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.docs = {}  # id -> number of trigrams
+            self.grams = {}  # id -> trigrams, to undo postings on update/delete
+            self.postings = {}  # trigram -> set of ids
+            self.loaded_at = None
+
+    def ensure_loaded(self):
+        max_age = getattr(settings, 'FUZZY_INDEX_MAX_AGE', 300)
+        with self.lock:
+            if self.loaded_at is not None and (max_age is None or time.monotonic() - self.loaded_at < max_age):
+                return
+            self.reset()
+            for doc_id, text in self.loader():
+                self._add(doc_id, text)
+            self.loaded_at = time.monotonic()
+
+    def _add(self, doc_id, text):
+        grams = trigrams(text or '')
+        self.docs[doc_id] = len(grams)
+        self.grams[doc_id] = grams
+        for gram in grams:
+            self.postings.setdefault(gram, set()).add(doc_id)
+
+    def _remove(self, doc_id):
+        for gram in self.grams.pop(doc_id, ()):
+            ids = self.postings[gram]
+            ids.discard(doc_id)
+            if not ids:
+                del self.postings[gram]
+        self.docs.pop(doc_id, None)
+
+    def update(self, doc_id, text):
+        with self.lock:
+            if self.loaded_at is None:
+                return
+            self._remove(doc_id)
+            self._add(doc_id, text)
+
+    def remove(self, doc_id):
+        with self.lock:
+            if self.loaded_at is not None:
+                self._remove(doc_id)
+
+    def search(self, query, limit=10, threshold=0.5):
+        """Top ``limit`` (id, similarity) pairs with similarity >= threshold, best first.
+
+        Similarity is the share of the query's trigrams found in the
+        document, like pg_trgm's word_similarity(), so a misspelled word
+        still matches a long title. Ties go to the shorter document, which
+        has the higher pg_trgm similarity().
+        """
+        grams = trigrams(query)
+        if not grams:
+            return []
+        self.ensure_loaded()
+        needed = max(1, math.ceil(threshold * len(grams)))
+        with self.lock:
+            lists = sorted((self.postings.get(gram, _EMPTY) for gram in grams), key=len)
+            # A match shares at least ``needed`` trigrams with the query, so it
+            # appears in at least one of the len(lists) - needed + 1 rarest
+            # posting lists. Only those are scanned in full; the common lists
+            # are intersected with the candidates found there.
+            split = len(lists) - needed + 1
+            shared = Counter()
+            for ids in lists[:split]:
+                shared.update(ids)
+            candidates = set(shared)
+            for ids in lists[split:]:
+                shared.update(candidates & ids)
+            scored = [
+                (count, -self.docs[doc_id], -doc_id)
+                for doc_id, count in shared.items() if count >= needed
+            ]
+        return [(-neg_id, round(count / len(grams), 4)) for count, _, neg_id in heapq.nlargest(limit, scored)]
+
+
+task_titles = TrigramIndex(lambda: Task.objects.order_by().values_list('id', 'title').iterator())
+category_names = TrigramIndex(lambda: Category.objects.order_by().values_list('id', 'name').iterator())
+
+
+def reset():
+    task_titles.reset()
+    category_names.reset()
+
+
+@receiver(post_save, sender=Task)
+def index_task_title(sender, instance, **kwargs):
+    task_titles.update(instance.pk, instance.title)
+
+
+@receiver(post_delete, sender=Task)
+def unindex_task_title(sender, instance, **kwargs):
+    task_titles.remove(instance.pk)
+
+
+@receiver(post_save, sender=Category)
+def index_category_name(sender, instance, **kwargs):
+    category_names.update(instance.pk, instance.name)
+
+
+@receiver(post_delete, sender=Category)
+def unindex_category_name(sender, instance, **kwargs):
+    category_names.remove(instance.pk)
@@ -0,0 +1,141 @@
+# Streaming task import: NDJSON or CSV rows validated and bulk-inserted in chunks
+import csv
+import json
+from django.conf import settings
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+from smart_todo.versioning import collection_changed
+from sync.changelog import record_changes
+from . import fuzzy
+from .models import Task, Category
+from .serializers import TaskImportSerializer
+from .statistics import counters_enabled, adjust_counters, state_deltas
+
+MAX_REPORTED_ERRORS = 100
+
+
+def ndjson_rows(lines):
+    """(line number, row, error) for each non-blank line of newline-delimited JSON"""
+    for number, line in enumerate(lines, 1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield number, None, {'non_field_errors': [f'Invalid JSON: {e}']}
+            continue
+        if not isinstance(row, dict):
+            yield number, None, {'non_field_errors': ['Each line must be a JSON object.']}
+            continue
+        yield number, row, None
+
+
+def csv_rows(lines):
+    """(line number, row, error) for each CSV record; the first line names the columns.
+
+    Empty cells are left out so model defaults apply, and ``context_tags``
+    is a ``;``-separated list.
+    """
+    reader = csv.DictReader(line.decode('utf-8') if isinstance(line, bytes) else line for line in lines)
+    if reader.fieldnames:
+        reader.fieldnames = [name.lstrip('\ufeff').strip() for name in reader.fieldnames]  # Excel's BOM
+    for record in reader:
+        row = {key: value for key, value in record.items() if key and value not in ('', None)}
+        if 'context_tags' in row:
+            row['context_tags'] = [tag.strip() for tag in row['context_tags'].split(';') if tag.strip()]
+        yield reader.line_num, row, None
+
+
+def chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class TaskImporter:
+    """Validates and inserts rows chunk by chunk, so memory stays flat whatever the input size.
+
+    Rows are validated with TaskImportSerializer; invalid rows are reported
+    and skipped. Each chunk is written with bulk_create in its own
+    transaction, together with the statistics counters that save() signals
+    would otherwise maintain. Imported tasks are flagged for AI enrichment
+    (run later by ``manage.py enrich_tasks``) instead of calling the LLM inline.
+    """
+
+    def __init__(self, enrich=True, batch_size=None):
+        self.enrich = enrich
+        self.batch_size = batch_size or getattr(settings, 'TASK_IMPORT_BATCH_SIZE', 1000)
+        self.category_ids = {}
+        # One serializer for every row: building its fields costs more than validating
+        self.serializer = TaskImportSerializer()
+        self.created = 0
+        self.error_count = 0
+        self.errors = []
+
+    def run(self, rows):
+        for chunk in chunks(rows, self.batch_size):
+            self._import_chunk(chunk)
+        return self.summary()
+
+    def summary(self):
+        return {
+            'created': self.created,
+            'error_count': self.error_count,
+            'errors': self.errors,
+            'enrichment_queued': self.created if self.enrich else 0,
+        }
+
+    def _error(self, line, errors):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'errors': errors})
+
+    def _import_chunk(self, chunk):
+        valid = []
+        for line, row, error in chunk:
+            if error is not None:
+                self._error(line, error)
+                continue
+            try:
+                valid.append(self.serializer.run_validation(row))
+            except ValidationError as e:
+                self._error(line, e.detail)
+        if not valid:
+            return
+
+        self._resolve_categories({data['category'] for data in valid if data.get('category')})
+        tasks = []
+        for data in valid:
+            category = data.pop('category', None)
+            task = Task(**data, category_id=self.category_ids.get(category), ai_enrichment_pending=self.enrich)
+            task.reset_effective_priority()  # bulk_create skips Task.save
+            tasks.append(task)
+        with transaction.atomic():
+            Task.objects.bulk_create(tasks)
+            if counters_enabled():
+                # bulk_create sends no save signals
+                adjust_counters(state_deltas([], [task.counter_state() for task in tasks]))
+            collection_changed('tasks')
+            record_changes('task', [task.pk for task in tasks if task.pk is not None])
+        for task in tasks:
+            if task.pk is None:
+                fuzzy.task_titles.reset()  # backend without RETURNING: reload on next search
+                break
+            fuzzy.task_titles.update(task.pk, task.title)
+        self.created += len(tasks)
+
+    def _resolve_categories(self, names):
+        missing = names - self.category_ids.keys()
+        if not missing:
+            return
+        for pk, name in Category.objects.filter(name__in=missing).order_by('-pk').values_list('pk', 'name'):
+            self.category_ids[name] = pk  # the oldest category wins if names repeat
+        for name in sorted(missing - self.category_ids.keys()):
+            self.category_ids[name] = Category.objects.create(name=name).pk
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from tasks.enrichment import enrich_pending_tasks
+
+
+class Command(BaseCommand):
+    help = 'Run the AI enhancement for tasks queued by bulk imports.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=None, help='Stop after this many tasks.')
+        parser.add_argument('--batch_size', type=int, default=50, help='Tasks fetched per query.')
+
+    def handle(self, *args, **options):
+        processed = enrich_pending_tasks(options['limit'], options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Enriched {processed} task(s)"))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from tasks.recurrence import materialize_occurrences
+
+
+class Command(BaseCommand):
+    help = 'Create the occurrences of recurring tasks that fall within the rolling window.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--window_days', type=int, default=None,
+                            help='Days ahead to materialize (default: RECURRENCE_WINDOW_DAYS).')
+        parser.add_argument('--batch_size', type=int, default=100, help='Series locked and processed per transaction.')
+
+    def handle(self, *args, **options):
+        created = materialize_occurrences(window_days=options['window_days'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Created {created} occurrence(s)"))
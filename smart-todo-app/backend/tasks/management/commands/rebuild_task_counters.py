@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from tasks.statistics import rebuild_task_counters
+
+class Command(BaseCommand):
+    help = 'Recompute the maintained task statistics counters from the tasks table.'
+
+    def handle(self, *args, **options):
+        counters = rebuild_task_counters()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {len(counters)} task counters (total={counters["total"]}).'))
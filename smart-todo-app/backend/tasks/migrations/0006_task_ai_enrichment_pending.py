@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:33
+
+from django.db import migrations, models
+from smart_todo.fulltext import rebuild_fulltext_operations
+
+# SQLite adds the column by rebuilding tasks_task, which drops the FTS triggers
+FULLTEXT_BEFORE, FULLTEXT_AFTER = rebuild_fulltext_operations('tasks_task', ['title', 'description'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_task_fulltext'),
+    ]
+
+    operations = [
+        FULLTEXT_BEFORE,
+        migrations.AddField(
+            model_name='task',
+            name='ai_enrichment_pending',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('ai_enrichment_pending', True)), fields=['id'], name='task_enrichment_pending_idx'),
+        ),
+        FULLTEXT_AFTER,
+    ]
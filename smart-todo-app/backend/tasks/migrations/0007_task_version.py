@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:48
+
+from django.db import migrations, models
+from smart_todo.fulltext import rebuild_fulltext_operations
+
+# SQLite adds the column by rebuilding tasks_task, which drops the FTS triggers
+FULLTEXT_BEFORE, FULLTEXT_AFTER = rebuild_fulltext_operations('tasks_task', ['title', 'description'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_task_ai_enrichment_pending'),
+    ]
+
+    operations = [
+        FULLTEXT_BEFORE,
+        migrations.AddField(
+            model_name='task',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        FULLTEXT_AFTER,
+    ]
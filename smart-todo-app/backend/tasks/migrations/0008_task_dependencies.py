@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+from smart_todo.fulltext import rebuild_fulltext_operations
+
+# SQLite adds the columns by rebuilding tasks_task, which drops the FTS triggers
+FULLTEXT_BEFORE, FULLTEXT_AFTER = rebuild_fulltext_operations('tasks_task', ['title', 'description'])
+
+
+def copy_own_priority(apps, schema_editor):
+    # No dependencies exist yet, so every task's effective values are its own
+    Task = apps.get_model('tasks', 'Task')
+    Task.objects.update(effective_priority_score=models.F('priority_score'), effective_deadline=models.F('deadline'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0007_task_version'),
+    ]
+
+    operations = [
+        FULLTEXT_BEFORE,
+        migrations.AddField(
+            model_name='task',
+            name='effective_deadline',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='effective_priority_score',
+            field=models.FloatField(default=0.0),
+        ),
+        FULLTEXT_AFTER,
+        migrations.RunPython(copy_own_priority, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='TaskDependency',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('blocked', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='blocked_by_links', to='tasks.task')),
+                ('blocker', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='blocking_links', to='tasks.task')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('blocker', 'blocked'), name='task_dependency_unique'), models.CheckConstraint(condition=models.Q(('blocker', models.F('blocked')), _negated=True), name='task_dependency_not_self')],
+            },
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+from smart_todo.fulltext import rebuild_fulltext_operations
+
+# SQLite adds the columns by rebuilding tasks_task, which drops the FTS triggers
+FULLTEXT_BEFORE, FULLTEXT_AFTER = rebuild_fulltext_operations('tasks_task', ['title', 'description'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0008_task_dependencies'),
+    ]
+
+    operations = [
+        FULLTEXT_BEFORE,
+        migrations.AddField(
+            model_name='task',
+            name='occurrence_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='recurrence_end',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='recurrence_materialized_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='recurrence_parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='occurrences', to='tasks.task'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='recurrence_rule',
+            field=models.CharField(blank=True, max_length=500),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('recurrence_rule', ''), _negated=True), fields=['recurrence_materialized_until'], name='task_recurring_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='task',
+            constraint=models.UniqueConstraint(fields=('recurrence_parent', 'occurrence_at'), name='task_occurrence_unique'),
+        ),
+        FULLTEXT_AFTER,
+    ]
@@ -1,10 +1,66 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from collections import Counter
+from datetime import timedelta
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from ai_engine import ai_manager
 
+OPEN_STATUSES = ['pending', 'in_progress']
+# Maintained by tasks/dependencies.py, never written by Task.save on update
+PROPAGATED_FIELDS = ('effective_priority_score', 'effective_deadline')
+
+
+class DaysUntil(models.Func):
+    """Whole days from ``now`` to a datetime column, floored like ``timedelta.days``; NULL for NULL"""
+    output_field = models.IntegerField()
+    # Postgres: interval to seconds; other backends override below
+    template = 'CAST(FLOOR(EXTRACT(EPOCH FROM (%(expressions)s)) / 86400) AS INTEGER)'
+    arg_joiner = ' - '
+
+    def __init__(self, expression, now):
+        super().__init__(expression, models.Value(now, output_field=models.DateTimeField()))
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        # Native julianday() rather than Django's per-row Python date functions
+        return self.as_sql(compiler, connection, template='CAST(FLOOR(julianday(%(expressions)s)) AS INTEGER)',
+                           arg_joiner=') - julianday(', **extra_context)
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        expression, now = self.get_source_expressions()
+        clone = self.copy()
+        clone.set_source_expressions([now, expression])
+        return clone.as_sql(
+            compiler, connection, template='FLOOR(TIMESTAMPDIFF(MICROSECOND, %(expressions)s) / 86400000000)',
+            arg_joiner=', ', **extra_context)
+
+
+def overdue_q(now):
+    """Open tasks whose deadline has passed"""
+    return models.Q(status__in=OPEN_STATUSES, deadline__lt=now)
+
+
+def due_between_q(start, end):
+    """Open tasks due in [start, end)"""
+    return models.Q(status__in=OPEN_STATUSES, deadline__gte=start, deadline__lt=end)
+
+
+class TaskQuerySet(models.QuerySet):
+    def with_deadline_fields(self, now):
+        """Annotate ``days_until_deadline`` and ``is_overdue`` as of ``now``, computed by the database"""
+        return self.annotate(
+            days_until_deadline=DaysUntil('deadline', now),
+            is_overdue=models.Case(models.When(deadline__lt=now, then=True), default=False,
+                                   output_field=models.BooleanField()),
+        )
+
+    def overdue(self, now):
+        return self.filter(overdue_q(now))
+
+    def due_soon(self, now, days):
+        """Open tasks due within the next ``days`` days (not yet overdue)"""
+        return self.filter(due_between_q(now, now + timedelta(days=days)))
+
 class Category(models.Model):
     name = models.CharField(max_length=100)
     color = models.CharField(max_length=7, default='#3B82F6')
@@ -37,15 +93,118 @@ class Task(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     ai_enhanced_description = models.TextField(blank=True)
     context_tags = models.JSONField(default=list, blank=True)
+    # Set by bulk imports; the enrich_tasks command runs the AI enhancement later
+    ai_enrichment_pending = models.BooleanField(default=False)
+    # Bumped on every update; clients send it back for optimistic concurrency
+    version = models.PositiveIntegerField(default=0)
+    # Own score and deadline, raised by the open tasks this one blocks (tasks/dependencies.py)
+    effective_priority_score = models.FloatField(default=0.0)
+    effective_deadline = models.DateTimeField(null=True, blank=True)
+    # RFC 5545 RRULE (e.g. "FREQ=WEEKLY;BYDAY=MO") repeating from the deadline; see tasks/recurrence.py
+    recurrence_rule = models.CharField(max_length=500, blank=True)
+    recurrence_parent = models.ForeignKey('self', on_delete=models.CASCADE, null=True, blank=True,
+                                          related_name='occurrences')
+    occurrence_at = models.DateTimeField(null=True, blank=True)  # the series time this occurrence stands for
+    recurrence_end = models.DateTimeField(null=True, blank=True)  # last occurrence; null if the rule never ends
+    recurrence_materialized_until = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = TaskQuerySet.as_manager()
+
     class Meta:
         ordering = ['-priority_score', '-created_at']
+        indexes = [
+            # List pages: ORDER BY -priority_score, -created_at, id (keyset pagination)
+            models.Index(fields=['-priority_score', '-created_at', 'id'], name='task_list_order_idx'),
+            # today: deadline range AND status IN (...). Deadline leads so that the
+            # dense overdue set is still read in list order from the index above.
+            models.Index(fields=['deadline', 'status'], name='task_deadline_status_idx'),
+            # high_priority: status IN (...) AND priority IN (...)
+            models.Index(fields=['status', 'priority'], name='task_status_priority_idx'),
+            # enrich_tasks: the (usually small) queue of imported tasks awaiting AI
+            models.Index(fields=['id'], name='task_enrichment_pending_idx',
+                         condition=models.Q(ai_enrichment_pending=True)),
+            # materialize_occurrences and calendar expansion: the (small) set of series
+            models.Index(fields=['recurrence_materialized_until'], name='task_recurring_idx',
+                         condition=~models.Q(recurrence_rule='')),
+        ]
+        constraints = [
+            # One row per occurrence, however often the materialization job runs
+            models.UniqueConstraint(fields=['recurrence_parent', 'occurrence_at'], name='task_occurrence_unique'),
+        ]
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the counted columns as loaded, so counter maintenance can
+        # diff old and new values on save without an extra query. Instances
+        # loaded with only() leave it to the pre_save receiver instead.
+        if {'status', 'priority', 'category_id'}.issubset(field_names):
+            instance._counter_state = instance.counter_state()
+        if {'priority_score', 'deadline', 'status'}.issubset(field_names):
+            instance._dependency_state = instance.dependency_state()
+        return instance
+
+    def counter_state(self):
+        return (self.status, self.priority, self.category_id)
+
+    def dependency_state(self):
+        """What this task passes on to its blockers"""
+        return (self.priority_score, self.deadline, self.status in OPEN_STATUSES)
+
+    def reset_effective_priority(self):
+        """Effective values of a task that blocks nothing yet"""
+        self.effective_priority_score = self.priority_score
+        self.effective_deadline = self.deadline
+
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            self.reset_effective_priority()
+        else:
+            self.version += 1
+            update_fields = kwargs.get('update_fields')
+            if update_fields is None:
+                deferred = self.get_deferred_fields()
+                update_fields = [field.attname for field in self._meta.concrete_fields
+                                 if not field.primary_key and field.attname not in deferred]
+            # Only DependencyGraph.propagate writes the effective values: this
+            # instance may have been loaded before the last propagation
+            kwargs['update_fields'] = {*update_fields, 'version'} - set(PROPAGATED_FIELDS)
+        # Keep the row write and its statistics counter updates in one transaction
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get('using')):
+            return super().delete(*args, **kwargs)
+
+class TaskDependency(models.Model):
+    """``blocker`` has to be done before ``blocked`` can proceed"""
+    blocker = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='blocking_links')
+    blocked = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='blocked_by_links')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['blocker', 'blocked'], name='task_dependency_unique'),
+            models.CheckConstraint(condition=~models.Q(blocker=models.F('blocked')), name='task_dependency_not_self'),
+        ]
+
+    def __str__(self):
+        return f"{self.blocker_id} blocks {self.blocked_id}"
+
+class TaskCounter(models.Model):
+    """Maintained task counts for statistics: 'total', 'status:<s>', 'priority:<n>', 'category:<id>'"""
+    key = models.CharField(max_length=50, primary_key=True)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.key}={self.value}"
+
 class CategoryCorrection(models.Model):
     task = models.ForeignKey('Task', on_delete=models.CASCADE)
     old_category = models.CharField(max_length=100, blank=True, null=True)
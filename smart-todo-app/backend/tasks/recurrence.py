@@ -0,0 +1,240 @@
+"""
+Recurring tasks. A series is a task with a ``recurrence_rule`` (an RFC 5545
+RRULE) that repeats from its deadline, in the server's time zone.
+
+Occurrences are ordinary Task rows linked to the series, made ahead of time
+by ``manage.py materialize_occurrences`` for the next RECURRENCE_WINDOW_DAYS
+only. They copy the series' AI analysis (priority score, enhanced
+description, tags, category) instead of calling the LLM again. Date-range
+queries beyond what has been materialized expand the rules in memory
+(expand_occurrences), so the calendar is complete whenever the job last ran.
+"""
+
+import functools
+import re
+from datetime import MAXYEAR, timedelta
+from dateutil import parser, rrule
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from smart_todo.versioning import collection_changed
+from sync.changelog import record_changes
+from . import fuzzy
+from .models import Task
+from .statistics import counters_enabled, adjust_counters, state_deltas
+
+# The series' content and AI analysis, shared by every occurrence
+COPIED_FIELDS = ('title', 'description', 'category_id', 'priority', 'priority_score', 'ai_enhanced_description',
+                 'context_tags')
+FREQUENCIES = ('DAILY', 'WEEKLY', 'MONTHLY', 'YEARLY')
+MAX_PER_PASS = 100  # occurrences made per series per pass of the job
+# A series must repeat, and end if it ends at all, within this of its first deadline
+MAX_SPAN = timedelta(days=3660)
+_FREQ_RE = re.compile(r'(?:^|;)FREQ=([A-Z]+)')
+_TIME_PARTS_RE = re.compile(r'(?:^|;)BY(?:HOUR|MINUTE|SECOND)=')
+_DAY_FILTERS_RE = re.compile(r'(?:^|;)BY(?:MONTHDAY|YEARDAY|WEEKNO|SETPOS|EASTER)=')
+_COUNT_RE = re.compile(r'(?:^|;)COUNT=([^;]*)')
+_UNTIL_RE = re.compile(r'(?:^|;)UNTIL=([^;]*)')
+
+
+def normalize_rule(rule):
+    rule = (rule or '').strip().upper()
+    return rule[len('RRULE:'):] if rule.startswith('RRULE:') else rule
+
+
+def rule_limits(rule):
+    """COUNT and UNTIL of a normalized rule, each None if the rule does not set it"""
+    count = _COUNT_RE.search(rule)
+    until = _UNTIL_RE.search(rule)
+    # Read the way rrulestr() reads them
+    return (int(count.group(1)) if count else None, parser.parse(until.group(1)) if until else None)
+
+
+@functools.lru_cache(maxsize=1024)
+def parse_rule(rule, dtstart):
+    """dateutil rrule for ``rule`` starting at ``dtstart``; ValueError if it is not a usable rule"""
+    if '\n' in rule or 'DTSTART' in rule:
+        raise ValueError('Give a single RRULE; it starts at the task deadline.')
+    frequency = _FREQ_RE.search(rule)
+    if frequency is None or frequency.group(1) not in FREQUENCIES:
+        raise ValueError(f"FREQ must be one of: {', '.join(FREQUENCIES)}")
+    if _TIME_PARTS_RE.search(rule):
+        raise ValueError('The time of day comes from the deadline; BYHOUR, BYMINUTE and BYSECOND are not supported.')
+    if frequency.group(1) == 'DAILY' and _DAY_FILTERS_RE.search(rule):
+        # Day by day, dateutil scans a filter that matches nothing for thousands of years
+        raise ValueError('A DAILY rule can only be narrowed with BYDAY and BYMONTH; use WEEKLY, MONTHLY or YEARLY.')
+    return rrule.rrulestr(rule, dtstart=dtstart)
+
+
+def _times_until(parsed, dtstart, until):
+    """Times of ``parsed`` from ``dtstart`` to ``until``, ignoring its COUNT and UNTIL.
+
+    dateutil only checks UNTIL on matching dates, so a rule that rarely or
+    never matches is scanned up to the year 9999. The Gregorian calendar
+    repeats every 400 years: the rule is walked as many 400-year cycles
+    later as keeps that scan short, and the times shifted back.
+    """
+    years = 400 * ((MAXYEAR - MAX_SPAN.days // 365 - 1 - dtstart.year) // 400)
+    until = until.astimezone(dtstart.tzinfo)
+    shifted = parsed.replace(dtstart=dtstart.replace(year=dtstart.year + years), count=None,
+                             until=until.replace(year=until.year + years))
+    return [at.replace(year=at.year - years) for at in shifted]
+
+
+@functools.lru_cache(maxsize=1024)
+def rule_end(rule, dtstart):
+    """Time of the last occurrence, or None if the rule never ends.
+
+    ValueError unless the rule repeats within MAX_SPAN and, if it ends,
+    ends within MAX_SPAN. Only that span is expanded, so this stays cheap
+    for huge COUNTs, far UNTILs and rules that rarely or never match.
+    """
+    parsed = parse_rule(rule, dtstart)
+    count, until = rule_limits(rule)
+    span_end = dtstart + MAX_SPAN
+    if until and until > span_end:
+        raise ValueError('UNTIL must be within 10 years of the deadline.')
+    times = _times_until(parsed, dtstart, until or span_end)
+    if count:
+        if len(times) < count:
+            raise ValueError('The series must end within 10 years: lower COUNT.')
+        return times[count - 1]
+    if until:
+        return times[-1] if times else None
+    if not any(at > dtstart for at in times):
+        raise ValueError('The rule does not repeat within 10 years.')
+    return None
+
+
+def series_rule(task):
+    # Local wall-clock times, so a weekly 9:00 task stays at 9:00 across DST changes
+    return parse_rule(task.recurrence_rule, timezone.localtime(task.deadline))
+
+
+def check_rule(rule, deadline):
+    """Raise ValueError unless ``rule`` can repeat a task due at ``deadline``"""
+    if deadline is None:
+        raise ValueError('A recurring task needs a deadline to repeat from.')
+    rule_end(rule, timezone.localtime(deadline))
+
+
+def series_end(task):
+    """Time of the last occurrence, or None for rules without COUNT or UNTIL"""
+    return rule_end(task.recurrence_rule, timezone.localtime(task.deadline))
+
+
+def occurrences_between(task, after, before):
+    """Series times in (after, before]"""
+    return [at for at in series_rule(task).between(after, before, inc=True) if at > after]
+
+
+def recurring_q():
+    return Q(recurrence_parent__isnull=True, deadline__isnull=False) & ~Q(recurrence_rule='')
+
+
+def new_occurrence(series, at):
+    """Unsaved occurrence of ``series`` due at ``at``"""
+    task = Task(**{name: getattr(series, name) for name in COPIED_FIELDS},
+                deadline=at, occurrence_at=at, recurrence_parent_id=series.pk)
+    task.context_tags = list(series.context_tags)
+    task.reset_effective_priority()
+    return task
+
+
+def schedule_series(task, now=None):
+    """Restart ``task``'s series after its rule or deadline was set or changed.
+
+    Future occurrences nobody has touched yet are deleted; the job makes
+    them again from the new rule, from now on.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        task.occurrences.filter(occurrence_at__gt=now, status='pending', version=0).delete()
+        if task.recurrence_rule and task.deadline:
+            end, cursor = series_end(task), max(task.deadline, now)
+        else:
+            end = cursor = None
+        # Bookkeeping only: no version bump or change log entry
+        Task.objects.filter(pk=task.pk).update(recurrence_end=end, recurrence_materialized_until=cursor)
+    task.recurrence_end, task.recurrence_materialized_until = end, cursor
+
+
+def _cursor(series, now):
+    return series.recurrence_materialized_until or max(series.deadline, now)
+
+
+def materialize_occurrences(now=None, window_days=None, batch_size=100):
+    """Create every occurrence due before now + RECURRENCE_WINDOW_DAYS; returns how many were made"""
+    now = now or timezone.now()
+    if window_days is None:
+        window_days = getattr(settings, 'RECURRENCE_WINDOW_DAYS', 28)
+    horizon = now + timedelta(days=window_days)
+    unfinished = Q(recurrence_end__isnull=True) | Q(recurrence_end__gt=F('recurrence_materialized_until'))
+    # Series still awaiting their own AI analysis are left until enrich_tasks has run
+    due = Task.objects.filter(recurring_q(), ai_enrichment_pending=False).filter(
+        Q(recurrence_materialized_until__isnull=True) | (Q(recurrence_materialized_until__lt=horizon) & unfinished))
+    created = 0
+    while True:
+        with transaction.atomic():
+            series = list(due.select_for_update().order_by('pk')[:batch_size])
+            if not series:
+                return created
+            created += _materialize(series, now, horizon)
+
+
+def _materialize(series, now, horizon):
+    earliest = min(_cursor(task, now) for task in series)
+    existing = set(Task.objects.filter(recurrence_parent__in=series, occurrence_at__gt=earliest)
+                   .values_list('recurrence_parent_id', 'occurrence_at'))
+    tasks = []
+    for task in series:
+        cursor = _cursor(task, now)
+        times = []
+        if task.recurrence_end is None or task.recurrence_end > cursor:
+            try:
+                times = occurrences_between(task, cursor, horizon)
+            except ValueError:
+                pass  # a rule that no longer parses (edited outside the API): skip the series
+        task.recurrence_materialized_until = times[MAX_PER_PASS - 1] if len(times) > MAX_PER_PASS else horizon
+        tasks += [new_occurrence(task, at) for at in times[:MAX_PER_PASS] if (task.pk, at) not in existing]
+    Task.objects.bulk_update(series, ['recurrence_materialized_until'])
+    if not tasks:
+        return 0
+    Task.objects.bulk_create(tasks)
+    if counters_enabled():
+        # bulk_create sends no save signals
+        adjust_counters(state_deltas([], [task.counter_state() for task in tasks]))
+    collection_changed('tasks')
+    record_changes('task', [task.pk for task in tasks if task.pk is not None])
+    for task in tasks:
+        if task.pk is None:
+            fuzzy.task_titles.reset()  # backend without RETURNING: reload on next search
+            break
+        fuzzy.task_titles.update(task.pk, task.title)
+    return len(tasks)
+
+
+def expand_occurrences(start, end, limit):
+    """Unsaved occurrences in [start, end) that the job has not made yet, by time.
+
+    Only series that can have one in the range are read, and each rule is
+    expanded over the range alone.
+    """
+    series = Task.objects.select_related('category').filter(recurring_q(), deadline__lt=end).filter(
+        Q(recurrence_end__isnull=True) | Q(recurrence_end__gte=start),
+        Q(recurrence_materialized_until__isnull=True) | Q(recurrence_materialized_until__lt=end))
+    occurrences = []
+    for task in series:
+        cursor = task.recurrence_materialized_until or task.deadline
+        try:
+            times = occurrences_between(task, max(cursor, start - timedelta(microseconds=1)), end)
+        except ValueError:
+            continue
+        for at in times[:limit]:
+            if at < end:
+                occurrence = new_occurrence(task, at)
+                occurrence.category = task.category
+                occurrences.append(occurrence)
+    occurrences.sort(key=lambda task: task.deadline)
+    return occurrences[:limit]
@@ -1,8 +1,32 @@
+from django.utils import timezone
 from rest_framework import serializers
-from .models import Task, Category
+from .models import Task, Category, TaskDependency
+from .recurrence import check_rule, normalize_rule, schedule_series
 from ai_engine.task_analyzer import TaskAnalyzer
 from .services import get_recent_context_entries, ai_analyze_task_priority, ai_suggest_deadline, ai_enhance_task_description
 
+def validate_recurrence(data, instance=None):
+    """Check the recurrence rule against the deadline it will repeat from"""
+    rule = data.get('recurrence_rule', instance.recurrence_rule if instance else '')
+    if not rule:
+        return
+    if instance is not None and instance.recurrence_parent_id:
+        raise serializers.ValidationError({'recurrence_rule': 'An occurrence cannot repeat; edit its series.'})
+    deadline = data['deadline'] if 'deadline' in data else getattr(instance, 'deadline', None)
+    try:
+        check_rule(rule, deadline)
+    except ValueError as e:
+        raise serializers.ValidationError({'recurrence_rule': str(e)})
+
+def validate_tag_list(tags):
+    """Field-level check of ``context_tags``: a list of non-empty strings"""
+    if not isinstance(tags, list):
+        raise serializers.ValidationError('Tags must be a list.')
+    for tag in tags:
+        if not isinstance(tag, str) or not tag.strip():
+            raise serializers.ValidationError('Each tag must be a non-empty string.')
+    return tags
+
 class CategorySerializer(serializers.ModelSerializer):
     task_count = serializers.SerializerMethodField()
     
@@ -12,6 +36,10 @@ class CategorySerializer(serializers.ModelSerializer):
         read_only_fields = ['usage_count', 'created_at']
     
     def get_task_count(self, obj):
+        # Viewsets annotate task_count; fall back to a query for bare instances
+        task_count = getattr(obj, 'task_count', None)
+        if task_count is not None:
+            return task_count
         return obj.task_set.count()
     
     def validate_color(self, value):
@@ -64,47 +92,60 @@ class TaskSerializer(serializers.ModelSerializer):
             'id', 'title', 'description', 'category', 'category_name', 'category_color',
             'priority_score', 'priority', 'priority_label', 'deadline', 'status', 'status_label',
             'ai_enhanced_description', 'context_tags', 'days_until_deadline', 'is_overdue',
-            'created_at', 'updated_at'
+            'effective_priority_score', 'effective_deadline', 'recurrence_rule', 'recurrence_parent',
+            'occurrence_at', 'version', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['priority_score', 'ai_enhanced_description', 'context_tags', 'created_at', 'updated_at']
+        read_only_fields = ['priority_score', 'ai_enhanced_description', 'context_tags',
+                            'effective_priority_score', 'effective_deadline', 'recurrence_parent', 'occurrence_at',
+                            'version', 'created_at', 'updated_at']
+        # Columns read by the method fields, for ?fields= narrowing
+        method_field_sources = {'days_until_deadline': ['deadline'], 'is_overdue': ['deadline']}
     
+    def _now(self):
+        # Views pass one request-wide "now"; bare serializers use the current time
+        return self.context.get('now') or timezone.now()
+
+    def _deadline(self, obj):
+        # Make sure deadline is timezone-aware
+        if timezone.is_naive(obj.deadline):
+            return timezone.make_aware(obj.deadline)
+        return obj.deadline
+
     def get_days_until_deadline(self, obj):
+        # Annotated by TaskQuerySet.with_deadline_fields when the view read obj
+        if hasattr(obj, 'days_until_deadline'):
+            return obj.days_until_deadline
         if obj.deadline:
-            from django.utils import timezone
-            now = timezone.now()
-            # Make sure deadline is timezone-aware
-            if timezone.is_naive(obj.deadline):
-                deadline = timezone.make_aware(obj.deadline)
-            else:
-                deadline = obj.deadline
-            delta = deadline - now
-            return delta.days
+            return (self._deadline(obj) - self._now()).days
         return None
-    
+
     def get_is_overdue(self, obj):
+        if hasattr(obj, 'is_overdue'):
+            return obj.is_overdue
         if obj.deadline:
-            from django.utils import timezone
-            now = timezone.now()
-            # Make sure deadline is timezone-aware
-            if timezone.is_naive(obj.deadline):
-                deadline = timezone.make_aware(obj.deadline)
-            else:
-                deadline = obj.deadline
-            return now > deadline
+            return self._now() > self._deadline(obj)
         return False
     
+    def validate_recurrence_rule(self, value):
+        return normalize_rule(value)
+
     def create(self, validated_data):
         # Create task first
         task = Task.objects.create(**validated_data)
         # Then enhance with AI
         serializer = TaskSerializer()
         serializer._enhance_task_with_ai(task)
+        if task.recurrence_rule:
+            schedule_series(task)
         return task
     
     def update(self, instance, validated_data):
+        series = (instance.recurrence_rule, instance.deadline)
         # AI enhancement during task updates
         task = super().update(instance, validated_data)
         self._enhance_task_with_ai(task)
+        if (task.recurrence_rule or series[0]) and (task.recurrence_rule, task.deadline) != series:
+            schedule_series(task)
         return task
     
     def _enhance_task_with_ai(self, task):
@@ -142,16 +183,15 @@ class TaskSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError({'title': 'Title is required.'})
         if not data.get('description'):
             raise serializers.ValidationError({'description': 'Description is required.'})
-        # Validate tags/context_tags if present
-        tags = data.get('context_tags')
-        if tags is not None:
-            if not isinstance(tags, list):
-                raise serializers.ValidationError({'context_tags': 'Tags must be a list.'})
-            for tag in tags:
-                if not isinstance(tag, str) or not tag.strip():
-                    raise serializers.ValidationError({'context_tags': 'Each tag must be a non-empty string.'})
+        # context_tags is read-only here: the AI analysis sets it
+        validate_recurrence(data, self.instance)
         return data
 
+class TaskDependencySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TaskDependency
+        fields = ['id', 'blocker', 'blocked', 'created_at']
+
 class TaskListSerializer(serializers.ModelSerializer):
     """Simplified serializer for task lists"""
     category_name = serializers.CharField(source='category.name', read_only=True)
@@ -168,13 +208,14 @@ class TaskListSerializer(serializers.ModelSerializer):
 class TaskDetailSerializer(TaskSerializer):
     """Detailed serializer for single task view"""
     class Meta(TaskSerializer.Meta):
-        fields = TaskSerializer.Meta.fields + ['description', 'ai_enhanced_description', 'context_tags']
+        fields = TaskSerializer.Meta.fields
 
 class TaskCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating new tasks with AI enhancement"""
     class Meta:
         model = Task
-        fields = ['title', 'description', 'category', 'priority', 'deadline', 'status', 'context_tags']
+        fields = ['title', 'description', 'category', 'priority', 'deadline', 'status', 'context_tags',
+                  'recurrence_rule']
     
     def validate(self, data):
         # Validate required fields
@@ -182,19 +223,46 @@ class TaskCreateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError({'title': 'Title is required.'})
         if not data.get('description'):
             raise serializers.ValidationError({'description': 'Description is required.'})
-        tags = data.get('context_tags')
-        if tags is not None:
-            if not isinstance(tags, list):
-                raise serializers.ValidationError({'context_tags': 'Tags must be a list.'})
-            for tag in tags:
-                if not isinstance(tag, str) or not tag.strip():
-                    raise serializers.ValidationError({'context_tags': 'Each tag must be a non-empty string.'})
+        validate_recurrence(data)
         return data
     
+    def validate_recurrence_rule(self, value):
+        return normalize_rule(value)
+
+    def validate_context_tags(self, tags):
+        return validate_tag_list(tags)
+    
     def create(self, validated_data):
         # Create task first
         task = Task.objects.create(**validated_data)
         # Then enhance with AI
         serializer = TaskSerializer()
         serializer._enhance_task_with_ai(task)
-        return task 
\ No newline at end of file
+        if task.recurrence_rule:
+            schedule_series(task)
+        return task
+
+class TaskImportSerializer(serializers.ModelSerializer):
+    """Validates one imported row; the category is given by name"""
+    category = serializers.CharField(max_length=100, required=False, allow_blank=True, allow_null=True)
+
+    class Meta:
+        model = Task
+        fields = ['title', 'description', 'category', 'priority', 'deadline', 'status', 'context_tags']
+
+    def validate_context_tags(self, tags):
+        return validate_tag_list(tags)
+
+class TaskBulkUpdateSerializer(serializers.ModelSerializer):
+    """Validates the changes of one bulk-update row; used with partial=True.
+
+    The category is a plain id, checked for the whole request at once.
+    """
+    category = serializers.IntegerField(required=False, allow_null=True)
+
+    class Meta:
+        model = Task
+        fields = ['title', 'description', 'category', 'priority', 'deadline', 'status', 'context_tags']
+
+    def validate_context_tags(self, tags):
+        return validate_tag_list(tags)
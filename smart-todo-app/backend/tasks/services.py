@@ -1,11 +1,14 @@
 from context.models import ContextEntry
 from ai_engine import ai_manager
 
-def get_recent_context_entries(n=5):
+def get_recent_context_entries(n=20):
+    # Candidate pool only; TaskAnalyzer packs the most relevant entries
+    # into each prompt type's token budget.
     context_entries = ContextEntry.objects.order_by('-created_at')[:n]
     return [
         {
             'content': entry.content,
+            'created_at': entry.created_at,
             'source_type': entry.source_type,
             'sentiment_score': getattr(entry, 'sentiment_score', None),
             'importance_score': getattr(entry, 'importance_score', None),
@@ -21,4 +24,7 @@ def ai_suggest_deadline(task_data, current_workload):
     return ai_manager.suggest_deadline(task_data, current_workload)
 
 def ai_enhance_task_description(task_data, context_data):
-    return ai_manager.enhance_task_description(task_data, context_data) 
\ No newline at end of file
+    return ai_manager.enhance_task_description(task_data, context_data)
+
+def ai_suggest_tags(task_data, context_data, categories):
+    return ai_manager.suggest_tags(task_data, context_data, categories)
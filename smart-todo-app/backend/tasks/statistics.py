@@ -0,0 +1,144 @@
+# Task statistics: single-query aggregation and optional maintained counters
+from collections import Counter
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from .models import Task, Category, TaskCounter
+
+STATUSES = [choice for choice, _ in Task.STATUS_CHOICES]
+PRIORITIES = [choice for choice, _ in Task.PRIORITY_CHOICES]
+
+
+def counters_enabled():
+    return getattr(settings, 'TASK_STATISTICS_COUNTERS', False)
+
+
+def _response(total, status_counts, priority_counts, category_stats):
+    return {
+        'total_tasks': total,
+        'pending_tasks': status_counts.get('pending', 0),
+        'completed_tasks': status_counts.get('completed', 0),
+        'in_progress_tasks': status_counts.get('in_progress', 0),
+        'priority_distribution': {f'priority_{p}': priority_counts.get(p, 0) for p in PRIORITIES},
+        'category_distribution': category_stats,
+    }
+
+
+def compute_task_statistics():
+    """Task statistics from one conditional-aggregation query plus one GROUP BY on category"""
+    aggregates = {'total': Count('id')}
+    aggregates.update({f'status_{s}': Count('id', filter=Q(status=s)) for s in STATUSES})
+    aggregates.update({f'priority_{p}': Count('id', filter=Q(priority=p)) for p in PRIORITIES})
+    row = Task.objects.order_by().aggregate(**aggregates)
+
+    category_stats = dict(
+        Category.objects.order_by('pk').annotate(task_count=Count('task')).values_list('name', 'task_count')
+    )
+    return _response(
+        row['total'],
+        {s: row[f'status_{s}'] for s in STATUSES},
+        {p: row[f'priority_{p}'] for p in PRIORITIES},
+        category_stats,
+    )
+
+
+def read_task_statistics():
+    """Task statistics from the maintained counters table"""
+    counters = dict(TaskCounter.objects.values_list('key', 'value'))
+    category_stats = {
+        name: counters.get(f'category:{pk}', 0)
+        for pk, name in Category.objects.order_by('pk').values_list('pk', 'name')
+    }
+    return _response(
+        counters.get('total', 0),
+        {s: counters.get(f'status:{s}', 0) for s in STATUSES},
+        {p: counters.get(f'priority:{p}', 0) for p in PRIORITIES},
+        category_stats,
+    )
+
+
+def get_task_statistics():
+    return read_task_statistics() if counters_enabled() else compute_task_statistics()
+
+
+def counter_keys(state):
+    """Counter keys a task with (status, priority, category_id) contributes to"""
+    status, priority, category_id = state
+    keys = ['total', f'status:{status}', f'priority:{priority}']
+    if category_id is not None:
+        keys.append(f'category:{category_id}')
+    return keys
+
+
+def adjust_counters(deltas):
+    """Apply {key: delta} to the counters table inside the current transaction"""
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    with transaction.atomic():
+        for key, delta in sorted(deltas.items()):
+            updated = TaskCounter.objects.filter(key=key).update(value=F('value') + delta)
+            if not updated:
+                _, created = TaskCounter.objects.get_or_create(key=key, defaults={'value': delta})
+                if not created:
+                    TaskCounter.objects.filter(key=key).update(value=F('value') + delta)
+
+
+def state_deltas(removed_states, added_states):
+    """Counter deltas for replacing removed task states with added ones"""
+    deltas = Counter()
+    for state in removed_states:
+        for key in counter_keys(state):
+            deltas[key] -= 1
+    for state in added_states:
+        for key in counter_keys(state):
+            deltas[key] += 1
+    return deltas
+
+
+def rebuild_task_counters():
+    """Recompute every counter from the tasks table"""
+    counters = {'total': Task.objects.count()}
+    counters.update({f'status:{s}': n for s, n in
+                     Task.objects.order_by().values_list('status').annotate(n=Count('id'))})
+    counters.update({f'priority:{p}': n for p, n in
+                     Task.objects.order_by().values_list('priority').annotate(n=Count('id'))})
+    counters.update({f'category:{c}': n for c, n in
+                     Task.objects.order_by().exclude(category__isnull=True)
+                     .values_list('category_id').annotate(n=Count('id'))})
+    with transaction.atomic():
+        TaskCounter.objects.all().delete()
+        TaskCounter.objects.bulk_create([TaskCounter(key=k, value=v) for k, v in counters.items()])
+    return counters
+
+
+@receiver(pre_save, sender=Task)
+def load_task_counter_state(sender, instance, **kwargs):
+    # Instances not loaded from the DB (e.g. built with an explicit pk) need
+    # their stored values fetched before they are overwritten.
+    if counters_enabled() and instance.pk and not hasattr(instance, '_counter_state'):
+        row = Task.objects.filter(pk=instance.pk).values_list('status', 'priority', 'category_id').first()
+        instance._counter_state = tuple(row) if row else None
+
+
+@receiver(post_save, sender=Task)
+def update_task_counters_on_save(sender, instance, created, **kwargs):
+    new_state = instance.counter_state()
+    if counters_enabled():
+        old_state = None if created else getattr(instance, '_counter_state', None)
+        adjust_counters(state_deltas([old_state] if old_state else [], [new_state]))
+    instance._counter_state = new_state
+
+
+@receiver(post_delete, sender=Task)
+def update_task_counters_on_delete(sender, instance, **kwargs):
+    if counters_enabled():
+        adjust_counters(state_deltas([getattr(instance, '_counter_state', instance.counter_state())], []))
+
+
+@receiver(post_delete, sender=Category)
+def drop_category_counter(sender, instance, **kwargs):
+    # Tasks are detached with SET_NULL, which bypasses Task signals
+    TaskCounter.objects.filter(key=f'category:{instance.pk}').delete()
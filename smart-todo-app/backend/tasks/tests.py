@@ -1,8 +1,12 @@
-from django.test import TestCase
+import threading
+from unittest import mock
+from django.core.cache import cache
+from django.test import override_settings
 from django.urls import reverse
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 from .models import Task, Category
+from .statistics import compute_task_statistics, read_task_statistics, rebuild_task_counters
 
 # Create your tests here.
 
@@ -108,6 +112,12 @@ class TaskAPITestCase(APITestCase):
         response = self.client.delete(url)
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
 
+    def test_invalid_tags_are_rejected(self):
+        for tags in ("urgent", ["ok", ""], [1]):
+            response = self.client.post(reverse('task-list'), {**self.task_data, "context_tags": tags}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, tags)
+            self.assertIn('context_tags', response.data['detail'])
+
     def test_filter_tasks_by_status(self):
         url = reverse('task-list') + '?status=pending'
         response = self.client.get(url)
@@ -137,3 +147,1005 @@ class TaskAPITestCase(APITestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn('total_tasks', response.data)
+
+class IdempotencyTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.task = Task.objects.create(title="Idempotent Task", description="Retry me")
+        self.url = reverse('task-enhance-description', args=[self.task.id])
+
+    @mock.patch('tasks.views.ai_enhance_task_description', return_value='Enhanced once')
+    def test_retry_returns_stored_response_without_rerunning(self, enhance):
+        first = self.client.post(self.url, {}, format='json', HTTP_IDEMPOTENCY_KEY='abc')
+        second = self.client.post(self.url, {}, format='json', HTTP_IDEMPOTENCY_KEY='abc')
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertEqual(enhance.call_count, 1)
+
+    @mock.patch('tasks.views.ai_enhance_task_description', return_value='Enhanced')
+    def test_requests_without_key_always_run(self, enhance):
+        self.client.post(self.url, {}, format='json')
+        self.client.post(self.url, {}, format='json')
+        self.assertEqual(enhance.call_count, 2)
+
+    @mock.patch('tasks.views.ai_enhance_task_description', return_value='Enhanced')
+    def test_key_reuse_with_different_body_is_rejected(self, enhance):
+        self.client.post(self.url, {'a': 1}, format='json', HTTP_IDEMPOTENCY_KEY='reuse')
+        response = self.client.post(self.url, {'a': 2}, format='json', HTTP_IDEMPOTENCY_KEY='reuse')
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    @mock.patch('tasks.views.ai_enhance_task_description', return_value='Should not run')
+    def test_retry_attaches_to_in_flight_request(self, enhance):
+        from smart_todo import idempotency
+        # Simulate the original request still running, then finishing shortly
+        request = mock.Mock(method='POST', path=self.url, user=None)
+        cache_key = idempotency._cache_key(request, 'inflight')
+        fingerprint = idempotency.hashlib.sha256(b'{}').hexdigest()
+        cache.set(cache_key, {'state': 'in_progress', 'fingerprint': fingerprint})
+        finisher = threading.Timer(0.2, lambda: cache.set(cache_key, {
+            'state': 'completed',
+            'fingerprint': fingerprint,
+            'status': 200,
+            'data': {'enhanced_description': 'From original'},
+        }))
+        finisher.start()
+        response = self.client.post(self.url, {}, format='json', HTTP_IDEMPOTENCY_KEY='inflight')
+        finisher.join()
+        self.assertEqual(response.data, {'enhanced_description': 'From original'})
+        enhance.assert_not_called()
+
+    @override_settings(IDEMPOTENCY_IN_PROGRESS_TIMEOUT=0.3)
+    def test_slow_request_keeps_its_marker(self):
+        import time
+        from smart_todo import idempotency
+        cache_key = idempotency._cache_key(mock.Mock(method='POST', path=self.url, user=None), 'slow')
+        seen = []
+
+        def slow_enhance(*args):
+            time.sleep(0.6)  # twice the marker timeout
+            seen.append(cache.get(cache_key))
+            return 'Enhanced slowly'
+
+        with mock.patch('tasks.views.ai_enhance_task_description', side_effect=slow_enhance):
+            self.client.post(self.url, {}, format='json', HTTP_IDEMPOTENCY_KEY='slow')
+        self.assertEqual(seen[0]['state'], 'in_progress')
+        time.sleep(0.4)
+        self.assertEqual(cache.get(cache_key)['state'], 'completed')
+
+class TaskStatisticsTestCase(APITestCase):
+    def setUp(self):
+        self.categories = [Category.objects.create(name=f"Category {i}") for i in range(5)]
+        for i, category in enumerate(self.categories):
+            Task.objects.create(title=f"Task {i}", category=category, priority=i % 4 + 1,
+                                status=['pending', 'in_progress', 'completed'][i % 3])
+        Task.objects.create(title="Uncategorized", priority=4)
+
+    def test_statistics_query_count_is_independent_of_categories(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('task-statistics'))
+        self.assertEqual(response.data['total_tasks'], 6)
+        self.assertEqual(response.data['pending_tasks'], 3)
+        self.assertEqual(response.data['priority_distribution']['priority_4'], 2)
+        self.assertEqual(response.data['category_distribution'], {c.name: 1 for c in self.categories})
+
+    @override_settings(TASK_STATISTICS_COUNTERS=True)
+    def test_maintained_counters_match_aggregation(self):
+        rebuild_task_counters()
+        task = Task.objects.get(title="Task 0")
+        task.status = 'completed'
+        task.category = self.categories[1]
+        task.save()
+        Task.objects.get(title="Task 2").delete()
+        Task.objects.create(title="New", category=self.categories[3], priority=1)
+        self.client.post(reverse('task-bulk-update-status'),
+                         {'task_ids': list(Task.objects.values_list('id', flat=True)), 'status': 'in_progress'},
+                         format='json')
+        self.categories[4].delete()
+        self.assertEqual(read_task_statistics(), compute_task_statistics())
+        with self.assertNumQueries(2):
+            self.client.get(reverse('task-statistics'))
+
+class QueryBudgetTestCase(APITestCase):
+    """Per-endpoint query budgets; a per-row query makes these fail"""
+    budgets = {
+        'task-list': 1,
+        'task-overdue': 1,
+        'task-high-priority': 1,
+        'task-today': 1,
+        'task-statistics': 2,
+        'category-list': 2,
+        'category-popular': 1,
+    }
+
+    def setUp(self):
+        from django.utils import timezone
+        from datetime import timedelta
+        now = timezone.now()
+        categories = [Category.objects.create(name=f"Budget {i}") for i in range(10)]
+        for i in range(30):
+            Task.objects.create(
+                title=f"Budget task {i}", category=categories[i % 10], priority=i % 4 + 1,
+                deadline=now - timedelta(days=1) if i % 2 else now + timedelta(hours=1),
+            )
+
+    def test_endpoints_stay_within_query_budget(self):
+        for name, budget in self.budgets.items():
+            with self.subTest(endpoint=name):
+                with self.assertNumQueries(budget):
+                    response = self.client.get(reverse(name))
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_detail_stays_within_query_budget(self):
+        task = Task.objects.first()
+        with self.assertNumQueries(1):
+            self.client.get(reverse('task-detail', args=[task.id]))
+
+
+class KeysetPaginationTestCase(APITestCase):
+    def setUp(self):
+        from django.utils import timezone
+        from datetime import timedelta
+        now = timezone.now()
+        # Many ties on priority_score and missing deadlines exercise the composite key
+        for i in range(25):
+            Task.objects.create(
+                title=f"Page task {i}", priority_score=float(i % 3),
+                deadline=None if i % 4 == 0 else now + timedelta(days=i % 5),
+            )
+
+    def _walk(self, url):
+        ids, pages = [], []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append(response.data)
+            ids.extend(task['id'] for task in response.data['results'])
+            url = response.data['next']
+        return ids, pages
+
+    def test_pages_cover_every_task_once_in_order(self):
+        ids, pages = self._walk(reverse('task-list') + '?page_size=7')
+        expected = list(Task.objects.order_by('-priority_score', '-created_at', 'id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+        self.assertEqual(len(pages), 4)
+        self.assertIsNone(pages[0]['previous'])
+        self.assertNotIn('count', pages[0])
+
+    def test_previous_link_returns_preceding_page(self):
+        _, pages = self._walk(reverse('task-list') + '?page_size=7')
+        response = self.client.get(pages[2]['previous'])
+        self.assertEqual([t['id'] for t in response.data['results']], [t['id'] for t in pages[1]['results']])
+
+    def test_ordering_on_nullable_field(self):
+        ids, _ = self._walk(reverse('task-list') + '?page_size=4&ordering=deadline')
+        self.assertEqual(len(ids), 25)
+        self.assertEqual(len(set(ids)), 25)
+        deadlines = list(Task.objects.filter(id__in=ids[-7:]).values_list('deadline', flat=True))
+        self.assertEqual(deadlines, [None] * 7)
+
+    def test_actions_are_paginated(self):
+        response = self.client.get(reverse('task-today') + '?page_size=2')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertLessEqual(len(response.data['results']), 2)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('task-list') + '?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class FullTextSearchTestCase(APITestCase):
+    def setUp(self):
+        self.report = Task.objects.create(title="Quarterly report", description="Draft the finance summary")
+        self.mention = Task.objects.create(title="Email Bob", description="Ask about the quarterly numbers")
+        Task.objects.create(title="Buy groceries", description="Milk and eggs")
+
+    def _search(self, q, **params):
+        response = self.client.get(reverse('task-search'), {'q': q, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [task['id'] for task in response.data['results']]
+
+    def test_title_matches_rank_first(self):
+        self.assertEqual(self._search('quarterly'), [self.report.id, self.mention.id])
+
+    def test_all_terms_must_match(self):
+        self.assertEqual(self._search('Finance quarterly'), [self.report.id])
+
+    def test_index_follows_updates_and_deletes(self):
+        Task.objects.filter(pk=self.mention.pk).update(description="Ask about lunch")
+        self.report.delete()
+        self.assertEqual(self._search('quarterly'), [])
+        self.assertEqual(self._search('lunch'), [self.mention.id])
+
+    def test_post_migrate_restores_dropped_triggers(self):
+        from django.apps import apps
+        from django.db import connection
+        from django.db.models.signals import post_migrate
+        if connection.vendor != 'sqlite':
+            self.skipTest('FTS5 triggers are SQLite only')
+        with connection.cursor() as cursor:  # what a table rebuild in a migration does
+            for suffix in ('ai', 'ad', 'au'):
+                cursor.execute(f"DROP TRIGGER tasks_task_fts_{suffix}")
+        Task.objects.filter(pk=self.mention.pk).update(title="Quarterly review")
+        post_migrate.send(sender=apps.get_app_config('tasks'), app_config=apps.get_app_config('tasks'),
+                          verbosity=0, interactive=False, using='default', apps=apps, plan=[])
+        self.assertEqual(self._search('review'), [self.mention.id])
+        Task.objects.filter(pk=self.report.pk).update(title="Annual report")
+        self.assertEqual(self._search('annual'), [self.report.id])
+
+    def test_query_syntax_is_not_interpreted(self):
+        self.assertEqual(self._search('report" ('), [self.report.id])
+
+    @override_settings(FULLTEXT_MAX_RANKED=5)
+    def test_filters_apply_before_ranking(self):
+        self.mention.status = 'completed'
+        self.mention.save()
+        for i in range(10):  # newer and better matches, all filtered out
+            Task.objects.create(title=f"Quarterly report {i}", description="quarterly", status='completed')
+        self.assertEqual(self._search('quarterly', status='pending', page_size=2), [self.report.id])
+        self.assertEqual(len(self._search('quarterly', status='completed', page_size=2)), 2)
+
+    def test_query_required(self):
+        response = self.client.get(reverse('task-search'))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class FuzzySearchTestCase(APITestCase):
+    def setUp(self):
+        from . import fuzzy
+        fuzzy.reset()
+        self.work = Category.objects.create(name="Work")
+        self.groceries = Category.objects.create(name="Groceries")
+        self.report = Task.objects.create(title="Quarterly report", category=self.work)
+        Task.objects.create(title="Buy milk", category=self.groceries)
+
+    def _search(self, q):
+        response = self.client.get(reverse('task-fuzzy-search'), {'q': q})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_misspelled_title_and_category(self):
+        data = self._search('quartely reprot')
+        self.assertEqual([task['id'] for task in data['tasks']], [self.report.id])
+        self.assertGreater(data['tasks'][0]['similarity'], 0.5)
+        self.assertEqual([c['id'] for c in self._search('grocerys')['categories']], [self.groceries.id])
+
+    def test_index_follows_saves_and_deletes(self):
+        self._search('anything')  # loads the index
+        added = Task.objects.create(title="Dentist appointment")
+        self.assertEqual([task['id'] for task in self._search('dentsit')['tasks']], [added.id])
+        added.title = "Gym session"
+        added.save()
+        self.assertEqual(self._search('dentsit')['tasks'], [])
+        self.report.delete()
+        self.assertEqual(self._search('quartely reprot')['tasks'], [])
+
+    def test_query_required(self):
+        response = self.client.get(reverse('task-fuzzy-search'))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        for threshold in ('x', 'nan', 'inf', '0', '1.5'):
+            response = self.client.get(reverse('task-fuzzy-search'), {'q': 'report', 'threshold': threshold})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, threshold)
+
+
+class ConditionalGetTestCase(APITestCase):
+    def setUp(self):
+        self.task = Task.objects.create(title="Cached task")
+
+    def test_not_modified_without_queries(self):
+        for name in ('task-list', 'task-statistics'):
+            with self.subTest(endpoint=name):
+                response = self.client.get(reverse(name))
+                etag = response['ETag']
+                with self.assertNumQueries(0):
+                    response = self.client.get(reverse(name), HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+                self.assertEqual(response['ETag'], etag)
+                # Weak comparison and lists of tags
+                response = self.client.get(reverse(name), HTTP_IF_NONE_MATCH=f'"other", W/{etag}')
+                self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_writes_change_the_etag(self):
+        etag = self.client.get(reverse('task-list'))['ETag']
+        self.task.title = "Renamed"
+        self.task.save()
+        response = self.client.get(reverse('task-list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+
+        self.client.post(reverse('task-bulk-update-status'), {'task_ids': [self.task.id], 'status': 'completed'},
+                         format='json')
+        self.assertNotEqual(self.client.get(reverse('task-list'))['ETag'], etag)
+
+    def test_etag_depends_on_query(self):
+        first = self.client.get(reverse('task-list'))['ETag']
+        self.assertNotEqual(self.client.get(reverse('task-list'), {'status': 'pending'})['ETag'], first)
+
+
+class AnalyticsCacheTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.task = Task.objects.create(title="Analytics task")
+
+    def test_correction_analytics_invalidated_by_new_corrections(self):
+        from .models import CategoryCorrection
+        self.assertEqual(self.client.get(reverse('task-correction-analytics')).data['most_common_corrections'], [])
+        CategoryCorrection.objects.create(task=self.task, old_category='Work', new_category='Personal')
+        corrections = self.client.get(reverse('task-correction-analytics')).data['most_common_corrections']
+        self.assertEqual(corrections, [{'old_category': 'Work', 'new_category': 'Personal', 'count': 1}])
+
+    def test_ai_analytics_caches_database_part_only(self):
+        self.client.get(reverse('task-ai-analytics'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('task-ai-analytics'))
+        self.assertIn('prompt_usage', response.data)
+        Task.objects.create(title="Another")
+        self.assertEqual(self.client.get(reverse('task-ai-analytics')).data['total_tasks'], 2)
+
+
+class FastListSerializationTestCase(APITestCase):
+    """The fast list path must produce exactly the bytes the DRF serializer would"""
+
+    def setUp(self):
+        from django.utils import timezone
+        from datetime import timedelta
+        now = timezone.now().replace(microsecond=123456)
+        work = Category.objects.create(name="Wörk   ✓")
+        for i in range(12):
+            Task.objects.create(
+                title=f'Fast "task" {i}   ü', category=work if i % 3 else None,
+                priority=i % 4 + 1, status=['pending', 'in_progress', 'completed'][i % 3],
+                priority_score=[0.0, 0.5, 12345.678, 1e-07][i % 4],
+                deadline=None if i % 2 else now.replace(microsecond=0) + timedelta(days=i),
+            )
+
+    def _both(self, url, **headers):
+        fast = self.client.get(url, **headers)
+        with override_settings(FAST_LIST_SERIALIZATION=False):
+            slow = self.client.get(url, **headers)
+        self.assertEqual(fast.status_code, status.HTTP_200_OK)
+        self.assertEqual(fast['Content-Type'], slow['Content-Type'])
+        self.assertEqual(fast.content, slow.content)
+        return fast
+
+    def test_pages_are_byte_identical(self):
+        from smart_todo.fast_serialization import FastJSONResponse
+        self.assertIsInstance(self.client.get(reverse('task-list')), FastJSONResponse)
+        url = reverse('task-list') + '?page_size=5&ordering=deadline'
+        while url:
+            url = self._both(url).data['next']
+
+    def test_filters_and_search(self):
+        self._both(reverse('task-list') + '?status=completed&search=task')
+        self._both(reverse('task-list') + '?page_size=3', HTTP_ACCEPT='application/json; indent=4')
+
+    def test_list_uses_one_query(self):
+        with self.assertNumQueries(1):
+            self.client.get(reverse('task-list'))
+
+
+class SparseFieldsetTestCase(APITestCase):
+    def setUp(self):
+        from django.utils import timezone
+        from datetime import timedelta
+        category = Category.objects.create(name="Sparse")
+        for i in range(5):
+            Task.objects.create(title=f"Sparse task {i}", description="d", category=category,
+                                ai_enhanced_description="long " * 200,
+                                deadline=timezone.now() - timedelta(days=1))
+
+    def test_list_fields(self):
+        for fast in (True, False):
+            with self.subTest(fast=fast), override_settings(FAST_LIST_SERIALIZATION=fast):
+                with self.assertNumQueries(1):
+                    response = self.client.get(reverse('task-list') + '?fields=id,category_name&page_size=2')
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(list(response.data['results'][0]), ['id', 'category_name'])
+                self.assertEqual(response.data['results'][0]['category_name'], "Sparse")
+                self.assertEqual(len(self.client.get(response.data['next']).data['results']), 2)
+
+    def test_omit_narrows_select(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        task = Task.objects.first()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('task-detail', args=[task.id]) + '?omit=ai_enhanced_description,description')
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('ai_enhanced_description', queries[0]['sql'])
+        self.assertNotIn('description', response.data)
+        self.assertIn('category_color', response.data)
+
+    def test_method_fields_load_their_columns(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('task-overdue') + '?fields=id,is_overdue')
+        self.assertEqual(response.data['results'][0], {'id': response.data['results'][0]['id'], 'is_overdue': True})
+
+    def test_unknown_field(self):
+        response = self.client.get(reverse('task-list') + '?fields=id,nope')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_large_responses_are_compressed(self):
+        response = self.client.get(reverse('task-overdue'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        response = self.client.get(reverse('task-overdue') + '?fields=id', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+
+class TaskImportTestCase(APITestCase):
+    def setUp(self):
+        from . import fuzzy
+        fuzzy.reset()
+
+    def _import(self, body, content_type, query=''):
+        return self.client.generic('POST', reverse('task-import') + query, body.encode('utf-8'),
+                                   content_type=content_type)
+
+    def test_ndjson_import_reports_bad_rows(self):
+        body = '\n'.join([
+            '{"title": "Imported one", "category": "Work", "priority": 3, "context_tags": ["a"]}',
+            '',
+            'not json',
+            '{"title": "Imported two", "category": "Work", "deadline": "2030-01-01T09:00:00Z"}',
+            '{"description": "no title"}',
+            '{"title": "Imported three", "status": "done"}',
+        ])
+        with override_settings(TASK_IMPORT_BATCH_SIZE=2):
+            response = self._import(body, 'application/x-ndjson')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(response.data['error_count'], 3)
+        self.assertEqual([error['line'] for error in response.data['errors']], [3, 5, 6])
+        self.assertEqual(response.data['enrichment_queued'], 2)
+        tasks = Task.objects.order_by('id')
+        self.assertEqual([t.category.name for t in tasks], ['Work', 'Work'])
+        self.assertEqual(Category.objects.filter(name='Work').count(), 1)
+        self.assertTrue(all(t.ai_enrichment_pending for t in tasks))
+        self.assertEqual(tasks[0].priority, 3)
+
+    def test_csv_import_updates_search_indexes(self):
+        body = '﻿title,description,category,context_tags\r\nQuarterly dentist visit,"multi\nline",,x; y\r\n'
+        response = self._import(body, 'text/csv', '?enrich=false')
+        self.assertEqual(response.data['created'], 1)
+        task = Task.objects.get()
+        self.assertEqual((task.description, task.category, task.context_tags), ('multi\nline', None, ['x', 'y']))
+        self.assertFalse(task.ai_enrichment_pending)
+        self.assertEqual(self.client.get(reverse('task-search'), {'q': 'dentist'}).data['results'][0]['id'], task.id)
+        self.assertEqual(self.client.get(reverse('task-fuzzy-search'), {'q': 'dentsit'}).data['tasks'][0]['id'], task.id)
+
+    def test_import_invalidates_list_etag(self):
+        etag = self.client.get(reverse('task-list'))['ETag']
+        self._import('{"title": "New"}', 'application/x-ndjson')
+        response = self.client.get(reverse('task-list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 1)
+
+    @override_settings(TASK_STATISTICS_COUNTERS=True)
+    def test_import_maintains_counters(self):
+        self._import('{"title": "A", "status": "completed"}\n{"title": "B", "category": "Home"}',
+                     'application/x-ndjson')
+        self.assertEqual(read_task_statistics(), compute_task_statistics())
+
+    def test_unsupported_content_type(self):
+        response = self._import('{"title": "A"}', 'application/json')
+        self.assertEqual(response.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+    def test_enrich_tasks_drains_the_queue(self):
+        from .enrichment import enrich_pending_tasks
+        self._import('{"title": "A"}\n{"title": "B"}\n{"title": "C"}', 'application/x-ndjson')
+        with mock.patch('tasks.serializers.TaskSerializer._enhance_task_with_ai') as enhance:
+            self.assertEqual(enrich_pending_tasks(limit=2), 2)
+            self.assertEqual(enrich_pending_tasks(), 1)
+        self.assertEqual(enhance.call_count, 3)
+        self.assertFalse(Task.objects.filter(ai_enrichment_pending=True).exists())
+
+
+class TaskExportTestCase(APITestCase):
+    def setUp(self):
+        work = Category.objects.create(name="Work")
+        self.tasks = [Task.objects.create(title=f"Export task {i}", description="d, \"quoted\"",
+                                          category=work if i % 2 else None, context_tags=['a', 'b'])
+                      for i in range(5)]
+
+    def _content(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_ndjson(self):
+        import json
+        with override_settings(EXPORT_CHUNK_SIZE=2):
+            response = self.client.get(reverse('task-export'), {'status': 'pending'})
+        rows = [json.loads(line) for line in self._content(response).splitlines()]
+        self.assertEqual([row['id'] for row in rows], [task.id for task in self.tasks])
+        self.assertEqual(rows[1]['category_name'], "Work")
+        self.assertEqual(rows[0]['context_tags'], ['a', 'b'])
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+
+    def test_csv_with_fields(self):
+        import csv
+        import io
+        response = self.client.get(reverse('task-export'), {'output': 'csv', 'fields': 'id,description,context_tags'})
+        rows = list(csv.reader(io.StringIO(self._content(response))))
+        self.assertEqual(rows[0], ['id', 'description', 'context_tags'])
+        self.assertEqual(rows[1], [str(self.tasks[0].id), 'd, "quoted"', 'a;b'])
+        self.assertEqual(len(rows), 6)
+
+    def test_columnar_formats(self):
+        from smart_todo import export
+        for output in ('parquet', 'arrow'):
+            response = self.client.get(reverse('task-export'), {'output': output})
+            if export.pyarrow is None:
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                continue
+            data = b''.join(response.streaming_content)
+            if output == 'parquet':
+                import pyarrow.parquet
+                table = pyarrow.parquet.read_table(export.pyarrow.BufferReader(data))
+            else:
+                table = export.pyarrow.ipc.open_stream(data).read_all()
+            self.assertEqual(table.column('id').to_pylist(), [task.id for task in self.tasks])
+
+    def test_unknown_output(self):
+        response = self.client.get(reverse('task-export'), {'output': 'xml'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TaskBulkUpdateTestCase(APITestCase):
+    def setUp(self):
+        self.work = Category.objects.create(name="Work")
+        self.tasks = [Task.objects.create(title=f"Bulk task {i}", description="d") for i in range(5)]
+
+    def _patch(self, data):
+        return self.client.patch(reverse('task-bulk-update'), data, format='json')
+
+    def test_same_changes_for_many_ids(self):
+        ids = [task.id for task in self.tasks[:3]]
+        with mock.patch('tasks.serializers.TaskSerializer._enhance_task_with_ai') as enhance, \
+                override_settings(BULK_UPDATE_BATCH_SIZE=2):
+            response = self._patch({'ids': ids, 'changes': {'status': 'completed', 'category': self.work.id}})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['updated'], 3)
+        enhance.assert_not_called()
+        updated = Task.objects.filter(id__in=ids)
+        self.assertEqual({(t.status, t.category_id, t.version) for t in updated}, {('completed', self.work.id, 1)})
+        self.assertEqual(Task.objects.get(id=self.tasks[3].id).status, 'pending')
+
+    def test_version_conflicts_are_skipped(self):
+        first, second = self.tasks[:2]
+        second.title = "Edited elsewhere"
+        second.save()
+        response = self._patch({'updates': [
+            {'id': first.id, 'version': 0, 'title': "Renamed dentist visit"},
+            {'id': second.id, 'version': 0, 'priority': 4},
+            {'id': 999999, 'priority': 4},
+        ]})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['versions'], {first.id: 1})
+        self.assertEqual(response.data['conflicts'], [{'id': second.id, 'version': 1}])
+        self.assertEqual(response.data['not_found'], [999999])
+        self.assertEqual(Task.objects.get(id=second.id).priority, 2)
+        self.assertEqual(self.client.get(reverse('task-fuzzy-search'), {'q': 'dentsit'}).data['tasks'][0]['id'],
+                         first.id)
+
+    def test_atomic_conflict_rolls_back(self):
+        response = self._patch({'atomic': True, 'updates': [
+            {'id': self.tasks[0].id, 'status': 'completed'},
+            {'id': self.tasks[1].id, 'version': 7, 'status': 'completed'},
+        ]})
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['updated'], 0)
+        self.assertFalse(Task.objects.filter(status='completed').exists())
+        for atomic in ('false', 0, None):
+            response = self._patch({'atomic': atomic, 'ids': [self.tasks[0].id], 'changes': {'status': 'completed'}})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, atomic)
+            self.assertIn('atomic', response.data['detail'])
+
+    def test_invalid_rows_write_nothing(self):
+        response = self._patch({'updates': [
+            {'id': self.tasks[0].id, 'status': 'completed'},
+            {'id': self.tasks[1].id, 'status': 'done'},
+            {'id': self.tasks[2].id, 'category': 999999},
+            {'status': 'completed'},
+        ]})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([error['index'] for error in response.data['errors']], [1, 2, 3])
+        self.assertFalse(Task.objects.filter(status='completed').exists())
+
+    def test_update_invalidates_list_etag(self):
+        etag = self.client.get(reverse('task-list'))['ETag']
+        self._patch({'ids': [self.tasks[0].id], 'changes': {'priority': 4}})
+        response = self.client.get(reverse('task-list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(TASK_STATISTICS_COUNTERS=True)
+    def test_update_maintains_counters(self):
+        rebuild_task_counters()
+        self._patch({'updates': [
+            {'id': self.tasks[0].id, 'status': 'in_progress', 'category': self.work.id},
+            {'id': self.tasks[1].id, 'priority': 1},
+        ]})
+        self.assertEqual(read_task_statistics(), compute_task_statistics())
+
+
+class DeadlineFieldsTestCase(APITestCase):
+    def setUp(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        self.now = timezone.now()
+        self.offsets = [timedelta(days=2, hours=1), timedelta(hours=23), timedelta(seconds=1),
+                        -timedelta(seconds=1), -timedelta(hours=25), -timedelta(days=3)]
+        for number, offset in enumerate(self.offsets):
+            Task.objects.create(title=f"Task {number}", deadline=self.now + offset)
+        Task.objects.create(title="No deadline")
+        Task.objects.create(title="Done late", status='completed', deadline=self.now - timedelta(days=1))
+
+    def test_annotations_match_python(self):
+        for task in Task.objects.with_deadline_fields(self.now):
+            expected = (task.deadline - self.now).days if task.deadline else None
+            self.assertEqual(task.days_until_deadline, expected, task.title)
+            self.assertEqual(task.is_overdue, bool(task.deadline and task.deadline < self.now), task.title)
+
+    def test_one_now_per_request(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        with mock.patch('tasks.filters.timezone.now', return_value=self.now) as now:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(reverse('task-overdue'))
+        self.assertEqual(now.call_count, 1)
+        self.assertEqual(len(queries), 1)
+        titles = {task['title'] for task in response.data['results']}
+        self.assertEqual(titles, {"Task 3", "Task 4", "Task 5"})
+        self.assertTrue(all(task['is_overdue'] for task in response.data['results']))
+        self.assertEqual({task['days_until_deadline'] for task in response.data['results']}, {-1, -2, -3})
+
+    def test_due_soon(self):
+        response = self.client.get(reverse('task-due-soon'), {'days': 1})
+        self.assertEqual({task['title'] for task in response.data['results']}, {"Task 1", "Task 2"})
+        response = self.client.get(reverse('task-due-soon'), {'days': 'x'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_filters(self):
+        response = self.client.get(reverse('task-list'), {'overdue': 'true', 'page_size': 50})
+        self.assertEqual({task['title'] for task in response.data['results']},
+                         {"Task 3", "Task 4", "Task 5", "Done late"})
+        response = self.client.get(reverse('task-list'), {'due_within': 3, 'page_size': 50})
+        self.assertEqual({task['title'] for task in response.data['results']}, {"Task 0", "Task 1", "Task 2"})
+        for days in (-1, 367, 99999999):
+            response = self.client.get(reverse('task-list'), {'due_within': days})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_time_filters_skip_etag(self):
+        self.assertIn('ETag', self.client.get(reverse('task-list')))
+        response = self.client.get(reverse('task-list'), {'overdue': 'true'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('ETag', response)
+        self.assertNotIn('ETag', self.client.get(reverse('task-list'), {'due_within': 1}))
+
+    def test_update_reports_new_deadline(self):
+        from datetime import timedelta
+        task = Task.objects.get(title="Task 5")
+        response = self.client.patch(reverse('task-detail', args=[task.pk]), {
+            'title': task.title, 'description': 'Moved', 'deadline': self.now + timedelta(days=5, hours=1),
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['days_until_deadline'], 5)
+        self.assertFalse(response.data['is_overdue'])
+
+
+class TaskDependencyTestCase(APITestCase):
+    def setUp(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        self.soon = timezone.now() + timedelta(days=1)
+        self.design = Task.objects.create(title="Design", priority_score=2.0)
+        self.build = Task.objects.create(title="Build", priority_score=3.0)
+        self.launch = Task.objects.create(title="Launch", priority_score=9.0, deadline=self.soon)
+        # design blocks build, which blocks launch
+        for blocker, blocked in ((self.design, self.build), (self.build, self.launch)):
+            response = self.client.post(reverse('task-dependencies', args=[blocked.pk]), {'blocked_by': blocker.pk},
+                                        format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def effective(self, task):
+        task.refresh_from_db()
+        return (task.effective_priority_score, task.effective_deadline)
+
+    def test_blockers_inherit_urgency(self):
+        self.assertEqual(self.effective(self.design), (9.0, self.soon))
+        self.assertEqual(self.effective(self.build), (9.0, self.soon))
+        self.assertEqual(self.effective(self.launch), (9.0, self.soon))
+        response = self.client.get(reverse('task-dependencies', args=[self.build.pk]))
+        self.assertEqual([t['title'] for t in response.data['blocked_by']], ["Design"])
+        self.assertEqual([t['title'] for t in response.data['blocks']], ["Launch"])
+        response = self.client.get(reverse('task-list'), {'ordering': '-effective_priority_score,id'})
+        self.assertEqual([t['title'] for t in response.data['results']], ["Design", "Build", "Launch"])
+
+    def test_changes_propagate_upstream_only(self):
+        from .dependencies import graph
+        self.design.priority_score = 9.5
+        self.design.save()
+        other = Task.objects.create(title="Unrelated", priority_score=1.0)
+        self.launch.refresh_from_db()
+        self.launch.priority_score = 9.2
+        self.launch.save()
+        self.assertEqual(self.effective(self.build)[0], 9.2)
+        self.assertEqual(self.effective(self.design)[0], 9.5)  # its own score is higher: the walk stops there
+        self.assertEqual(graph.upstream([self.launch.pk]), {self.launch.pk, self.build.pk, self.design.pk})
+        self.assertEqual(self.effective(other)[0], 1.0)
+
+    def test_stale_instance_keeps_propagated_values(self):
+        stale = Task.objects.get(pk=self.design.pk)
+        self.launch.refresh_from_db()
+        self.launch.priority_score = 9.8
+        self.launch.save()
+        self.assertEqual(self.effective(self.design)[0], 9.8)
+        stale.description = "Edited while the score changed"
+        stale.save()
+        self.assertEqual(self.effective(self.design)[0], 9.8)
+        # Its own change is measured against the stored values, not the stale ones
+        stale.priority_score = 9.0
+        stale.save()
+        self.assertEqual(stale.effective_priority_score, 9.8)
+        self.assertEqual(self.effective(self.design)[0], 9.8)
+
+    def test_tasks_without_edges_skip_the_graph(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from .dependencies import graph
+        other = Task.objects.create(title="Unrelated", priority_score=1.0)
+        graph.ensure_current()
+        with CaptureQueriesContext(connection) as queries:
+            other.priority_score = 4.0
+            other.save()
+        self.assertFalse([q['sql'] for q in queries if 'taskdependency' in q['sql']])
+        self.assertEqual(self.effective(other)[0], 4.0)
+        self.assertEqual(other.effective_priority_score, 4.0)
+
+    def test_finished_tasks_release_their_blockers(self):
+        self.client.post(reverse('task-mark-completed', args=[self.launch.pk]))
+        self.assertEqual(self.effective(self.design), (3.0, None))
+        self.client.post(reverse('task-bulk-update-status'), {'task_ids': [self.launch.pk], 'status': 'pending'},
+                         format='json')
+        self.assertEqual(self.effective(self.design), (9.0, self.soon))
+
+    def test_removing_an_edge(self):
+        response = self.client.delete(reverse('task-dependencies', args=[self.launch.pk]) + f'?blocked_by={self.build.pk}')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.effective(self.design), (3.0, None))
+        self.build.delete()
+        self.assertEqual(self.effective(self.design), (2.0, None))
+
+    def test_cycles_are_refused(self):
+        from .models import TaskDependency
+        response = self.client.post(reverse('task-dependencies', args=[self.design.pk]), {'blocked_by': self.launch.pk},
+                                    format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['cycle'], [self.launch.pk, self.design.pk, self.build.pk, self.launch.pk])
+        response = self.client.post(reverse('task-dependencies', args=[self.design.pk]), {'blocks': self.design.pk},
+                                    format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        # Edges written without signals are seen once the collection version moves
+        from smart_todo.versioning import collection_changed
+        extra = Task.objects.create(title="Extra")
+        TaskDependency.objects.bulk_create([TaskDependency(blocker=self.launch, blocked=extra)])
+        collection_changed('dependencies')
+        response = self.client.post(reverse('task-dependencies', args=[self.design.pk]), {'blocked_by': extra.pk},
+                                    format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_cycle_check_holds_the_edge_lock(self):
+        from . import dependencies
+        calls = mock.Mock()
+        with mock.patch.object(dependencies, '_lock_edges', calls.lock), \
+                mock.patch.object(dependencies.graph, 'check_new_edge', calls.check):
+            dependencies.add_dependency(self.launch.pk, self.design.pk)
+        self.assertEqual(calls.mock_calls, [mock.call.lock(self.launch.pk, self.design.pk),
+                                            mock.call.check(self.launch.pk, self.design.pk)])
+
+
+class RecurringTaskTestCase(APITestCase):
+    def setUp(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from .recurrence import schedule_series
+        self.now = timezone.now().replace(microsecond=0)  # rules run at whole seconds
+        self.category = Category.objects.create(name="Team")
+        self.series = Task.objects.create(
+            title="Weekly report", description="Send the report", category=self.category, priority=3,
+            priority_score=7.5, ai_enhanced_description="Enhanced report", context_tags=['report'],
+            deadline=self.now + timedelta(hours=1), recurrence_rule='FREQ=WEEKLY')
+        schedule_series(self.series, now=self.now)
+
+    def materialize(self, days_later=0):
+        from datetime import timedelta
+        from .recurrence import materialize_occurrences
+        return materialize_occurrences(now=self.now + timedelta(days=days_later), window_days=28)
+
+    def test_occurrences_reuse_the_series_analysis(self):
+        from datetime import timedelta
+        with mock.patch('tasks.serializers.TaskSerializer._enhance_task_with_ai') as enhance:
+            self.assertEqual(self.materialize(), 3)
+        enhance.assert_not_called()
+        occurrences = list(self.series.occurrences.order_by('deadline'))
+        self.assertEqual([o.deadline for o in occurrences],
+                         [self.series.deadline + timedelta(weeks=n) for n in (1, 2, 3)])
+        for occurrence in occurrences:
+            self.assertEqual((occurrence.priority_score, occurrence.ai_enhanced_description, occurrence.context_tags,
+                              occurrence.category_id, occurrence.status), (7.5, "Enhanced report", ['report'],
+                                                                            self.category.pk, 'pending'))
+
+    def test_window_rolls_forward(self):
+        self.assertEqual(self.materialize(), 3)
+        self.assertEqual(self.materialize(), 0)
+        self.assertEqual(self.materialize(days_later=7), 1)
+        self.assertEqual(self.series.occurrences.count(), 4)
+
+    def test_calendar_expands_by_date_range(self):
+        from datetime import timedelta
+        self.materialize()
+        Task.objects.create(title="One-off", description="x", deadline=self.now + timedelta(days=2))
+        response = self.client.get(reverse('task-calendar'), {
+            'start': self.now.date().isoformat(), 'end': (self.now + timedelta(weeks=8)).date().isoformat()})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['results']
+        self.assertEqual([t['title'] for t in results][:2], ["Weekly report", "One-off"])
+        occurrences = [t for t in results if t['recurrence_parent'] == self.series.pk]
+        self.assertEqual(len(occurrences), 7)  # 3 made by the job, 4 expanded on the fly
+        self.assertEqual([t['id'] is None for t in occurrences], [False] * 3 + [True] * 4)
+        self.assertEqual(len({t['deadline'] for t in occurrences}), 7)
+        self.assertEqual({t['priority_score'] for t in occurrences}, {7.5})
+        for params in ({'start': '2026-02-30'}, {'end': '2026-01-01T25:00'}, {'start': 'soon'}):
+            response = self.client.get(reverse('task-calendar'), params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+    def test_rule_validation(self):
+        from datetime import timedelta
+        url = reverse('task-list')
+        data = {'title': "Standup", 'description': "Daily standup", 'recurrence_rule': 'FREQ=DAILY'}
+        self.assertEqual(self.client.post(url, data, format='json').status_code, status.HTTP_400_BAD_REQUEST)
+        data['deadline'] = (self.now + timedelta(days=1)).isoformat()
+        for rule in ('FREQ=HOURLY', 'FREQ=DAILY;BYDAY=XX', 'FREQ=DAILY;UNTIL=20300101',
+                     'FREQ=DAILY;BYHOUR=1,2;BYMINUTE=0,30', 'FREQ=DAILY;COUNT=2000000',
+                     'FREQ=DAILY;UNTIL=21000101T000000Z', 'FREQ=DAILY;BYMONTH=2;BYMONTHDAY=30',
+                     'FREQ=MONTHLY;BYMONTH=2;BYMONTHDAY=30'):
+            response = self.client.post(url, {**data, 'recurrence_rule': rule}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, rule)
+        response = self.client.post(url, {**data, 'recurrence_rule': 'rrule:freq=daily;count=3'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        task = Task.objects.get(title="Standup")
+        self.assertEqual(task.recurrence_rule, 'FREQ=DAILY;COUNT=3')
+        self.assertEqual(task.recurrence_end, task.deadline.replace(microsecond=0) + timedelta(days=2))
+
+    def test_rule_limits_come_from_the_rule_text(self):
+        from datetime import datetime, timedelta, timezone as dt_timezone
+        from .recurrence import rule_end, rule_limits
+        self.assertEqual(rule_limits('FREQ=WEEKLY'), (None, None))
+        self.assertEqual(rule_limits('FREQ=DAILY;UNTIL=20300105T000000Z;INTERVAL=2'),
+                         (None, datetime(2030, 1, 5, tzinfo=dt_timezone.utc)))
+        start = datetime(2030, 1, 1, 9, tzinfo=dt_timezone.utc)
+        self.assertEqual(rule_end('FREQ=DAILY;UNTIL=20300105T000000Z;INTERVAL=2', start), start + timedelta(days=2))
+        self.assertEqual(rule_end('FREQ=WEEKLY;COUNT=4', start), start + timedelta(weeks=3))
+
+    def test_rule_change_replaces_untouched_occurrences(self):
+        self.materialize()
+        edited = self.series.occurrences.order_by('deadline').last()
+        edited.title = "Weekly report (short)"
+        edited.save()
+        response = self.client.patch(reverse('task-detail', args=[self.series.pk]), {
+            'title': self.series.title, 'description': self.series.description, 'recurrence_rule': 'FREQ=DAILY',
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(self.series.occurrences.values_list('title', flat=True)), ["Weekly report (short)"])
+
+
+class DashboardTestCase(APITestCase):
+    def setUp(self):
+        from datetime import datetime, time, timedelta
+        from django.utils import timezone
+        from context.models import ContextEntry
+        cache.clear()
+        # Midday today, so "Due soon" is due today and not yet overdue whenever the suite runs
+        now = timezone.make_aware(datetime.combine(timezone.localdate(), time(12)))
+        work = Category.objects.create(name="Work")
+        Category.objects.create(name="Empty")
+        Task.objects.create(title="Late", category=work, priority=4, deadline=now - timedelta(days=3),
+                            ai_enhanced_description="Enhanced")
+        Task.objects.create(title="Due soon", category=work, priority=1, deadline=now + timedelta(minutes=1))
+        Task.objects.create(title="Urgent", priority=3, priority_score=9.0)
+        Task.objects.create(title="Done", priority=4, status='completed', deadline=now - timedelta(days=1))
+        ContextEntry.objects.create(content="Launch review", source_type="email", importance_score=0.9,
+                                    keywords=['launch', 'review'])
+        clock = mock.patch('tasks.filters.timezone.now', return_value=now)
+        clock.start()
+        self.addCleanup(clock.stop)
+
+    def test_sections_match_the_separate_endpoints(self):
+        data = self.client.get(reverse('dashboard')).data
+        self.assertEqual(data['statistics'], self.client.get(reverse('task-statistics')).data)
+        analytics = self.client.get(reverse('task-ai-analytics')).data
+        self.assertEqual(data['ai_analytics'], {key: analytics[key] for key in data['ai_analytics']})
+        for name in ('overdue', 'high_priority'):
+            expected = self.client.get(reverse(f'task-{name.replace("_", "-")}')).data['results']
+            self.assertEqual(data[name]['results'], expected)
+            self.assertEqual(data[name]['count'], len(expected))
+        self.assertEqual([t['title'] for t in data['overdue']['results']], ["Late"])
+        self.assertEqual(data['insights'], self.client.get(reverse('context-insights')).data)
+        self.assertIn('generated_at', data)
+
+    def test_shared_queries(self):
+        # task counts, category counts, three task lists, then three for the context insights
+        with self.assertNumQueries(8):
+            self.client.get(reverse('dashboard'))
+
+    def test_requested_sections_only(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('dashboard'), {'sections': 'today', 'limit': 1})
+        self.assertEqual(set(response.data), {'generated_at', 'today'})
+        self.assertEqual([t['title'] for t in response.data['today']['results']], ["Due soon"])
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get(reverse('dashboard'), {'sections': 'weather'}).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(reverse('dashboard'), {'limit': 0}).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+
+
+class BatchRequestTestCase(APITestCase):
+    def setUp(self):
+        self.task = Task.objects.create(title="Batched", description="d")
+
+    def _batch(self, operations, **extra):
+        return self.client.post(reverse('batch'), {'operations': operations, **extra}, format='json')
+
+    def test_operations_run_in_order(self):
+        from context.models import ContextEntry
+        entry = ContextEntry.objects.create(content="Standup notes", source_type="notes")
+        response = self._batch([
+            {'method': 'POST', 'path': f'/api/tasks/{self.task.id}/mark_completed/'},
+            {'method': 'POST', 'path': f'/api/tasks/{self.task.id}/log_category_correction/',
+             'body': {'old_tags': ['Work'], 'new_tags': ['Home']}},
+            {'method': 'POST', 'path': f'/api/context/{entry.id}/feedback/', 'body': {'is_relevant': True}},
+            {'method': 'GET', 'path': f'/api/tasks/{self.task.id}/?fields=id,status'},
+            {'method': 'GET', 'path': '/api/tasks/999999/'},
+        ])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['results']
+        self.assertEqual([result['status'] for result in results], [200, 200, 200, 200, 404])
+        self.assertEqual(results[3]['body'], {'id': self.task.id, 'status': 'completed'})
+        from .models import CategoryCorrection
+        self.assertEqual(CategoryCorrection.objects.filter(task=self.task).count(), 1)
+
+    def test_atomic_batch_rolls_back_on_failure(self):
+        response = self._batch([
+            {'method': 'POST', 'path': f'/api/tasks/{self.task.id}/mark_completed/'},
+            {'method': 'POST', 'path': f'/api/tasks/{self.task.id}/log_category_correction/', 'body': {}},
+            {'method': 'DELETE', 'path': f'/api/tasks/{self.task.id}/'},
+        ], atomic=True)
+        self.assertTrue(response.data['rolled_back'])
+        self.assertEqual([result['status'] for result in response.data['results']], [200, 400, 424])
+        self.assertEqual(Task.objects.get(id=self.task.id).status, 'pending')
+        operation = {'method': 'GET', 'path': '/api/tasks/'}
+        self.assertEqual(self._batch([operation], atomic='false').status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_rollback_invalidates_cached_reads(self):
+        cache.clear()
+        response = self._batch([
+            {'method': 'DELETE', 'path': f'/api/tasks/{self.task.id}/'},
+            {'method': 'GET', 'path': '/api/tasks/ai_analytics/'},
+            {'method': 'POST', 'path': f'/api/tasks/{self.task.id}/log_category_correction/', 'body': {}},
+        ], atomic=True)
+        self.assertTrue(response.data['rolled_back'])
+        self.assertEqual(response.data['results'][1]['body']['total_tasks'], 0)
+        self.assertEqual(self.client.get('/api/tasks/ai_analytics/').data['total_tasks'], 1)
+
+    def test_only_viewset_routes(self):
+        results = self._batch([
+            {'method': 'POST', 'path': '/api/batch/', 'body': {'operations': []}},
+            {'method': 'GET', 'path': '/api/tasks/export/'},
+            {'method': 'TRACE', 'path': '/api/tasks/'},
+        ]).data['results']
+        self.assertEqual([result['status'] for result in results], [400, 400, 400])
+
+    @override_settings(BATCH_MAX_OPERATIONS=2)
+    def test_operation_limit(self):
+        operation = {'method': 'GET', 'path': '/api/tasks/'}
+        self.assertEqual(self._batch([operation] * 3).status_code, status.HTTP_400_BAD_REQUEST)
@@ -2,24 +2,46 @@ from django.shortcuts import render
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action, api_view
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Task, Category
+from .models import Task, Category, TaskDependency, due_between_q
+from .filters import TaskFilter, request_now
 from .serializers import (
     TaskSerializer, CategorySerializer, TaskListSerializer, 
-    TaskDetailSerializer, TaskCreateSerializer
+    TaskDetailSerializer, TaskCreateSerializer, TaskDependencySerializer
 )
 from ai_engine import ai_manager
+from ai_engine.prompt_budget import usage_stats
 from context.models import ContextEntry
+from rest_framework.permissions import SAFE_METHODS
 from rest_framework.throttling import UserRateThrottle
-from .services import get_recent_context_entries, ai_analyze_task_priority, ai_suggest_deadline, ai_enhance_task_description
+from .services import get_recent_context_entries, ai_analyze_task_priority, ai_suggest_deadline, ai_enhance_task_description, ai_suggest_tags
 from django.http import JsonResponse
+from smart_todo.idempotency import idempotent
+from smart_todo.pagination import PaginatedActionMixin, TaskKeysetPagination
+from smart_todo.fieldsets import SparseFieldsetMixin
+from smart_todo.fulltext import fulltext_search
+from smart_todo.export import export_response
+from smart_todo.fast_serialization import fast_list_response
+from smart_todo.versioning import conditional, collection_changed, cached_data, cached_response
+from sync.changelog import record_changes
+import csv
+from collections import Counter
+from django.db import transaction
+from django.db.models import Count, F
+from .statistics import get_task_statistics, counters_enabled, adjust_counters
+from . import fuzzy
+from .dependencies import DependencyCycle, add_dependency, graph as dependency_graph
+from .recurrence import expand_occurrences
+from .importer import TaskImporter, ndjson_rows, csv_rows
+from .bulk import TaskBulkUpdater, parse_updates
 
 class AIPostThrottle(UserRateThrottle):
     rate = '10/minute'
 
 class CategoryViewSet(viewsets.ModelViewSet):
     """ViewSet for Category model"""
-    queryset = Category.objects.all()
+    queryset = Category.objects.annotate(task_count=Count('task'))
     serializer_class = CategorySerializer
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['name']
@@ -37,65 +59,180 @@ class CategoryViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def popular(self, request):
         """Get most popular categories"""
-        popular_categories = Category.objects.order_by('-usage_count')[:5]
+        popular_categories = self.get_queryset().order_by('-usage_count')[:5]
         serializer = self.get_serializer(popular_categories, many=True)
         return Response(serializer.data)
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(SparseFieldsetMixin, PaginatedActionMixin, viewsets.ModelViewSet):
     """ViewSet for Task model with AI enhancement"""
-    queryset = Task.objects.all()
+    queryset = Task.objects.select_related('category')
     serializer_class = TaskSerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['status', 'priority', 'category']
+    filterset_class = TaskFilter
     search_fields = ['title', 'description']
-    ordering_fields = ['priority_score', 'deadline', 'created_at', 'updated_at']
+    ordering_fields = ['priority_score', 'effective_priority_score', 'deadline', 'created_at', 'updated_at']
     ordering = ['-priority_score', '-created_at']
-    pagination_class = None  # Use default pagination from settings
+    pagination_class = TaskKeysetPagination
+    calendar_limit = 500
+    # Columns of /api/tasks/export/ and the values they are read from
+    export_fields = {
+        'id': 'id', 'title': 'title', 'description': 'description', 'category': 'category',
+        'category_name': 'category__name', 'priority': 'priority', 'priority_score': 'priority_score',
+        'status': 'status', 'deadline': 'deadline', 'ai_enhanced_description': 'ai_enhanced_description',
+        'context_tags': 'context_tags', 'version': 'version', 'created_at': 'created_at',
+        'updated_at': 'updated_at',
+    }
     
     def get_serializer_class(self):
         """Return appropriate serializer based on action"""
-        if self.action == 'list':
+        if self.action in ('list', 'search', 'fuzzy_search'):
             return TaskListSerializer
         elif self.action == 'retrieve':
             return TaskDetailSerializer
         elif self.action == 'create':
             return TaskCreateSerializer
         return TaskSerializer
+
+    @conditional('tasks', time_params=TaskFilter.time_params)
+    def list(self, request, *args, **kwargs):
+        return fast_list_response(self, TaskListSerializer) or super().list(request, *args, **kwargs)
+
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
     
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request is not None and self.request.method in SAFE_METHODS:
+            # Reads only: after a write the annotations would describe the old deadline
+            queryset = queryset.with_deadline_fields(request_now(self.request))
+        return queryset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.request is not None:
+            context['now'] = request_now(self.request)
+        return context
+
     @action(detail=False, methods=['get'])
     def overdue(self, request):
         """Get overdue tasks"""
-        from datetime import datetime
-        overdue_tasks = Task.objects.filter(
-            deadline__lt=datetime.now(),
-            status__in=['pending', 'in_progress']
-        )
-        serializer = self.get_serializer(overdue_tasks, many=True)
-        return Response(serializer.data)
+        return self.paginated_response(self.get_queryset().overdue(request_now(request)))
+    
+    @action(detail=False, methods=['get'])
+    def due_soon(self, request):
+        """Open tasks due within the next ?days= days (default 3)"""
+        try:
+            days = float(request.query_params.get('days', 3))
+        except ValueError:
+            days = -1
+        if not 0 <= days <= 366:
+            return Response({'error': 'days must be a number between 0 and 366'}, status=status.HTTP_400_BAD_REQUEST)
+        return self.paginated_response(self.get_queryset().due_soon(request_now(request), days))
     
     @action(detail=False, methods=['get'])
     def high_priority(self, request):
         """Get high priority tasks"""
-        high_priority_tasks = Task.objects.filter(
+        high_priority_tasks = self.get_queryset().filter(
             priority__in=[3, 4],  # High and Critical
             status__in=['pending', 'in_progress']
         )
-        serializer = self.get_serializer(high_priority_tasks, many=True)
-        return Response(serializer.data)
+        return self.paginated_response(high_priority_tasks)
     
     @action(detail=False, methods=['get'])
     def today(self, request):
         """Get tasks due today"""
-        from datetime import datetime, timedelta
-        today = datetime.now().date()
-        tomorrow = today + timedelta(days=1)
-        
-        today_tasks = Task.objects.filter(
-            deadline__date=today,
-            status__in=['pending', 'in_progress']
-        )
-        serializer = self.get_serializer(today_tasks, many=True)
-        return Response(serializer.data)
+        from datetime import datetime, time, timedelta
+        from django.utils import timezone
+        # A plain range (not deadline__date) so the (deadline, status) index applies
+        start = timezone.make_aware(datetime.combine(timezone.localdate(request_now(request)), time.min))
+        return self.paginated_response(self.get_queryset().filter(due_between_q(start, start + timedelta(days=1))))
+
+    @action(detail=False, methods=['get'])
+    def calendar(self, request):
+        """Tasks due in [?start, ?end) (ISO dates or datetimes), recurring series expanded.
+
+        Occurrences the materialization job has not created yet are included
+        with ``"id": null``. Defaults to the 7 days from today; at most 366
+        days and ``calendar_limit`` tasks.
+        """
+        from datetime import datetime, time, timedelta
+        from django.utils import timezone
+        from django.utils.dateparse import parse_date, parse_datetime
+        bounds = {}
+        for name in ('start', 'end'):
+            value = request.query_params.get(name)
+            if not value:
+                continue
+            try:
+                moment = parse_datetime(value)
+                if moment is None and parse_date(value) is not None:
+                    moment = datetime.combine(parse_date(value), time.min)
+            except ValueError:  # well formed but not a real date, e.g. 2026-02-30
+                moment = None
+            if moment is None:
+                return Response({'error': f'{name} must be an ISO date or datetime'},
+                                status=status.HTTP_400_BAD_REQUEST)
+            bounds[name] = timezone.make_aware(moment) if timezone.is_naive(moment) else moment
+        start = bounds.get('start') or timezone.make_aware(
+            datetime.combine(timezone.localdate(request_now(request)), time.min))
+        end = bounds.get('end') or start + timedelta(days=7)
+        if not start < end <= start + timedelta(days=366):
+            return Response({'error': 'end must be after start, by at most 366 days'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        limit = self.calendar_limit
+        tasks = list(self.get_queryset().filter(deadline__gte=start, deadline__lt=end)
+                     .order_by('deadline', 'id')[:limit + 1])
+        materialized = {(task.recurrence_parent_id, task.occurrence_at) for task in tasks if task.recurrence_parent_id}
+        upcoming = [task for task in expand_occurrences(start, end, limit + 1)
+                    if (task.recurrence_parent_id, task.occurrence_at) not in materialized]
+        merged = sorted(tasks + upcoming, key=lambda task: task.deadline)
+        return Response({
+            'start': start, 'end': end, 'truncated': len(merged) > limit,
+            'results': self.get_serializer(merged[:limit], many=True).data,
+        })
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """Full-text search over title and description, best matches first (?q=)"""
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({'error': 'q is required'}, status=status.HTTP_400_BAD_REQUEST)
+        tasks = fulltext_search(self.filter_queryset(self.get_queryset()), query, self.search_fields,
+                                self.paginator.get_page_size(request))
+        serializer = self.get_serializer(tasks, many=True)
+        return Response({'query': query, 'results': serializer.data})
+
+    @action(detail=False, methods=['get'])
+    def fuzzy_search(self, request):
+        """Typo-tolerant trigram search over task titles and category names (?q=, ?threshold=)"""
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({'error': 'q is required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            threshold = float(request.query_params.get('threshold', 0.5))
+        except ValueError:
+            threshold = -1
+        if not 0 < threshold <= 1:  # also rejects nan and inf
+            return Response({'error': 'threshold must be a number in (0, 1]'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = self.paginator.get_page_size(request)
+
+        task_matches = fuzzy.task_titles.search(query, limit, threshold)
+        tasks = self.get_queryset().in_bulk([task_id for task_id, _ in task_matches])
+        matched = [(tasks[task_id], similarity) for task_id, similarity in task_matches if task_id in tasks]
+        task_results = [
+            {**data, 'similarity': similarity}
+            for data, (_, similarity) in zip(self.get_serializer([task for task, _ in matched], many=True).data, matched)
+        ]
+
+        category_matches = fuzzy.category_names.search(query, limit, threshold)
+        categories = Category.objects.in_bulk([category_id for category_id, _ in category_matches])
+        category_results = [
+            {'id': category_id, 'name': categories[category_id].name, 'similarity': similarity}
+            for category_id, similarity in category_matches if category_id in categories
+        ]
+        return Response({'query': query, 'tasks': task_results, 'categories': category_results})
     
     @action(detail=True, methods=['post'])
     def mark_completed(self, request, pk=None):
@@ -107,6 +244,7 @@ class TaskViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
     
     @action(detail=True, methods=['post'])
+    @idempotent
     def enhance_with_ai(self, request, pk=None):
         """Manually trigger AI enhancement for a task"""
         task = self.get_object()
@@ -118,33 +256,84 @@ class TaskViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(task)
         return Response(serializer.data)
     
+    @action(detail=True, methods=['get', 'post', 'delete'])
+    def dependencies(self, request, pk=None):
+        """GET the tasks blocking and blocked by this one; POST or DELETE an edge.
+
+        POST ``{"blocked_by": <id>}`` or ``{"blocks": <id>}``; DELETE takes the
+        same key as a query parameter.
+        """
+        task = self.get_object()
+        if request.method == 'GET':
+            blocked_by = Task.objects.select_related('category').filter(blocking_links__blocked=task)
+            blocks = Task.objects.select_related('category').filter(blocked_by_links__blocker=task)
+            return Response({
+                'blocked_by': TaskListSerializer(blocked_by, many=True).data,
+                'blocks': TaskListSerializer(blocks, many=True).data,
+            })
+
+        data = request.data if request.method == 'POST' else request.query_params
+        given = [name for name in ('blocked_by', 'blocks') if data.get(name) not in (None, '')]
+        if len(given) != 1:
+            return Response({'error': 'Give exactly one of blocked_by or blocks'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            other = int(data[given[0]])
+        except (TypeError, ValueError):
+            return Response({'error': f'{given[0]} must be a task id'}, status=status.HTTP_400_BAD_REQUEST)
+        blocker, blocked = (other, task.pk) if given[0] == 'blocked_by' else (task.pk, other)
+
+        if request.method == 'DELETE':
+            edge = TaskDependency.objects.filter(blocker_id=blocker, blocked_id=blocked).first()
+            if edge is None:
+                return Response({'error': 'No such dependency'}, status=status.HTTP_404_NOT_FOUND)
+            edge.delete()
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        if not Task.objects.filter(pk=other).exists():
+            return Response({'error': f'Task {other} does not exist'}, status=status.HTTP_400_BAD_REQUEST)
+        edge = TaskDependency.objects.filter(blocker_id=blocker, blocked_id=blocked).first()
+        if edge is not None:
+            return Response(TaskDependencySerializer(edge).data)
+        try:
+            edge = add_dependency(blocker, blocked)
+        except DependencyCycle as e:
+            return Response({'error': 'Dependency would create a cycle', 'cycle': e.path},
+                            status=status.HTTP_400_BAD_REQUEST)
+        return Response(TaskDependencySerializer(edge).data, status=status.HTTP_201_CREATED)
+    
     @action(detail=False, methods=['get'])
+    @conditional('tasks')
     def statistics(self, request):
         """Get task statistics"""
-        total_tasks = Task.objects.count()
-        pending_tasks = Task.objects.filter(status='pending').count()
-        completed_tasks = Task.objects.filter(status='completed').count()
-        in_progress_tasks = Task.objects.filter(status='in_progress').count()
-        
-        # Priority distribution
-        priority_stats = {}
-        for priority in range(1, 5):
-            priority_stats[f'priority_{priority}'] = Task.objects.filter(priority=priority).count()
-        
-        # Category distribution
-        category_stats = {}
-        for category in Category.objects.all():
-            category_stats[category.name] = category.task_set.count()
-        
-        return Response({
-            'total_tasks': total_tasks,
-            'pending_tasks': pending_tasks,
-            'completed_tasks': completed_tasks,
-            'in_progress_tasks': in_progress_tasks,
-            'priority_distribution': priority_stats,
-            'category_distribution': category_stats
-        })
+        return Response(get_task_statistics())
     
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream all (filtered) tasks as NDJSON, CSV, Parquet or Arrow (?output=)"""
+        return export_response(self, self.export_fields, 'tasks')
+
+    @action(detail=False, methods=['post'], url_path='import', url_name='import')
+    def import_tasks(self, request):
+        """Bulk-create tasks from an NDJSON or CSV body, read as a stream (?enrich=false skips AI enrichment)"""
+        content_type = request.content_type.split(';')[0].strip().lower()
+        if content_type == 'text/csv':
+            parse = csv_rows
+        elif content_type in ('application/x-ndjson', 'application/jsonl', 'application/x-jsonlines'):
+            parse = ndjson_rows
+        else:
+            return Response({'error': 'Send text/csv or application/x-ndjson'},
+                            status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+        enrich = request.query_params.get('enrich', 'true').lower() not in ('0', 'false', 'no')
+        # request.stream, not request.data: rows are parsed while the body is read
+        importer = TaskImporter(enrich=enrich)
+        try:
+            result = importer.run(parse(request.stream or []))
+        except (UnicodeDecodeError, csv.Error) as e:
+            # Chunks before the unreadable part stay imported
+            return Response({**importer.summary(), 'error': f'Unreadable input: {e}'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_201_CREATED if result['created'] else status.HTTP_200_OK)
+
     @action(detail=False, methods=['post'])
     def bulk_update_status(self, request):
         """Bulk update task statuses"""
@@ -163,10 +352,47 @@ class TaskViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        updated_count = Task.objects.filter(id__in=task_ids).update(status=new_status)
+        with transaction.atomic():
+            tasks = Task.objects.filter(id__in=task_ids)
+            if counters_enabled():
+                # Queryset updates bypass the save signals that maintain counters
+                old_counts = tasks.exclude(status=new_status).order_by().values_list('status').annotate(n=Count('id'))
+                deltas = Counter()
+                for old_status, n in old_counts:
+                    deltas[f'status:{old_status}'] -= n
+                    deltas[f'status:{new_status}'] += n
+                adjust_counters(deltas)
+            changed_ids = list(tasks.values_list('pk', flat=True))
+            updated_count = tasks.update(status=new_status, version=F('version') + 1)
+            collection_changed('tasks')
+            record_changes('task', changed_ids)
+            dependency_graph.propagate(changed_ids, logged=changed_ids)
         return Response({'updated_count': updated_count})
 
+    @action(detail=False, methods=['patch'])
+    def bulk_update(self, request):
+        """Apply partial updates to many tasks at once, without AI enhancement.
+
+        Rows may carry the ``version`` they were read at; stale rows are
+        reported as conflicts. ``"atomic": true`` applies all rows or none.
+        """
+        updates = parse_updates(request.data)
+        atomic = request.data.get('atomic', False)
+        if not isinstance(atomic, bool):
+            # bool("false") is true: only a JSON boolean is accepted
+            raise ValidationError({'atomic': ['Must be true or false.']})
+        updater = TaskBulkUpdater(atomic=atomic)
+        rows, errors = updater.validate(updates)
+        if errors:
+            # Nothing is written unless every row is valid
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+        result = updater.run(rows)
+        if updater.atomic and (result['not_found'] or result['conflicts']):
+            return Response(result, status=status.HTTP_409_CONFLICT)
+        return Response(result)
+
     @action(detail=False, methods=['post'], throttle_classes=[AIPostThrottle])
+    @idempotent
     def ai_suggestions(self, request):
         """Return AI-powered task suggestions or prioritization."""
         # Extract input parameters
@@ -177,17 +403,11 @@ class TaskViewSet(viewsets.ModelViewSet):
 
         # Fetch tasks to consider
         if task_details:
-            tasks = []
-            for t in task_details:
-                if 'id' in t:
-                    try:
-                        tasks.append(Task.objects.get(id=t['id']))
-                    except Task.DoesNotExist:
-                        continue
-                else:
-                    continue
+            task_ids = [t['id'] for t in task_details if 'id' in t]
+            tasks_by_id = {str(pk): task for pk, task in self.get_queryset().in_bulk(task_ids).items()}
+            tasks = [tasks_by_id[str(task_id)] for task_id in task_ids if str(task_id) in tasks_by_id]
         else:
-            tasks = Task.objects.all()
+            tasks = self.get_queryset()
 
         # Use provided context or fetch recent
         if user_context:
@@ -219,6 +439,7 @@ class TaskViewSet(viewsets.ModelViewSet):
         })
 
     @action(detail=True, methods=['post'], throttle_classes=[AIPostThrottle])
+    @idempotent
     def suggest_deadline(self, request, pk=None):
         """Suggest a realistic deadline for this task using AI."""
         task = self.get_object()
@@ -235,6 +456,7 @@ class TaskViewSet(viewsets.ModelViewSet):
         return Response({'suggested_deadline': suggested_deadline, 'info': 'AI-powered deadline suggestion.'})
 
     @action(detail=True, methods=['post'], throttle_classes=[AIPostThrottle])
+    @idempotent
     def suggest_category(self, request, pk=None):
         """Suggest multiple categories/tags for this task using LLM zero-shot/few-shot classification."""
         from .models import Category
@@ -246,14 +468,7 @@ class TaskViewSet(viewsets.ModelViewSet):
         }
         context_data = get_recent_context_entries()
         all_categories = list(Category.objects.values_list('name', flat=True))
-        prompt = f"""
-        Given the following task:\nTitle: {task.title}\nDescription: {task.description}\nContext: {' '.join([c['content'] for c in context_data])}\nChoose the most appropriate categories/tags from this list: {all_categories}\nIf none fit, suggest new tags. Return a JSON list of tag names."""
-        import json
-        tags_json = ai_enhance_task_description({'title': 'Tag Suggestion', 'description': prompt, 'category': ''}, context_data)
-        try:
-            tags = json.loads(tags_json[tags_json.find('['):tags_json.rfind(']')+1])
-        except Exception:
-            tags = ['General']
+        tags = ai_suggest_tags(task_data, context_data, all_categories)
         tag_objs = []
         for tag in tags:
             category_obj, _ = Category.objects.get_or_create(name=tag)
@@ -276,6 +491,7 @@ class TaskViewSet(viewsets.ModelViewSet):
         return Response({'status': 'Corrections logged.'})
 
     @action(detail=True, methods=['post'], throttle_classes=[AIPostThrottle])
+    @idempotent
     def enhance_description(self, request, pk=None):
         """Enhance the task description using AI and recent context."""
         task = self.get_object()
@@ -289,6 +505,7 @@ class TaskViewSet(viewsets.ModelViewSet):
         return Response({'enhanced_description': enhanced_desc, 'info': 'AI-powered description enhancement.'})
 
     @action(detail=True, methods=['post'], throttle_classes=[AIPostThrottle])
+    @idempotent
     def ai_pipeline(self, request, pk=None):
         """Run the full AI pipeline for a task: context analysis, priority, deadline, enhancement, multi-tag suggestion. Optionally auto-apply results."""
         from .models import Category
@@ -306,14 +523,7 @@ class TaskViewSet(viewsets.ModelViewSet):
         suggested_deadline = ai_suggest_deadline(task_data, current_task_load)
         enhanced_desc = ai_enhance_task_description(task_data, context_data)
         all_categories = list(Category.objects.values_list('name', flat=True))
-        prompt = f"""
-        Given the following task:\nTitle: {task.title}\nDescription: {task.description}\nContext: {' '.join([c['content'] for c in context_data])}\nChoose the most appropriate categories/tags from this list: {all_categories}\nIf none fit, suggest new tags. Return a JSON list of tag names."""
-        import json
-        tags_json = ai_enhance_task_description({'title': 'Tag Suggestion', 'description': prompt, 'category': ''}, context_data)
-        try:
-            tags = json.loads(tags_json[tags_json.find('['):tags_json.rfind(']')+1])
-        except Exception:
-            tags = ['General']
+        tags = ai_suggest_tags(task_data, context_data, all_categories)
         tag_objs = []
         for tag in tags:
             category_obj, _ = Category.objects.get_or_create(name=tag)
@@ -342,6 +552,7 @@ class TaskViewSet(viewsets.ModelViewSet):
         })
 
     @action(detail=False, methods=['post'], throttle_classes=[AIPostThrottle])
+    @idempotent
     def ai_batch_pipeline(self, request):
         """Run the AI pipeline for multiple tasks. Accepts a list of task IDs and optional auto_apply."""
         from .models import Category
@@ -351,59 +562,60 @@ class TaskViewSet(viewsets.ModelViewSet):
         if current_task_load is None:
             current_task_load = Task.objects.filter(status='pending').count()
         context_data = get_recent_context_entries()
+        tasks_by_id = {str(pk): task for pk, task in self.get_queryset().in_bulk(task_ids).items()}
+        all_categories = list(Category.objects.values_list('name', flat=True))
         results = []
         for task_id in task_ids:
-            try:
-                task = Task.objects.get(id=task_id)
-                task_data = {
-                    'title': task.title,
-                    'description': task.description,
-                    'category': task.category.name if task.category else 'General'
-                }
-                priority_result = ai_analyze_task_priority(task_data, context_data)
-                suggested_deadline = ai_suggest_deadline(task_data, current_task_load)
-                enhanced_desc = ai_enhance_task_description(task_data, context_data)
-                all_categories = list(Category.objects.values_list('name', flat=True))
-                prompt = f"""
-                Given the following task:\nTitle: {task.title}\nDescription: {task.description}\nContext: {' '.join([c['content'] for c in context_data])}\nChoose the most appropriate categories/tags from this list: {all_categories}\nIf none fit, suggest new tags. Return a JSON list of tag names."""
-                import json
-                tags_json = ai_enhance_task_description({'title': 'Tag Suggestion', 'description': prompt, 'category': ''}, context_data)
-                try:
-                    tags = json.loads(tags_json[tags_json.find('['):tags_json.rfind(']')+1])
-                except Exception:
-                    tags = ['General']
-                tag_objs = []
-                for tag in tags:
-                    category_obj, _ = Category.objects.get_or_create(name=tag)
-                    tag_objs.append(category_obj.name)
-                updated = False
-                if auto_apply:
-                    task.priority_score = priority_result.get('priority_score', task.priority_score)
-                    task.priority = priority_result.get('priority_level', task.priority)
-                    task.ai_enhanced_description = enhanced_desc
-                    if suggested_deadline:
-                        task.deadline = suggested_deadline
-                    if tag_objs:
-                        task.context_tags = tag_objs
-                    task.save()
-                    updated = True
-                serializer = self.get_serializer(task)
-                results.append({
-                    'task_id': task.id,
-                    'priority': priority_result,
-                    'suggested_deadline': suggested_deadline,
-                    'enhanced_description': enhanced_desc,
-                    'suggested_tags': tag_objs,
-                    'auto_applied': updated,
-                    'task': serializer.data
-                })
-            except Task.DoesNotExist:
+            task = tasks_by_id.get(str(task_id))
+            if task is None:
                 results.append({'task_id': task_id, 'error': 'Task not found'})
+                continue
+            task_data = {
+                'title': task.title,
+                'description': task.description,
+                'category': task.category.name if task.category else 'General'
+            }
+            priority_result = ai_analyze_task_priority(task_data, context_data)
+            suggested_deadline = ai_suggest_deadline(task_data, current_task_load)
+            enhanced_desc = ai_enhance_task_description(task_data, context_data)
+            tags = ai_suggest_tags(task_data, context_data, all_categories)
+            tag_objs = []
+            for tag in tags:
+                category_obj, created = Category.objects.get_or_create(name=tag)
+                if created:
+                    all_categories.append(category_obj.name)
+                tag_objs.append(category_obj.name)
+            updated = False
+            if auto_apply:
+                task.priority_score = priority_result.get('priority_score', task.priority_score)
+                task.priority = priority_result.get('priority_level', task.priority)
+                task.ai_enhanced_description = enhanced_desc
+                if suggested_deadline:
+                    task.deadline = suggested_deadline
+                if tag_objs:
+                    task.context_tags = tag_objs
+                task.save()
+                updated = True
+            serializer = self.get_serializer(task)
+            results.append({
+                'task_id': task.id,
+                'priority': priority_result,
+                'suggested_deadline': suggested_deadline,
+                'enhanced_description': enhanced_desc,
+                'suggested_tags': tag_objs,
+                'auto_applied': updated,
+                'task': serializer.data
+            })
         return Response({'results': results, 'info': 'Batch AI pipeline analysis.'})
 
     @action(detail=False, methods=['get'])
     def ai_analytics(self, request):
         """Return analytics about AI impact on tasks."""
+        # prompt_usage is in-process state, so only the database part is cached
+        data = cached_data('TaskViewSet.ai_analytics', self._ai_analytics_data, tags=('tasks',))
+        return Response({**data, 'prompt_usage': usage_stats.snapshot(), 'info': 'AI analytics dashboard.'})
+
+    def _ai_analytics_data(self):
         from .models import Task, Category
         # Number of tasks enhanced by AI
         enhanced_count = Task.objects.exclude(ai_enhanced_description__isnull=True).exclude(ai_enhanced_description__exact='').count()
@@ -418,16 +630,16 @@ class TaskViewSet(viewsets.ModelViewSet):
         category_counts = Counter(categories).most_common(5)
         # Total tasks
         total_tasks = Task.objects.count()
-        return Response({
+        return {
             'total_tasks': total_tasks,
             'ai_enhanced_tasks': enhanced_count,
             'average_priority_score': round(avg_priority, 2),
             'tasks_with_deadline': deadline_count,
             'top_categories': [{'category': c, 'count': n} for c, n in category_counts],
-            'info': 'AI analytics dashboard.'
-        })
+        }
 
     @action(detail=False, methods=['get'])
+    @cached_response('corrections')
     def correction_analytics(self, request):
         """Return most common category corrections for prompt engineering or fine-tuning."""
         from .models import CategoryCorrection